@@ -33,6 +33,9 @@ from app.db.models.application import Application
 from app.db.models.setting import UserSetting
 from app.db.models.contact import ScrapedContact
 from app.db.models.action_log import ActionLog
+from app.db.models.outreach import Outreach, OutreachDailyCounter
+from app.db.models.match import JobResumeMatch
+from app.db.models.crawl import CrawlTarget
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,29 @@
+"""unique (source, external_id) on job_postings for feed item dedup
+
+Revision ID: a4b5c6d7e8f9
+Revises: z3a4b5c6d7e8
+Create Date: 2026-03-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4b5c6d7e8f9'
+down_revision: Union[str, None] = 'z3a4b5c6d7e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'uq_job_postings_source_external_id', 'job_postings', ['source', 'external_id'], unique=True,
+        postgresql_where=sa.text('external_id IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_job_postings_source_external_id', table_name='job_postings')
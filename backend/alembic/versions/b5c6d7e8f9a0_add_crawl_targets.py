@@ -0,0 +1,56 @@
+"""add crawl_targets for the adaptive recrawl scheduler
+
+Revision ID: b5c6d7e8f9a0
+Revises: a4b5c6d7e8f9
+Create Date: 2026-03-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c6d7e8f9a0'
+down_revision: Union[str, None] = 'a4b5c6d7e8f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'crawl_targets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('target_type', sa.String(), server_default='jobs', nullable=False),
+        sa.Column('owner_user_id', sa.Integer(), nullable=True),
+        sa.Column('subscribers', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('active', sa.Boolean(), server_default='true', nullable=False),
+        sa.Column('min_interval_seconds', sa.Integer(), nullable=False),
+        sa.Column('max_interval_seconds', sa.Integer(), nullable=False),
+        sa.Column('interval_seconds', sa.Integer(), nullable=False),
+        sa.Column('next_due_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('leased_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('change_rate', sa.Float(), server_default='0.5', nullable=False),
+        sa.Column('failure_streak', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_crawled_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_changed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['owner_user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('url'),
+    )
+    op.create_index(op.f('ix_crawl_targets_id'), 'crawl_targets', ['id'], unique=False)
+    op.create_index(
+        'ix_crawl_targets_due', 'crawl_targets', ['next_due_at'], unique=False,
+        postgresql_where=sa.text('active'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_crawl_targets_due', table_name='crawl_targets')
+    op.drop_index(op.f('ix_crawl_targets_id'), table_name='crawl_targets')
+    op.drop_table('crawl_targets')
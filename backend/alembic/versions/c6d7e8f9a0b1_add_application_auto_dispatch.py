@@ -0,0 +1,32 @@
+"""track auto-apply dispatch of matcher-created applications
+
+Revision ID: c6d7e8f9a0b1
+Revises: b5c6d7e8f9a0
+Create Date: 2026-03-21 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6d7e8f9a0b1'
+down_revision: Union[str, None] = 'b5c6d7e8f9a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('applications', sa.Column('auto_dispatch', sa.String(), nullable=True))
+    # The matcher looks up undispatched applications by job on every batch
+    op.create_index(
+        'ix_applications_auto_dispatch_pending', 'applications', ['job_id'],
+        postgresql_where=sa.text("auto_dispatch = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_applications_auto_dispatch_pending', table_name='applications')
+    op.drop_column('applications', 'auto_dispatch')
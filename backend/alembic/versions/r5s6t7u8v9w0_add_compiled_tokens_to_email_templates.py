@@ -0,0 +1,27 @@
+"""add compiled_tokens to email_templates
+
+Revision ID: r5s6t7u8v9w0
+Revises: q4r5s6t7u8v9
+Create Date: 2026-03-10 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'r5s6t7u8v9w0'
+down_revision: Union[str, None] = 'q4r5s6t7u8v9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows stay NULL and are compiled lazily until they are next saved
+    op.add_column('email_templates', sa.Column('compiled_tokens', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('email_templates', 'compiled_tokens')
@@ -0,0 +1,62 @@
+"""create outreach ledger and daily counters
+
+Revision ID: s6t7u8v9w0x1
+Revises: r5s6t7u8v9w0
+Create Date: 2026-03-11 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 's6t7u8v9w0x1'
+down_revision: Union[str, None] = 'r5s6t7u8v9w0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('outreach',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('contact_id', sa.Integer(), nullable=False),
+        sa.Column('template_id', sa.Integer(), nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['contact_id'], ['scraped_contacts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['template_id'], ['email_templates.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'contact_id', 'template_id', name='uq_outreach_user_contact_template')
+    )
+    op.create_index(op.f('ix_outreach_id'), 'outreach', ['id'], unique=False)
+    op.create_index('ix_outreach_user_contact_mailed', 'outreach', ['user_id', 'contact_id'], unique=False,
+                    postgresql_where=sa.text("status <> 'failed'"))
+    op.create_index('ix_outreach_queued', 'outreach', ['id'], unique=False,
+                    postgresql_where=sa.text("status = 'queued'"))
+
+    op.create_table('outreach_daily_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('reserved', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('outreach_daily_counters')
+    op.drop_index('ix_outreach_queued', table_name='outreach')
+    op.drop_index('ix_outreach_user_contact_mailed', table_name='outreach')
+    op.drop_index(op.f('ix_outreach_id'), table_name='outreach')
+    op.drop_table('outreach')
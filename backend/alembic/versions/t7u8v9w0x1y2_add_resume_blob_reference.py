@@ -0,0 +1,31 @@
+"""add blob_key and file_size to resumes
+
+Revision ID: t7u8v9w0x1y2
+Revises: s6t7u8v9w0x1
+Create Date: 2026-03-12 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 't7u8v9w0x1y2'
+down_revision: Union[str, None] = 's6t7u8v9w0x1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # file_data is kept for rows uploaded before the blob store; they are moved lazily on first access
+    op.add_column('resumes', sa.Column('blob_key', sa.String(length=64), nullable=True))
+    op.add_column('resumes', sa.Column('file_size', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_resumes_blob_key'), 'resumes', ['blob_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_resumes_blob_key'), table_name='resumes')
+    op.drop_column('resumes', 'file_size')
+    op.drop_column('resumes', 'blob_key')
@@ -0,0 +1,38 @@
+"""add (created_at, id) indexes for keyset pagination
+
+Revision ID: u8v9w0x1y2z3
+Revises: t7u8v9w0x1y2
+Create Date: 2026-03-13 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'u8v9w0x1y2z3'
+down_revision: Union[str, None] = 't7u8v9w0x1y2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_INDEXES = [
+    ('ix_job_postings_created_at_id', 'job_postings', ['created_at', 'id']),
+    ('ix_scraped_contacts_created_at_id', 'scraped_contacts', ['created_at', 'id']),
+    ('ix_action_logs_user_created_at_id', 'action_logs', ['user_id', 'created_at', 'id']),
+    ('ix_email_templates_created_at_id', 'email_templates', ['created_at', 'id']),
+    ('ix_resumes_user_created_at_id', 'resumes', ['user_id', 'created_at', 'id']),
+    ('ix_feedbacks_created_at_id', 'feedbacks', ['created_at', 'id']),
+    ('ix_feedbacks_upvotes_created_at_id', 'feedbacks', ['upvotes', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in _INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,66 @@
+"""add generated search columns with trigram and tsvector indexes
+
+Revision ID: v9w0x1y2z3a4
+Revises: u8v9w0x1y2z3
+Create Date: 2026-03-14 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'v9w0x1y2z3a4'
+down_revision: Union[str, None] = 'u8v9w0x1y2z3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_CONTACT_FIELDS = "coalesce(name, '') || ' ' || email || ' ' || coalesce(role, '') || ' ' || coalesce(company, '')"
+_APPLICATION_FIELDS = (
+    "coalesce(company_name, '') || ' ' || coalesce(job_title, '') || ' ' || "
+    "coalesce(contact_name, '') || ' ' || coalesce(contact_email, '') || ' ' || coalesce(location, '')"
+)
+
+# table -> (search_text expression, search_vector expression)
+_SEARCH_COLUMNS = {
+    'scraped_contacts': (
+        f"lower({_CONTACT_FIELDS})",
+        f"to_tsvector('simple'::regconfig, {_CONTACT_FIELDS})",
+    ),
+    'email_templates': (
+        "lower(name || ' ' || subject)",
+        "setweight(to_tsvector('simple'::regconfig, name || ' ' || subject), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, body_text), 'C')",
+    ),
+    'applications': (
+        f"lower({_APPLICATION_FIELDS})",
+        f"setweight(to_tsvector('simple'::regconfig, {_APPLICATION_FIELDS}), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(notes, '')), 'C')",
+    ),
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Adding a stored generated column rewrites the table once; run during a quiet window on large installs
+    for table, (text_expr, vector_expr) in _SEARCH_COLUMNS.items():
+        op.add_column(table, sa.Column('search_text', sa.Text(), sa.Computed(text_expr, persisted=True), nullable=True))
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(vector_expr, persisted=True), nullable=True))
+        op.create_index(
+            f'ix_{table}_search_text_trgm', table, ['search_text'], unique=False,
+            postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'},
+        )
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    for table in reversed(list(_SEARCH_COLUMNS)):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_index(f'ix_{table}_search_text_trgm', table_name=table)
+        op.drop_column(table, 'search_vector')
+        op.drop_column(table, 'search_text')
+    # pg_trgm is left installed; other objects may depend on it
@@ -0,0 +1,45 @@
+"""add job full-text search column and embedding HNSW index
+
+Revision ID: w0x1y2z3a4b5
+Revises: v9w0x1y2z3a4
+Create Date: 2026-03-15 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'w0x1y2z3a4b5'
+down_revision: Union[str, None] = 'v9w0x1y2z3a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english'::regconfig, title), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, company || ' ' || coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, description), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'job_postings',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(_SEARCH_VECTOR, persisted=True), nullable=True),
+    )
+    op.create_index('ix_job_postings_search_vector', 'job_postings', ['search_vector'], unique=False, postgresql_using='gin')
+    # HNSW needs pgvector >= 0.5
+    op.create_index(
+        'ix_job_postings_embedding_hnsw', 'job_postings', ['embedding'], unique=False,
+        postgresql_using='hnsw', postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_postings_embedding_hnsw', table_name='job_postings')
+    op.drop_index('ix_job_postings_search_vector', table_name='job_postings')
+    op.drop_column('job_postings', 'search_vector')
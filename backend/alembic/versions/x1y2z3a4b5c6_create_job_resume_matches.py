@@ -0,0 +1,43 @@
+"""create job_resume_matches
+
+Revision ID: x1y2z3a4b5c6
+Revises: w0x1y2z3a4b5
+Create Date: 2026-03-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'x1y2z3a4b5c6'
+down_revision: Union[str, None] = 'w0x1y2z3a4b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_resume_matches',
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['job_postings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id', 'resume_id'),
+    )
+    op.create_index('ix_job_resume_matches_user_score', 'job_resume_matches', ['user_id', 'score', 'job_id', 'resume_id'], unique=False)
+    op.create_index('ix_job_resume_matches_resume_score', 'job_resume_matches', ['resume_id', 'score'], unique=False)
+    # Existing rows are filled by running rebuild_job_matches_task once
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_resume_matches_resume_score', table_name='job_resume_matches')
+    op.drop_index('ix_job_resume_matches_user_score', table_name='job_resume_matches')
+    op.drop_table('job_resume_matches')
@@ -0,0 +1,48 @@
+"""add halfvec job embedding column and move the HNSW index onto it
+
+Revision ID: y2z3a4b5c6d7
+Revises: x1y2z3a4b5c6
+Create Date: 2026-03-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'y2z3a4b5c6d7'
+down_revision: Union[str, None] = 'x1y2z3a4b5c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # halfvec needs pgvector >= 0.7; pick up a newer extension build if the server has one
+    op.execute("ALTER EXTENSION vector UPDATE")
+    op.add_column(
+        'job_postings',
+        sa.Column(
+            'embedding_half',
+            pgvector.sqlalchemy.HALFVEC(dim=384),
+            sa.Computed('(embedding)::halfvec(384)', persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_job_postings_embedding_half_hnsw', 'job_postings', ['embedding_half'], unique=False,
+        postgresql_using='hnsw', postgresql_ops={'embedding_half': 'halfvec_cosine_ops'},
+    )
+    # The float32 index is replaced, not kept alongside: that is where the memory saving comes from
+    op.drop_index('ix_job_postings_embedding_hnsw', table_name='job_postings')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_job_postings_embedding_hnsw', 'job_postings', ['embedding'], unique=False,
+        postgresql_using='hnsw', postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+    op.drop_index('ix_job_postings_embedding_half_hnsw', table_name='job_postings')
+    op.drop_column('job_postings', 'embedding_half')
@@ -0,0 +1,36 @@
+"""record which embedding model version produced each job and resume vector
+
+Revision ID: z3a4b5c6d7e8
+Revises: y2z3a4b5c6d7
+Create Date: 2026-03-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'z3a4b5c6d7e8'
+down_revision: Union[str, None] = 'y2z3a4b5c6d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every vector stored so far came from all-MiniLM-L6-v2 over text format v1
+_INITIAL_VERSION = 'all-MiniLM-L6-v2/v1'
+
+
+def upgrade() -> None:
+    op.add_column('job_postings', sa.Column('embedding_model', sa.String(), nullable=True))
+    op.add_column('resumes', sa.Column('embedding_model', sa.String(), nullable=True))
+    for table in ('job_postings', 'resumes'):
+        op.execute(
+            sa.text(f"UPDATE {table} SET embedding_model = :version WHERE embedding IS NOT NULL")
+            .bindparams(version=_INITIAL_VERSION)
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('resumes', 'embedding_model')
+    op.drop_column('job_postings', 'embedding_model')
@@ -1,4 +1,4 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
@@ -8,10 +8,9 @@ from app.db.models.user import User
 from app.db.models.application import Application
 from app.schemas.application import ApplicationCreate, ApplicationRead, ApplicationUpdate
 from app.services.application_engine import ApplicationEngine
-from app.worker.tasks import run_auto_apply_task
-from app.services.inbox_scanner import run_inbox_scanner_async
-from app.services.task_registry import register_task
-import asyncio
+from app.worker.tasks import run_auto_apply_task, run_inbox_sync_task, enqueue_interactive
+from app.services.exporter import ExportColumn, export_response, select_columns
+from app.services import text_search
 
 router = APIRouter()
 
@@ -47,17 +46,55 @@ async def list_applications(
     db: AsyncSession = Depends(deps.get_personal_db),
     skip: int = 0,
     limit: int = 100,
+    search: Optional[str] = None,
+    sort: str = "recent",
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
+    stmt = select(Application).where(Application.user_id == current_user.id)
+    condition = await text_search.search_condition(db, Application, search)
+    if condition is not None:
+        stmt = stmt.where(condition)
+    if text_search.wants_relevance(sort, search):
+        stmt = stmt.order_by(text_search.search_rank(Application, search).desc(), desc(Application.id))
+    else:
+        stmt = stmt.order_by(desc(Application.updated_at))
+    res = await db.execute(stmt.offset(skip).limit(limit))
+    return res.scalars().all()
+
+APPLICATION_EXPORT_COLUMNS = [
+    ExportColumn("ID", Application.id, kind="int"),
+    ExportColumn("Company", Application.company_name),
+    ExportColumn("Job Title", Application.job_title),
+    ExportColumn("Type", Application.application_type),
+    ExportColumn("Status", Application.status),
+    ExportColumn("Contact Name", Application.contact_name),
+    ExportColumn("Contact Email", Application.contact_email),
+    ExportColumn("Contact Role", Application.contact_role),
+    ExportColumn("Location", Application.location),
+    ExportColumn("Source URL", Application.source_url),
+    ExportColumn("Notes", Application.notes),
+    ExportColumn("Job ID", Application.job_id, kind="int"),
+    ExportColumn("Applied At", Application.applied_at, kind="timestamp"),
+    ExportColumn("Updated At", Application.updated_at, kind="timestamp"),
+]
+
+@router.get("/export")
+async def export_applications(
+    format: str = "csv",
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(deps.get_personal_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """Stream the current user's applications as CSV, NDJSON or Parquet. Accepts the list endpoint's search."""
     stmt = (
-        select(Application)
+        select_columns(APPLICATION_EXPORT_COLUMNS)
         .where(Application.user_id == current_user.id)
         .order_by(desc(Application.updated_at))
-        .offset(skip)
-        .limit(limit)
     )
-    res = await db.execute(stmt)
-    return res.scalars().all()
+    condition = await text_search.search_condition(db, Application, search)
+    if condition is not None:
+        stmt = stmt.where(condition)
+    return export_response(db, stmt, APPLICATION_EXPORT_COLUMNS, format, "applications")
 
 @router.put("/{app_id}", response_model=ApplicationRead)
 async def update_application(
@@ -129,8 +166,8 @@ async def trigger_auto_apply(
     db.add(app_record)
     await db.commit()
     
-    run_auto_apply_task.delay(current_user.id, app_id)
-    return {"message": "Autonomous Agent dispatched to apply for this job."}
+    task_id = await enqueue_interactive(run_auto_apply_task, current_user.id, "auto_apply", current_user.id, app_id)
+    return {"message": "Autonomous Agent dispatched to apply for this job.", "task_id": task_id}
 
 @router.delete("/{app_id}", status_code=204)
 async def delete_application(
@@ -153,9 +190,6 @@ async def trigger_inbox_sync(
     """
     Triggers the Inbox Scanner service to look for job tracking updates.
     """
-    task = asyncio.create_task(
-        run_inbox_scanner_async(current_user.id)
-    )
-    task_id = register_task(current_user.id, "inbox_sync", task)
+    task_id = await enqueue_interactive(run_inbox_sync_task, current_user.id, "inbox_sync", current_user.id)
     
     return {"message": "Inbox sync started. Check Logs for processing updates.", "task_id": task_id}
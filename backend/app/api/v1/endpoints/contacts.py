@@ -1,22 +1,45 @@
 from typing import Any, List, Optional
-import io
-import csv
-from datetime import datetime
+import json
+import asyncio
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select
 from fastapi.responses import StreamingResponse
-import pandas as pd
 
 from app.api import deps
 from app.db.models.user import User
 from app.db.models.contact import ScrapedContact
 from app.schemas.contact import ScrapedContactCreate, ScrapedContactRead, ScrapedContactList
+from app.services import contact_import
+from app.services.pagination import paginate
+from app.services import text_search
+from app.services.exporter import ExportColumn, export_response, select_columns, yes_no, date_only
 from loguru import logger
 
 router = APIRouter()
 
+CONTACT_EXPORT_COLUMNS = [
+    ExportColumn("Name", ScrapedContact.name),
+    ExportColumn("Email", ScrapedContact.email),
+    ExportColumn("Role", ScrapedContact.role),
+    ExportColumn("Company", ScrapedContact.company),
+    ExportColumn("Verified", ScrapedContact.is_verified, kind="bool", csv_format=yes_no),
+    ExportColumn("Date Added", ScrapedContact.created_at, kind="timestamp", csv_format=date_only),
+]
+
+async def _contact_filters(db: AsyncSession, search: Optional[str], scope: str, current_user: User) -> list:
+    """Filter conditions shared by the list and export endpoints."""
+    filters = []
+    
+    if scope == "my":
+        filters.append(ScrapedContact.user_id == current_user.id)
+
+    condition = await text_search.search_condition(db, ScrapedContact, search)
+    if condition is not None:
+        filters.append(condition)
+    return filters
+
 @router.get("/", response_model=ScrapedContactList)
 async def list_contacts(
     db: AsyncSession = Depends(deps.get_personal_db),
@@ -24,39 +47,18 @@ async def list_contacts(
     limit: int = 200,
     search: Optional[str] = None,
     scope: str = "global",
+    cursor: Optional[str] = None,
+    exact: bool = False,
+    sort: str = "recent",
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
-    # Build filter conditions
-    filters = []
-    
-    if scope == "my":
-        filters.append(ScrapedContact.user_id == current_user.id)
-
-    if search:
-        search_term = f"%{search}%"
-        filters.append(
-            or_(
-                ScrapedContact.name.ilike(search_term),
-                ScrapedContact.email.ilike(search_term),
-                ScrapedContact.role.ilike(search_term),
-                ScrapedContact.company.ilike(search_term)
-            )
-        )
-
-    # Get total count
-    count_stmt = select(func.count(ScrapedContact.id))
-    if filters:
-        count_stmt = count_stmt.where(*filters)
-    count_res = await db.execute(count_stmt)
-    total = count_res.scalar() or 0
-
-    # Get items
-    stmt = select(ScrapedContact).order_by(ScrapedContact.created_at.desc()).offset(skip).limit(limit)
-    if filters:
-        stmt = stmt.where(*filters)
-    res = await db.execute(stmt)
-    items = res.scalars().all()
-    return {"items": items, "total": total}
+    """List contacts newest first; with `search` and sort=relevance, best matches first."""
+    filters = await _contact_filters(db, search, scope, current_user)
+    if text_search.wants_relevance(sort, search):
+        page = await text_search.ranked_page(db, ScrapedContact, filters, search, limit=limit, skip=skip, exact=exact)
+        return page.as_dict()
+    page = await paginate(db, ScrapedContact, filters, limit=limit, cursor=cursor, skip=skip, exact=exact)
+    return page.as_dict()
 
 @router.post("/", response_model=ScrapedContactRead)
 async def create_contact(
@@ -174,98 +176,79 @@ async def bulk_delete_contacts(
 @router.post("/import")
 async def import_contacts(
     file: UploadFile = File(...),
+    stream: bool = False,
     db: AsyncSession = Depends(deps.get_personal_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
-    """Import contacts via CSV or Excel"""
+    """
+    Import contacts via CSV or Excel.
+
+    The file is processed in chunks; dedup against existing contacts happens in the
+    database. Returns counts plus per-row rejects (row number, email, reason). With
+    `stream=true` the response is NDJSON with a progress line per chunk and the same
+    summary as the last line.
+    """
+    filename = file.filename or ""
+    if not filename.lower().endswith(('.csv', '.xls', '.xlsx')):
+        raise HTTPException(status_code=400, detail="Invalid file format. Must be CSV or Excel.")
+
+    # Pull the first chunk up front so a bad file or missing email column is a plain 400
+    chunks = contact_import.iter_chunks(file.file, filename)
     try:
-        content = await file.read()
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(content))
-        elif file.filename.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(io.BytesIO(content))
-        else:
-            raise HTTPException(status_code=400, detail="Invalid file format. Must be CSV or Excel.")
-            
-        # Standardize columns to lowercase, strip whitespace
-        df.columns = [str(col).lower().strip() for col in df.columns]
-        
-        # Look for required 'email' column
-        email_col = next((col for col in df.columns if 'email' in col), None)
-        if not email_col:
-            raise HTTPException(status_code=400, detail="Could not find an 'Email' column in the uploaded file.")
-            
-        # Optional columns mapping
-        name_col = next((col for col in df.columns if 'name' in col), None)
-        company_col = next((col for col in df.columns if 'company' in col or 'org' in col), None)
-        role_col = next((col for col in df.columns if 'role' in col or 'title' in col), None)
-        
-        imported_count = 0
-        skipped_count = 0
-        
-        # Load existing emails to deduplicate
-        existing_emails = set()
-        res = await db.execute(select(ScrapedContact.email))
-        for row in res.scalars().all():
-            existing_emails.add(row.lower().strip())
-            
-        new_contacts = []
-        for _, row in df.iterrows():
-            email = str(row[email_col]).strip().lower()
-            if pd.isna(row[email_col]) or not email or '@' not in email:
-                skipped_count += 1
-                continue
-                
-            if email in existing_emails:
-                skipped_count += 1
-                continue
-                
-            contact_data = {
-                "email": email,
-                "name": str(row[name_col]).strip() if name_col and pd.notna(row[name_col]) else None,
-                "company": str(row[company_col]).strip() if company_col and pd.notna(row[company_col]) else None,
-                "role": str(row[role_col]).strip() if role_col and pd.notna(row[role_col]) else None,
-                "source_url": "Imported File",
-                "is_verified": False,
-                "user_id": current_user.id
-            }
-            new_contacts.append(ScrapedContact(**contact_data))
-            existing_emails.add(email)
-            imported_count += 1
-            
-        if new_contacts:
-            db.add_all(new_contacts)
-            await db.commit()
-            
-        return {"imported": imported_count, "skipped": skipped_count}
-        
+        first = await asyncio.to_thread(next, chunks, None)
+    except Exception as e:
+        logger.error(f"Contact import failed to read {filename}: {e}")
+        raise HTTPException(status_code=400, detail=f"Could not read file: {e}")
+    cols = contact_import.resolve_columns(first.columns) if first is not None else None
+    if not cols:
+        raise HTTPException(status_code=400, detail="Could not find an 'Email' column in the uploaded file.")
+
+    async def run():
+        stats = contact_import.ImportStats()
+        seen: set = set()
+        df = first
+        while df is not None:
+            valid = contact_import.normalize_chunk(df, cols, stats.rows + 2, seen, stats)
+            stats.rows += len(df)
+            inserted = await contact_import.write_chunk(db, valid, current_user.id, "Imported File")
+            yield contact_import.record_chunk_result(valid, inserted, stats)
+            df = await asyncio.to_thread(next, chunks, None)
+        logger.info(
+            f"User {current_user.id} imported {filename}: {stats.rows} rows, "
+            f"{stats.imported} new, {stats.skipped} existing, {stats.rejected} rejected"
+        )
+        yield stats.as_dict()
+
+    if stream:
+        async def generate():
+            try:
+                async for progress in run():
+                    yield json.dumps(progress) + "\n"
+            except Exception as e:
+                logger.error(f"Contact import failed: {e}")
+                yield json.dumps({"error": str(e)}) + "\n"
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+    try:
+        summary = None
+        async for summary in run():
+            pass
+        return summary
     except Exception as e:
         logger.error(f"Contact import failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/export")
 async def export_contacts(
+    format: str = "csv",
+    search: Optional[str] = None,
+    scope: str = "global",
     db: AsyncSession = Depends(deps.get_personal_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
-    """Export all contacts as CSV"""
-    res = await db.execute(select(ScrapedContact).order_by(ScrapedContact.created_at.desc()))
-    contacts = res.scalars().all()
-    
-    stream = io.StringIO()
-    writer = csv.writer(stream)
-    writer.writerow(["Name", "Email", "Role", "Company", "Verified", "Date Added"])
-    
-    for c in contacts:
-        writer.writerow([
-            c.name or "", 
-            c.email, 
-            c.role or "", 
-            c.company or "", 
-            "Yes" if c.is_verified else "No",
-            c.created_at.strftime("%Y-%m-%d") if c.created_at else ""
-        ])
-        
-    response = StreamingResponse(iter([stream.getvalue()]), media_type="text/csv")
-    response.headers["Content-Disposition"] = f"attachment; filename=contacts_export_{datetime.now().strftime('%Y%m%d')}.csv"
-    return response
+    """Stream contacts as CSV, NDJSON or Parquet. Accepts the same filters as the list endpoint."""
+    stmt = select_columns(CONTACT_EXPORT_COLUMNS).order_by(ScrapedContact.created_at.desc())
+    filters = await _contact_filters(db, search, scope, current_user)
+    if filters:
+        stmt = stmt.where(*filters)
+    return export_response(db, stmt, CONTACT_EXPORT_COLUMNS, format, "contacts")
@@ -1,12 +1,20 @@
 import re
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import codecs
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any
 from loguru import logger
 
 from app.api import deps
 from app.db.models.user import User
+from app.db.models.contact import ScrapedContact
 from app.schemas.extract import ExtractRequest, ExtractResponse, ExtractedEntity
 from app.services.spiders import get_nlp, is_job_title
+from app.services.keyword_scanner import KeywordScanner
 
 router = APIRouter()
 
@@ -25,6 +33,7 @@ _ROLE_KEYWORDS = frozenset({
     "staff", "professor", "researcher", "product", "program", "marketing",
     "sales", "executive", "officer", "talent", "acquisition",
 })
+_ROLE_SCANNER = KeywordScanner({"role": _ROLE_KEYWORDS})
 
 _EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
 
@@ -113,22 +122,16 @@ def _calculate_confidence(email: str, name: str, company: str, role: str) -> flo
     return round(min(score, 1.0), 2)
 
 
-@router.post("/", response_model=ExtractResponse)
-async def extract_from_text(
-    *,
-    req: ExtractRequest,
-    current_user: User = Depends(deps.get_current_active_user)
-) -> Any:
-    """
-    Universal text extractor supporting multiple delimiter formats:
-    tab, pipe, comma, multi-space, and unstructured text.
-    
-    Uses email as an anchor point and infers surrounding columns.
-    Falls back to spaCy NLP for unstructured text.
-    """
-    raw_lines = req.text.strip().split('\n')
-    
-    # Filter header rows and empty lines
+_HEADER_PREFIXES = ('email\t', 'email,', 'email|', 'email name', 'name\t', 'name,')
+_HEADER_WORDS = frozenset({'email', 'name', 'company', 'role', 'title'})
+
+# Bulk mode: lines handed to the parser (and spaCy) per batch, and NER batch size
+BULK_CHUNK_LINES = 500
+NER_BATCH_SIZE = 256
+
+
+def _clean_lines(raw_lines) -> list[str]:
+    """Drop empty lines and common header rows."""
     lines = []
     for L in raw_lines:
         stripped = L.strip()
@@ -136,24 +139,123 @@ async def extract_from_text(
             continue
         lower = stripped.lower()
         # Skip common header patterns
-        if any(lower.startswith(h) for h in ['email\t', 'email,', 'email|', 'email name', 'name\t', 'name,']):
-            continue
-        if lower in ('email', 'name', 'company', 'role', 'title'):
+        if lower.startswith(_HEADER_PREFIXES) or lower in _HEADER_WORDS:
             continue
         lines.append(stripped)
-    
-    entities = []
-    seen_emails: set[str] = set()
-    nlp = get_nlp()
-    
-    # Auto-detect delimiter from the first few lines that contain emails
-    detected_delimiter = None
+    return lines
+
+
+def _detect_line_delimiter(lines: list[str]) -> str | None:
+    """Auto-detect the delimiter from the first few lines that contain emails."""
     for line in lines[:10]:
         if _EMAIL_RE.search(line):
-            detected_delimiter = _detect_delimiter(line)
-            if detected_delimiter:
+            delimiter = _detect_delimiter(line)
+            if delimiter:
+                return delimiter
+    return None
+
+
+def _parse_columns(line: str, email: str, delimiter: str | None) -> tuple[str, str, str]:
+    """Assign name/company/role from the line's columns using content heuristics."""
+    name = ""
+    company = ""
+    role = ""
+    
+    # Split line into parts using auto-detected delimiter
+    parts = _split_line(line, delimiter)
+    
+    if len(parts) >= 2:
+        # Find which part contains the email
+        email_idx = -1
+        for i, p in enumerate(parts):
+            if email in p.lower():
+                email_idx = i
                 break
+        
+        if email_idx != -1:
+            # Gather non-email parts
+            other_parts = [p for i, p in enumerate(parts) if i != email_idx and p.strip()]
+            
+            # Use heuristics to assign fields based on content analysis
+            for part in other_parts:
+                part_clean = part.strip()
+                if not part_clean:
+                    continue
+                
+                # Check if this part looks like a role
+                if not role and _ROLE_SCANNER.contains_any(part_clean.lower()):
+                    role = part_clean
+                    continue
+                
+                # Check if this part looks like a company (usually title-case or all-caps, no spaces like names)
+                # Companies tend to have fewer spaces/words than names
+                if not company and not _is_garbage_company(part_clean):
+                    # Heuristic: if it's one word or contains Inc/LLC/Ltd/Corp, it's a company
+                    if any(x in part_clean for x in ["Inc", "LLC", "Ltd", "Corp", "Co.", "GmbH", "Technologies", "Solutions"]):
+                        company = part_clean
+                        continue
+                
+                # Default: assign to name first, then company, then role
+                if not name and not _is_garbage_name(part_clean):
+                    name = part_clean
+                elif not company and not _is_garbage_company(part_clean):
+                    company = part_clean
+                elif not role:
+                    role = part_clean
+    return name, company, role
+
+
+def _build_entity(line: str, email: str, name: str, company: str, role: str, doc=None) -> ExtractedEntity | None:
+    """Apply NER results and fallbacks; returns None when the line is not a usable lead."""
+    # NLP fallback for missing fields
+    if doc is not None:
+        for ent in doc.ents:
+            if ent.label_ == "PERSON" and not name:
+                candidate = ent.text.strip()
+                if '@' not in candidate and not _is_garbage_name(candidate):
+                    name = candidate
+            elif ent.label_ == "ORG" and not company:
+                candidate = ent.text.strip()
+                if not _is_garbage_company(candidate):
+                    company = candidate
     
+    # Role detection fallback
+    if not role:
+        role = _detect_role_from_text(line)
+    
+    # Company fallback from email domain
+    if not company:
+        company = _extract_company_from_domain(email)
+    
+    # Must have at least email + company to be a useful lead
+    if not company:
+        return None
+    
+    # Final cleanup
+    name = name.strip() if name else None
+    company = company.strip()
+    role = role.strip() if role else None
+    
+    confidence = _calculate_confidence(email, name or "", company, role or "")
+    
+    return ExtractedEntity(
+        type="contact",
+        confidence=confidence,
+        data={
+            "email": email,
+            "name": name,
+            "company": company,
+            "role": role,
+        }
+    )
+
+
+def _extract_entities(lines: list[str], delimiter: str | None, seen_emails: set[str]) -> list[ExtractedEntity]:
+    """
+    Extract contacts from a batch of lines. Column heuristics run first; only the lines
+    still missing a name or company go through spaCy, in a single nlp.pipe() call.
+    """
+    pending = []  # (line, email, name, company, role)
     for line in lines:
         email_match = _EMAIL_RE.search(line)
         if not email_match:
@@ -166,98 +268,137 @@ async def extract_from_text(
             continue
         seen_emails.add(email)
         
-        name = ""
-        company = ""
-        role = ""
-        
-        # Split line into parts using auto-detected delimiter
-        parts = _split_line(line, detected_delimiter)
-        
-        if len(parts) >= 2:
-            # Find which part contains the email
-            email_idx = -1
-            for i, p in enumerate(parts):
-                if email in p.lower():
-                    email_idx = i
-                    break
-            
-            if email_idx != -1:
-                # Gather non-email parts
-                other_parts = [p for i, p in enumerate(parts) if i != email_idx and p.strip()]
-                
-                # Use heuristics to assign fields based on content analysis
-                for part in other_parts:
-                    part_clean = part.strip()
-                    if not part_clean:
-                        continue
-                    
-                    # Check if this part looks like a role
-                    if not role and any(kw in part_clean.lower() for kw in _ROLE_KEYWORDS):
-                        role = part_clean
-                        continue
-                    
-                    # Check if this part looks like a company (usually title-case or all-caps, no spaces like names)
-                    # Companies tend to have fewer spaces/words than names
-                    if not company and not _is_garbage_company(part_clean):
-                        # Heuristic: if it's one word or contains Inc/LLC/Ltd/Corp, it's a company
-                        if any(x in part_clean for x in ["Inc", "LLC", "Ltd", "Corp", "Co.", "GmbH", "Technologies", "Solutions"]):
-                            company = part_clean
-                            continue
-                    
-                    # Default: assign to name first, then company, then role
-                    if not name and not _is_garbage_name(part_clean):
-                        name = part_clean
-                    elif not company and not _is_garbage_company(part_clean):
-                        company = part_clean
-                    elif not role:
-                        role = part_clean
-        
-        # NLP fallback for missing fields
-        if not name or not company:
-            try:
-                doc = nlp(line)
-                for ent in doc.ents:
-                    if ent.label_ == "PERSON" and not name:
-                        candidate = ent.text.strip()
-                        if '@' not in candidate and not _is_garbage_name(candidate):
-                            name = candidate
-                    elif ent.label_ == "ORG" and not company:
-                        candidate = ent.text.strip()
-                        if not _is_garbage_company(candidate):
-                            company = candidate
-            except Exception:
-                pass
-        
-        # Role detection fallback
-        if not role:
-            role = _detect_role_from_text(line)
-        
-        # Company fallback from email domain
-        if not company:
-            company = _extract_company_from_domain(email)
-        
-        # Must have at least email + company to be a useful lead
-        if not company:
-            continue
-        
-        # Final cleanup
-        name = name.strip() if name else None
-        company = company.strip()
-        role = role.strip() if role else None
-        
-        confidence = _calculate_confidence(email, name or "", company, role or "")
-        
-        entities.append(
-            ExtractedEntity(
-                type="contact",
-                confidence=confidence,
-                data={
-                    "email": email,
-                    "name": name,
-                    "company": company,
-                    "role": role,
-                }
-            )
-        )
+        name, company, role = _parse_columns(line, email, delimiter)
+        pending.append((line, email, name, company, role))
+    
+    needs_ner = [i for i, (_, _, name, company, _) in enumerate(pending) if not name or not company]
+    docs = {}
+    if needs_ner:
+        try:
+            nlp = get_nlp()
+            texts = (pending[i][0] for i in needs_ner)
+            docs = dict(zip(needs_ner, nlp.pipe(texts, batch_size=NER_BATCH_SIZE)))
+        except Exception as e:
+            logger.warning(f"Batched NER failed, continuing with heuristics only: {e}")
+    
+    entities = []
+    for i, (line, email, name, company, role) in enumerate(pending):
+        entity = _build_entity(line, email, name, company, role, docs.get(i))
+        if entity:
+            entities.append(entity)
+    return entities
+
 
+@router.post("/", response_model=ExtractResponse)
+async def extract_from_text(
+    *,
+    req: ExtractRequest,
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Universal text extractor supporting multiple delimiter formats:
+    tab, pipe, comma, multi-space, and unstructured text.
+    
+    Uses email as an anchor point and infers surrounding columns.
+    Falls back to spaCy NLP for unstructured text.
+    """
+    lines = _clean_lines(req.text.strip().split('\n'))
+    delimiter = _detect_line_delimiter(lines)
+    entities = await asyncio.to_thread(_extract_entities, lines, delimiter, set())
     return ExtractResponse(entities=entities)
+
+
+async def _iter_upload_lines(file: UploadFile):
+    """Yield decoded lines from an upload without reading it into memory at once."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    carry = ""
+    while True:
+        chunk = await file.read(64 * 1024)
+        if not chunk:
+            break
+        carry += decoder.decode(chunk)
+        *complete, carry = carry.split("\n")
+        for line in complete:
+            yield line
+    carry += decoder.decode(b"", final=True)
+    if carry:
+        yield carry
+
+
+async def _save_contacts(db: AsyncSession, entities: list[ExtractedEntity], user_id: int) -> int:
+    """Insert extracted contacts in one statement; existing emails are skipped. Returns rows inserted."""
+    if not entities:
+        return 0
+    rows = [
+        {**e.data, "source_url": "Bulk Extract", "is_verified": False, "user_id": user_id}
+        for e in entities
+    ]
+    stmt = pg_insert(ScrapedContact).values(rows).on_conflict_do_nothing(index_elements=["email"]).returning(ScrapedContact.id)
+    result = await db.execute(stmt)
+    inserted = len(result.scalars().all())
+    await db.commit()
+    return inserted
+
+
+@router.post("/bulk")
+async def extract_bulk(
+    file: UploadFile | None = File(None),
+    text: str | None = Form(None),
+    save: bool = Form(False),
+    db: AsyncSession = Depends(deps.get_personal_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    Bulk extraction for large pasted lists or uploaded text/CSV files.
+    
+    Lines are processed in chunks and results are streamed back as NDJSON (one
+    ExtractedEntity per line) as each chunk finishes. With `save=true`, accepted contacts
+    are inserted into ScrapedContact as they are produced. The final line is a summary
+    object with `"type": "summary"`.
+    """
+    if file is None and not text:
+        raise HTTPException(status_code=400, detail="Provide either a file or text.")
+
+    async def raw_lines():
+        if file is not None:
+            async for line in _iter_upload_lines(file):
+                yield line
+        else:
+            for line in text.split("\n"):
+                yield line
+
+    async def generate():
+        seen_emails: set[str] = set()
+        delimiter = None
+        delimiter_known = False
+        total_lines = extracted = saved = 0
+        batch: list[str] = []
+
+        async def flush(lines):
+            nonlocal delimiter, delimiter_known, extracted, saved
+            lines = _clean_lines(lines)
+            if not delimiter_known:
+                delimiter = _detect_line_delimiter(lines)
+                delimiter_known = delimiter is not None or any(_EMAIL_RE.search(l) for l in lines)
+            # spaCy and the heuristics are CPU-bound; keep them off the event loop
+            entities = await asyncio.to_thread(_extract_entities, lines, delimiter, seen_emails)
+            extracted += len(entities)
+            if save:
+                saved += await _save_contacts(db, entities, current_user.id)
+            return entities
+
+        async for line in raw_lines():
+            total_lines += 1
+            batch.append(line)
+            if len(batch) >= BULK_CHUNK_LINES:
+                for entity in await flush(batch):
+                    yield entity.model_dump_json() + "\n"
+                batch = []
+        if batch:
+            for entity in await flush(batch):
+                yield entity.model_dump_json() + "\n"
+
+        logger.info(f"User {current_user.id} bulk extract: {total_lines} lines, {extracted} contacts, {saved} saved")
+        yield json.dumps({"type": "summary", "lines": total_lines, "extracted": extracted, "saved": saved}) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -1,5 +1,5 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
@@ -7,6 +7,7 @@ from sqlalchemy.orm import selectinload
 from app.api import deps
 from app.db.models.user import User
 from app.db.models.feedback import Feedback, FeedbackComment
+from app.services.pagination import fetch_page
 from app.schemas.feedback import (
     FeedbackCreate,
     FeedbackRead,
@@ -19,35 +20,32 @@ router = APIRouter()
 
 @router.get("/", response_model=List[FeedbackRead])
 async def read_feedbacks(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     status: Optional[str] = None,
     sort_by: str = Query("latest", regex="^(latest|upvotes)$"),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
-    """Retrieve feedbacks, filtered by status."""
-    stmt = select(Feedback).options(selectinload(Feedback.user))
+    """
+    Retrieve feedbacks, filtered by status. The response stays a plain list; when more
+    pages exist the `X-Next-Cursor` header carries the token to pass back as `cursor`.
+    """
+    # Comments are loaded with the page for the comment count (one extra IN query, not a re-query)
+    stmt = select(Feedback).options(selectinload(Feedback.user), selectinload(Feedback.comments))
     if status in ["Active", "Closed"]:
         stmt = stmt.where(Feedback.status == status)
 
     if sort_by == "upvotes":
-        stmt = stmt.order_by(Feedback.upvotes.desc(), Feedback.created_at.desc())
+        key_columns = (Feedback.upvotes, Feedback.created_at, Feedback.id)
     else:
-        stmt = stmt.order_by(Feedback.created_at.desc())
+        key_columns = (Feedback.created_at, Feedback.id)
 
-    stmt = stmt.offset(skip).limit(limit)
-    res = await db.execute(stmt)
-    feedbacks = res.scalars().all()
-    
-    # Map user data + manual comment count (without requiring a tricky subquery for now, or we can just count len(comments))
-    # Eager loading comments just for count is expensive, but for now we do a simple map. 
-    # Better: load with selectinload(Feedback.comments) and get len
-    
-    # We'll re-query with comments for count
-    stmt = stmt.options(selectinload(Feedback.comments))
-    res = await db.execute(stmt)
-    feedbacks = res.scalars().all()
+    feedbacks, next_cursor = await fetch_page(db, stmt, key_columns, limit=limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     results = []
     for f in feedbacks:
@@ -1,16 +1,22 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from loguru import logger
+from redis.exceptions import RedisError
 
 from app.api import deps
 from app.db.models.user import User
 from app.db.models.job_posting import JobPosting
-from app.schemas.job import JobPostingCreate, JobPostingRead, JobMatchResult, JobPostingList
-from sqlalchemy import func
+from app.db.models.setting import UserSetting
+from app.schemas.job import JobPostingCreate, JobPostingRead, JobMatchResult, JobPostingList, JobSearchResults, StoredJobMatchList
 from app.services.job_ingestion import ManualJobAdapter
 from app.services.matching_engine import find_best_resume_for_job
+from app.services import match_store, job_events
+from app.services.exporter import ExportColumn, export_response, select_columns
+from app.services.pagination import paginate
+from app.services.job_search import JobSearchFilters, search_jobs
 
 router = APIRouter()
 
@@ -18,19 +24,91 @@ router = APIRouter()
 async def list_all_jobs(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    exact: bool = False,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
-    """Returns all jobs from the global database, newest first."""
-    count_stmt = select(func.count(JobPosting.id))
-    count_res = await db.execute(count_stmt)
-    total = count_res.scalar() or 0
+    """Returns all jobs from the global database, newest first. Pass `next_cursor` back as `cursor` to page."""
+    page = await paginate(db, JobPosting, limit=limit, cursor=cursor, skip=skip, exact=exact)
+    return page.as_dict()
 
-    result = await db.execute(
-        select(JobPosting).order_by(JobPosting.created_at.desc()).offset(skip).limit(limit)
+@router.get("/search", response_model=JobSearchResults)
+async def search_all_jobs(
+    q: str = Query(..., min_length=1, max_length=256),
+    company: Optional[str] = None,
+    location: Optional[str] = None,
+    source: Optional[str] = None,
+    posted_after: Optional[datetime] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """Hybrid full-text + semantic job search, e.g. `q=staff backend remote rust`."""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query must not be blank.")
+    filters = JobSearchFilters(company=company, location=location, source=source, posted_after=posted_after)
+    hits, total = await search_jobs(db, q, filters, limit=limit, skip=skip)
+    return {"query": q, "items": [hit.as_dict() for hit in hits], "total": total}
+
+@router.get("/matches", response_model=StoredJobMatchList)
+async def list_best_matches(
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    resume_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """
+    The current user's stored job matches, best first. Defaults to the user's
+    `match_threshold` setting; pass `next_cursor` back as `cursor` to page.
+    """
+    if min_score is None:
+        user_settings = (await db.execute(
+            select(UserSetting).where(UserSetting.user_id == current_user.id)
+        )).scalars().first()
+        min_score = user_settings.match_threshold if user_settings and user_settings.match_threshold is not None else 70.0
+    items, next_cursor = await match_store.best_matches(
+        db, current_user.id, min_score, limit=limit, cursor=cursor, resume_id=resume_id
     )
-    items = result.scalars().all()
-    return {"items": items, "total": total}
+    return {"items": items, "min_score": min_score, "next_cursor": next_cursor}
+
+@router.get("/events/metrics")
+async def job_event_metrics(
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """Ingestion stream health: consumer-group lag, pending entries and dead letters."""
+    client = job_events.redis_client()
+    try:
+        return await job_events.stream_metrics(client)
+    except RedisError as e:
+        raise HTTPException(status_code=503, detail=f"Job event stream unavailable: {e}")
+    finally:
+        await client.aclose()
+
+JOB_EXPORT_COLUMNS = [
+    ExportColumn("ID", JobPosting.id, kind="int"),
+    ExportColumn("Title", JobPosting.title),
+    ExportColumn("Company", JobPosting.company),
+    ExportColumn("Location", JobPosting.location),
+    ExportColumn("Source", JobPosting.source),
+    ExportColumn("Source URL", JobPosting.source_url),
+    ExportColumn("External ID", JobPosting.external_id),
+    ExportColumn("Description", JobPosting.description),
+    ExportColumn("Created At", JobPosting.created_at, kind="timestamp"),
+]
+
+@router.get("/export")
+async def export_jobs(
+    format: str = "csv",
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """Stream the global job table as CSV, NDJSON or Parquet, newest first."""
+    stmt = select_columns(JOB_EXPORT_COLUMNS).order_by(JobPosting.created_at.desc())
+    return export_response(db, stmt, JOB_EXPORT_COLUMNS, format, "jobs")
 
 @router.post("/ingest/manual", response_model=List[JobPostingRead])
 async def ingest_manual_job(
@@ -56,6 +134,7 @@ async def ingest_manual_job(
             company=processed["company"],
             description=processed["description"],
             embedding=processed["embedding"],
+            embedding_model=processed["embedding_model"],
             metadata_json=processed["metadata_json"]
         )
         db.add(db_job)
@@ -64,6 +143,8 @@ async def ingest_manual_job(
         saved_jobs.append(db_job)
         
         logger.info(f"Ingested Job {db_job.id} - {db_job.title} at {db_job.company}")
+
+    await job_events.announce_jobs(db, [job.id for job in saved_jobs], "manual")
         
     return saved_jobs
 
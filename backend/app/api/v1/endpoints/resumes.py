@@ -1,26 +1,25 @@
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from loguru import logger
-import asyncio
-import os
-from pathlib import Path
+from urllib.parse import quote
 
 from app.api import deps
 from app.core.config import settings
 from app.db.models.user import User
 from app.db.models.resume import Resume
 from app.schemas.resume import ResumeRead, ResumeList, ResumeUpdate
-from app.worker.tasks import process_resume_async
-from app.services.task_registry import register_task, cancel_user_tasks
+from app.worker.celery_app import EMBED_CPU
+from app.worker.tasks import process_resume_task, enqueue_interactive, queued_count
+from app.services.task_registry import cancel_user_tasks, get_user_tasks
+from app.services.blob_store import get_blob_store, BlobTooLarge
+from app.services.resume_files import ensure_resume_blob, release_resume_blob, MEDIA_TYPES
+from app.services.pagination import paginate
 
 router = APIRouter()
 
-# Standardize directories from central config
-UPLOAD_DIR = settings.UPLOAD_DIR
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 ALLOWED_EXTENSIONS = {"pdf", "docx", "doc", "txt", "md"}
 
 @router.post("/upload", response_model=ResumeRead, status_code=202)
@@ -34,45 +33,42 @@ async def upload_resume(
     ext = file.filename.split(".")[-1].lower() if file.filename else ""
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail=f"Unsupported file extension: {ext}")
-        
+
+    # Push back before accepting the file if the extraction queue is already saturated
+    if await queued_count(EMBED_CPU) >= settings.RESUME_QUEUE_MAX_DEPTH:
+        raise HTTPException(status_code=503, detail="Resume processing queue is full. Try again shortly.")
     
-    file_bytes = await file.read()
+    # Stream the upload into the blob store chunk by chunk (hashing and size-capping as it goes)
+    # so memory stays flat regardless of file size; the row only keeps the reference and size
+    try:
+        blob_key, file_size = await get_blob_store().put_upload(file, settings.MAX_UPLOAD_BYTES)
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
-    if len(file_bytes) == 0:
+    if file_size == 0:
         raise HTTPException(status_code=400, detail="Uploaded file is empty (0 bytes).")
-    
-    # Create pending DB record with file bytes stored in-database
+
     new_resume = Resume(
         user_id=current_user.id,
         filename=file.filename,
         format=ext,
         label=label,
         status="pending",
-        file_data=file_bytes
+        blob_key=blob_key,
+        file_size=file_size,
     )
     db.add(new_resume)
     await db.commit()
     await db.refresh(new_resume)
+    logger.info(f"Resume {new_resume.id}: stored {file_size} bytes as blob {blob_key[:12]}")
     
-    # Verify file_data persistence
-    file_data_size = len(new_resume.file_data) if new_resume.file_data else 0
-    if file_data_size == 0:
-        logger.error(f"Resume {new_resume.id}: file_data NOT persisted despite {len(file_bytes)} bytes uploaded!")
-    else:
-        logger.info(f"Resume {new_resume.id}: file_data persisted ({file_data_size} bytes)")
-    
-    # Save file physically to container volume as backup
-    file_path = UPLOAD_DIR / f"{new_resume.id}_{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(file_bytes)
-    
-    # Run directly in the current event loop (non-blocking)
-    task = asyncio.create_task(
-        process_resume_async(new_resume.id, file_bytes, file.filename)
+    # Parsing and embedding run on the embed-cpu workers, ahead of batch work there
+    task_id = await enqueue_interactive(
+        process_resume_task, current_user.id, "resume_extraction",
+        new_resume.id, file.filename, current_user.id, label=f"resume:{new_resume.id}",
     )
-    task_id = register_task(current_user.id, "resume_extraction", task)
     
-    logger.info(f"User {current_user.id} uploaded resume {new_resume.id}. Task {task_id} started.")
+    logger.info(f"User {current_user.id} uploaded resume {new_resume.id}. Task {task_id} queued.")
     
     return new_resume
 
@@ -81,26 +77,72 @@ async def stop_resume_processing(
     current_user: User = Depends(deps.get_current_active_user)
 ):
     """Stop all running resume processing tasks for the current user."""
-    count = cancel_user_tasks(current_user.id, task_type="resume_extraction")
+    count = await cancel_user_tasks(current_user.id, task_type="resume_extraction")
     return {"message": f"Stopped {count} resume processing task(s).", "cancelled": count}
 
+@router.get("/processing")
+async def resume_processing_status(
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Extraction jobs for the current user (queued, running and recently finished) plus queue load."""
+    jobs = await get_user_tasks(current_user.id, task_type="resume_extraction")
+    return {"jobs": jobs, "queue": {"name": EMBED_CPU, "waiting": await queued_count(EMBED_CPU)}}
+
+@router.get("/{resume_id}/status")
+async def resume_status(
+    resume_id: int,
+    db: AsyncSession = Depends(deps.get_personal_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """Lightweight progress poll for a single resume."""
+    res = await db.execute(select(Resume.status).where(Resume.id == resume_id, Resume.user_id == current_user.id))
+    status = res.scalar()
+    if status is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    jobs = [j for j in await get_user_tasks(current_user.id, task_type="resume_extraction") if j["label"] == f"resume:{resume_id}"]
+    return {"resume_id": resume_id, "status": status, "job": jobs[-1] if jobs else None}
+
 @router.get("/", response_model=ResumeList)
 async def list_resumes(
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    exact: bool = False,
     db: AsyncSession = Depends(deps.get_personal_db),
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     """Get all resumes for the current user."""
-    count_stmt = select(func.count(Resume.id)).where(Resume.user_id == current_user.id)
-    count_res = await db.execute(count_stmt)
-    total = count_res.scalar() or 0
-    
-    stmt = select(Resume).where(Resume.user_id == current_user.id).offset(skip).limit(limit).order_by(Resume.created_at.desc())
-    res = await db.execute(stmt)
-    items = res.scalars().all()
-    
-    return {"items": items, "total": total}
+    page = await paginate(
+        db, Resume, [Resume.user_id == current_user.id],
+        limit=limit, cursor=cursor, skip=skip, exact=exact,
+    )
+    return page.as_dict()
+
+@router.get("/{resume_id}/download")
+async def download_resume(
+    resume_id: int,
+    db: AsyncSession = Depends(deps.get_personal_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """Stream the original resume file back from the blob store."""
+    res = await db.execute(select(Resume).where(Resume.id == resume_id, Resume.user_id == current_user.id))
+    resume = res.scalars().first()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    blob_key = await ensure_resume_blob(db, resume)
+    if not blob_key:
+        raise HTTPException(status_code=404, detail="Resume file data is unavailable. Re-upload the resume.")
+    await db.commit()
+
+    headers = {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(resume.filename)}"}
+    if resume.file_size:
+        headers["Content-Length"] = str(resume.file_size)
+    return StreamingResponse(
+        get_blob_store().iter_chunks(blob_key),
+        media_type=MEDIA_TYPES.get(resume.format, "application/octet-stream"),
+        headers=headers,
+    )
 
 @router.post("/{resume_id}/extract-to-profile")
 async def extract_resume_to_profile(
@@ -173,8 +215,10 @@ async def delete_resume(
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
+    blob_key = resume.blob_key
     await db.delete(resume)
     await db.commit()
+    await release_resume_blob(db, blob_key)
     
     logger.info(f"User {current_user.id} deleted resume {resume_id}")
     return {"message": "Resume deleted successfully."}
@@ -3,8 +3,6 @@ from app.core.encryption import decrypt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from loguru import logger
-import asyncio
-import re
 
 from app.api import deps
 from app.db.models.user import User
@@ -14,9 +12,11 @@ from app.db.models.resume import Resume
 from app.db.models.email_template import EmailTemplate
 from app.db.models.setting import UserSetting
 from app.schemas.contact import ScrapedContactRead
-from app.schemas.scraper import ScraperJobRequest, ColdMailDispatchRequest
-from app.worker.tasks import run_scraping_agent_async
-from app.services.task_registry import register_task, cancel_user_tasks, get_running_tasks
+from app.schemas.scraper import ScraperJobRequest, ColdMailDispatchRequest, ColdMailBulkPreviewRequest
+from app.worker.tasks import run_scraping_agent_task, run_cold_mail_task, enqueue_interactive
+from app.services.task_registry import cancel_user_tasks, get_running_tasks
+from app.services.resume_files import ensure_resume_blob
+from app.services.template_engine import build_value_map, get_compiled, TemplateSyntaxError
 
 router = APIRouter()
 
@@ -27,7 +27,7 @@ async def trigger_scraper(
     current_user: User = Depends(deps.get_current_active_user)
 ):
     """
-    Trigger the scraping agent. Runs directly in FastAPI's event loop.
+    Trigger the scraping agent. Queued on the scrape-io workers ahead of scheduled crawls.
     """
     if req.target_type not in ["jobs", "contacts"]:
         raise HTTPException(status_code=400, detail="Invalid target type. Must be 'jobs' or 'contacts'.")
@@ -38,10 +38,10 @@ async def trigger_scraper(
 
     logger.info(f"User {current_user.email} triggered scraper for {req.target_url} ({req.target_type})")
     
-    task = asyncio.create_task(
-        run_scraping_agent_async(current_user.id, req.target_url, req.target_type, req.keywords)
+    task_id = await enqueue_interactive(
+        run_scraping_agent_task, current_user.id, "scraper",
+        current_user.id, req.target_url, req.target_type, req.keywords, label=req.target_url,
     )
-    task_id = register_task(current_user.id, "scraper", task)
     
     return {"message": "Scraper started. Check Logs for real-time progress.", "task_id": task_id}
 
@@ -50,7 +50,7 @@ async def stop_scraper(
     current_user: User = Depends(deps.get_current_active_user)
 ):
     """Stop all running scraper tasks for the current user."""
-    count = cancel_user_tasks(current_user.id, task_type="scraper")
+    count = await cancel_user_tasks(current_user.id, task_type="scraper")
     return {"message": f"Stopped {count} running scraper task(s).", "cancelled": count}
 
 @router.get("/status")
@@ -58,7 +58,7 @@ async def scraper_status(
     current_user: User = Depends(deps.get_current_active_user)
 ):
     """Get running tasks for current user."""
-    tasks = get_running_tasks(current_user.id)
+    tasks = await get_running_tasks(current_user.id)
     return {"running_tasks": tasks}
 
 @router.get("/contacts", response_model=list[ScrapedContactRead])
@@ -100,11 +100,10 @@ async def dispatch_cold_mail(
     contact = (await db.execute(stmt)).scalars().first()
     if not contact: raise HTTPException(404, "Collaborative Contact not found")
     
-    from app.worker.tasks import run_cold_mail_async
-    task = asyncio.create_task(
-        run_cold_mail_async(current_user.id, req.contact_id, req.template_id, req.resume_id, req.attach_resume)
+    task_id = await enqueue_interactive(
+        run_cold_mail_task, current_user.id, "cold_mail",
+        current_user.id, req.contact_id, req.template_id, req.resume_id, attach_resume=req.attach_resume,
     )
-    task_id = register_task(current_user.id, "cold_mail", task)
     return {"message": f"Cold Mail Agent dispatched for {contact.email}.", "task_id": task_id}
 
 @router.post("/preview-mail")
@@ -126,45 +125,16 @@ async def preview_cold_mail(
     if not template: raise HTTPException(404, "Template not found")
     if not resume: raise HTTPException(404, "Resume not found")
 
-    resume_data = resume.parsed_json or {}
-    
-    raw_exp = resume_data.get("experience_years") or getattr(current_user, 'experience_years', "") or ""
-    exp_match = re.search(r'(\d+)', str(raw_exp))
-    exp_years = exp_match.group(1) if exp_match else ""
-
-    target_role = (resume_data.get("target_role") or getattr(settings, 'target_roles', "")).strip()
-
-    val_map = {
-        "contact_name": (contact.name or "").strip(),
-        "contact_role": (contact.role or "").strip(),
-        "job_title": target_role,
-        "company": (contact.company or "").strip(),
-        "experience_years": exp_years,
-        "skills": (resume_data.get("skills") or getattr(current_user, 'skills', "") or "").strip(),
-        "education": (resume_data.get("education") or getattr(current_user, 'education', "") or "").strip(),
-        "recent_role": (resume_data.get("recent_role") or "").strip(),
-        "top_projects": (resume_data.get("top_projects") or "").strip(),
-        "certifications": (resume_data.get("certifications") or "").strip(),
-        "linkedin": (current_user.linkedin_url or "").strip(),
-        "github": (current_user.github_url or "").strip(),
-        "portfolio": (getattr(current_user, 'portfolio_url', "") or "").strip(),
-        "user_name": (current_user.full_name or "").strip(),
-        "user_email": (current_user.email or "").strip(),
-        "user_phone": (current_user.phone or "").strip(),
-    }
-
-    def replace_tag(match):
-        tag_name = match.group(1).strip()
-        return str(val_map.get(tag_name, match.group(0)))
-
-    subject = re.sub(r'{{(.*?)}}', replace_tag, template.subject)
-    body = re.sub(r'{{(.*?)}}', replace_tag, template.body_text)
+    val_map = build_value_map(contact, resume, current_user, settings)
 
     # Collect warnings
     warnings = []
-    remaining_tags = re.findall(r'{{(.*?)}}', subject + "\n" + body)
-    if remaining_tags:
-        warnings.append(f"Unreplaced tags: {remaining_tags}")
+    try:
+        subject, body = get_compiled(template).render(val_map)
+    except TemplateSyntaxError as e:
+        # Preview still shows the raw template so the user can see what to fix
+        subject, body = template.subject, template.body_text
+        warnings.append(f"Invalid template: {e}")
     
     critical_fields = {"contact_name": "Contact Name", "company": "Company", "user_name": "Your Name", "job_title": "Target Role"}
     for key, label in critical_fields.items():
@@ -178,12 +148,9 @@ async def preview_cold_mail(
     # Check attachment availability
     has_attachment = False
     if req.attach_resume:
-        if getattr(resume, "file_data", None) and len(resume.file_data) > 0:
-            has_attachment = True
-        else:
-            from app.core.config import settings as app_settings
-            file_path = app_settings.UPLOAD_DIR / f"{resume.id}_{resume.filename}"
-            has_attachment = file_path.exists()
+        # Only checks the blob reference — the file itself is never loaded for a preview
+        has_attachment = bool(await ensure_resume_blob(db, resume))
+        await db.commit()
         if not has_attachment:
             warnings.append("Resume attachment requested but file data is unavailable. Re-upload the resume.")
 
@@ -196,3 +163,45 @@ async def preview_cold_mail(
         "recipient": contact.email,
     }
 
+@router.post("/preview-mail/bulk")
+async def preview_cold_mail_bulk(
+    req: ColdMailBulkPreviewRequest,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Render one template for many contacts in a single call. The template is compiled
+    once and every contact's value map is rendered against the same token list.
+    """
+    if len(req.contact_ids) > 1000:
+        raise HTTPException(400, "Preview at most 1000 contacts at a time.")
+
+    template = (await db.execute(select(EmailTemplate).where(EmailTemplate.id == req.template_id))).scalars().first()
+    resume = (await db.execute(select(Resume).where(Resume.id == req.resume_id))).scalars().first()
+    settings = (await db.execute(select(UserSetting).where(UserSetting.user_id == current_user.id))).scalars().first()
+
+    if not template: raise HTTPException(404, "Template not found")
+    if not resume: raise HTTPException(404, "Resume not found")
+
+    try:
+        compiled = get_compiled(template)
+    except TemplateSyntaxError as e:
+        raise HTTPException(400, f"Invalid template: {e}")
+
+    contacts = (await db.execute(select(ScrapedContact).where(ScrapedContact.id.in_(req.contact_ids)))).scalars().all()
+    value_maps = [build_value_map(c, resume, current_user, settings) for c in contacts]
+    rendered = compiled.render_batch(value_maps)
+
+    critical_fields = {"contact_name": "Contact Name", "company": "Company", "user_name": "Your Name"}
+    items = []
+    for contact, val_map, (subject, body) in zip(contacts, value_maps, rendered):
+        warnings = [f"Critical field empty: {label}" for key, label in critical_fields.items() if not val_map.get(key)]
+        items.append({
+            "contact_id": contact.id,
+            "recipient": contact.email,
+            "subject": subject,
+            "body": body,
+            "warnings": warnings,
+        })
+
+    return {"items": items, "total": len(items)}
@@ -10,7 +10,9 @@ from app.db.models.user import User
 from app.db.models.email_template import EmailTemplate
 from app.db.models.setting import UserSetting
 from app.schemas.email_template import EmailTemplateCreate, EmailTemplateRead, EmailTemplateUpdate, EmailTemplateList
-from sqlalchemy import func
+from app.services.template_engine import compile_template, TemplateSyntaxError
+from app.services.pagination import paginate
+from app.services import text_search
 
 router = APIRouter()
 
@@ -19,6 +21,13 @@ class TemplateOverrideRequest(BaseModel):
     subject: str
     body_text: str
 
+def _compile_or_400(subject: str, body_text: str) -> dict:
+    """Validate template tags at save time and return the token list to store on the row."""
+    try:
+        return compile_template(subject, body_text).to_json()
+    except TemplateSyntaxError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid template: {e}")
+
 class AITemplateRequest(BaseModel):
     purpose: str = "cold_outreach"
     tone: str = "professional"
@@ -38,11 +47,14 @@ async def create_template(
     res = await db.execute(select(EmailTemplate).where(EmailTemplate.name == template_in.name))
     if res.scalars().first():
         raise HTTPException(status_code=400, detail="Template with this name already exists")
+
+    compiled_tokens = _compile_or_400(template_in.subject, template_in.body_text)
         
     db_obj = EmailTemplate(
         name=template_in.name,
         subject=template_in.subject,
         body_text=template_in.body_text,
+        compiled_tokens=compiled_tokens,
         is_active=template_in.is_active,
         user_id=current_user.id
     )
@@ -57,26 +69,24 @@ async def list_templates(
     skip: int = 0,
     limit: int = 100,
     scope: str = "global",
+    search: Optional[str] = None,
+    sort: str = "recent",
+    cursor: Optional[str] = None,
+    exact: bool = False,
     current_user: User = Depends(deps.get_current_active_user)
 ) -> Any:
     filters = []
     if scope == "my":
         filters.append(EmailTemplate.user_id == current_user.id)
+    condition = await text_search.search_condition(db, EmailTemplate, search)
+    if condition is not None:
+        filters.append(condition)
 
-    count_stmt = select(func.count(EmailTemplate.id))
-    if filters:
-        count_stmt = count_stmt.where(*filters)
-        
-    count_res = await db.execute(count_stmt)
-    total = count_res.scalar() or 0
-
-    stmt = select(EmailTemplate).order_by(EmailTemplate.created_at.desc()).offset(skip).limit(limit)
-    if filters:
-        stmt = stmt.where(*filters)
-        
-    res = await db.execute(stmt)
-    items = res.scalars().all()
-    return {"items": items, "total": total}
+    if text_search.wants_relevance(sort, search):
+        page = await text_search.ranked_page(db, EmailTemplate, filters, search, limit=limit, skip=skip, exact=exact)
+        return page.as_dict()
+    page = await paginate(db, EmailTemplate, filters, limit=limit, cursor=cursor, skip=skip, exact=exact)
+    return page.as_dict()
 
 @router.put("/{template_id}", response_model=EmailTemplateRead)
 async def update_template(
@@ -94,6 +104,9 @@ async def update_template(
     update_data = template_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_obj, field, value)
+
+    if "subject" in update_data or "body_text" in update_data or not db_obj.compiled_tokens:
+        db_obj.compiled_tokens = _compile_or_400(db_obj.subject, db_obj.body_text)
         
     db.add(db_obj)
     await db.commit()
@@ -113,11 +126,14 @@ async def override_template(
     
     if not db_obj:
         raise HTTPException(status_code=404, detail="Template not found")
+
+    compiled_tokens = _compile_or_400(override_in.subject, override_in.body_text)
         
     if db_obj.user_id == current_user.id:
         # User owns it, just update
         db_obj.subject = override_in.subject
         db_obj.body_text = override_in.body_text
+        db_obj.compiled_tokens = compiled_tokens
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
@@ -144,6 +160,7 @@ async def override_template(
             name=new_name,
             subject=override_in.subject,
             body_text=override_in.body_text,
+            compiled_tokens=compiled_tokens,
             is_active=True,
             user_id=current_user.id
         )
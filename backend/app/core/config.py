@@ -79,6 +79,75 @@ class Settings(BaseSettings):
         path.mkdir(parents=True, exist_ok=True)
         return path
 
+    # Blob storage for uploaded files (content-addressed by SHA-256)
+    BLOB_STORAGE_BACKEND: str = "local"
+    BLOB_STORAGE_PATH: str | None = None
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024  # 10 MB per uploaded file
+
+    @property
+    def BLOB_STORAGE_DIR(self):
+        from pathlib import Path
+        if self.BLOB_STORAGE_PATH:
+            return Path(self.BLOB_STORAGE_PATH)
+        return self.BASE_DIR / "app" / "uploads" / "blobs"
+
+    # Resume parsing runs in a helper process per worker (services/resume_executor.py)
+    RESUME_EXECUTOR_TIMEOUT_SECONDS: float = 120.0
+
+    # Worker-side vector snapshot (memory-mapped .npy files shared by all worker processes)
+    VECTOR_SNAPSHOT_PATH: str | None = None
+    VECTOR_SNAPSHOT_DTYPE: str = "float32"  # or "float16" to halve snapshot memory
+
+    @property
+    def VECTOR_SNAPSHOT_DIR(self):
+        from pathlib import Path
+        if self.VECTOR_SNAPSHOT_PATH:
+            return Path(self.VECTOR_SNAPSHOT_PATH)
+        return self.BASE_DIR / "app" / "uploads" / "vector_snapshot"
+
+    # Sentence embedding model for jobs and resumes (must output 384-dim vectors).
+    # Changing it requires a re-embed: python -m app.worker.reembed
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+
+    # Re-embedding backfill throttle: fraction of wall time spent encoding, torch threads,
+    # and the Celery queue depth above which the backfill pauses for live work
+    REEMBED_DUTY_CYCLE: float = 0.5
+    REEMBED_THREADS: int = 1
+    REEMBED_MAX_QUEUE_DEPTH: int = 20
+
+    # Raw page archive for offline reparsing (services/page_archive.py)
+    PAGE_ARCHIVE_ENABLED: bool = True
+    PAGE_ARCHIVE_PATH: str | None = None
+    PAGE_ARCHIVE_RETENTION_DAYS: int = 30
+    PAGE_ARCHIVE_ZSTD_LEVEL: int = 9
+
+    @property
+    def PAGE_ARCHIVE_DIR(self):
+        from pathlib import Path
+        if self.PAGE_ARCHIVE_PATH:
+            return Path(self.PAGE_ARCHIVE_PATH)
+        return self.BASE_DIR / "app" / "uploads" / "page_archive"
+
+    # Adaptive recrawl scheduler (services/crawl_scheduler.py): the shortest interval a
+    # scrape URL adapts down to. The longest is the user's scrape_frequency_hours.
+    CRAWL_MIN_INTERVAL_MINUTES: int = 60
+
+    # Identical scrapes (same URL, target type and extraction tier) share one crawl; its
+    # extracted items are reused by later requests for this long (services/scrape_flight.py)
+    SCRAPE_FLIGHT_TTL_SECONDS: int = 300
+
+    # Celery worker processes per queue (app/worker/celery_app.py, app.worker.queue_worker)
+    CELERY_SCRAPE_IO_CONCURRENCY: int = 4
+    CELERY_EMBED_CPU_CONCURRENCY: int = 2
+    CELERY_LLM_IO_CONCURRENCY: int = 8
+    CELERY_MAIL_IO_CONCURRENCY: int = 4
+    # Resume uploads are refused (503) while this many tasks wait on the embed-cpu queue
+    RESUME_QUEUE_MAX_DEPTH: int = 20
+
+    # Job ingestion events (Redis Stream consumed by app.worker.job_matcher).
+    # Disable when no matcher process runs; ingest then scores matches inline.
+    JOB_EVENTS_ENABLED: bool = True
+
     # Google OAuth
     GOOGLE_CLIENT_ID: str | None = None
     GOOGLE_CLIENT_SECRET: str | None = None
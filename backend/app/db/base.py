@@ -8,3 +8,6 @@ from app.db.models.action_log import ActionLog  # noqa
 from app.db.models.email_template import EmailTemplate  # noqa
 from app.db.models.application import Application  # noqa
 from app.db.models.feedback import Feedback, FeedbackComment  # noqa
+from app.db.models.outreach import Outreach, OutreachDailyCounter  # noqa
+from app.db.models.match import JobResumeMatch  # noqa
+from app.db.models.crawl import CrawlTarget  # noqa
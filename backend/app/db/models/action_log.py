@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -15,3 +15,8 @@ class ActionLog(Base):
 
     # Relationship to user (optional, system-wide tasks might not have a specific user)
     user = relationship("User", backref="action_logs")
+
+    # Keyset pagination: newest-first page scans
+    __table_args__ = (
+        Index("ix_action_logs_user_created_at_id", "user_id", "created_at", "id"),
+    )
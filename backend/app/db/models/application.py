@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from app.db.base_class import Base
@@ -20,6 +22,10 @@ class Application(Base):
     status = Column(String, nullable=False, default="applied", index=True)
     
     notes = Column(Text, nullable=True)
+
+    # Set only on applications the job matcher creates: 'pending' until run_auto_apply_task
+    # has been sent for it, then 'sent' (see app/worker/job_matcher.py)
+    auto_dispatch = Column(String, nullable=True)
     
     # Enrichment fields for better tracking and sync
     contact_name = Column(String, nullable=True)
@@ -31,3 +37,22 @@ class Application(Base):
     applied_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Generated search columns (see services/text_search.py); notes are word-prefix only
+    search_text = deferred(Column(Text, Computed(
+        "lower(coalesce(company_name, '') || ' ' || coalesce(job_title, '') || ' ' || "
+        "coalesce(contact_name, '') || ' ' || coalesce(contact_email, '') || ' ' || coalesce(location, ''))",
+        persisted=True,
+    )))
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple'::regconfig, coalesce(company_name, '') || ' ' || coalesce(job_title, '') || ' ' || "
+        "coalesce(contact_name, '') || ' ' || coalesce(contact_email, '') || ' ' || coalesce(location, '')), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, coalesce(notes, '')), 'C')",
+        persisted=True,
+    )))
+
+    __table_args__ = (
+        Index("ix_applications_search_text_trgm", "search_text", postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}),
+        Index("ix_applications_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_applications_auto_dispatch_pending", "job_id", postgresql_where=text("auto_dispatch = 'pending'")),
+    )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.db.base_class import Base
 
 class ScrapedContact(Base):
@@ -25,4 +26,21 @@ class ScrapedContact(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Generated search columns (see services/text_search.py); never loaded with the row
+    search_text = deferred(Column(Text, Computed(
+        "lower(coalesce(name, '') || ' ' || email || ' ' || coalesce(role, '') || ' ' || coalesce(company, ''))",
+        persisted=True,
+    )))
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || email || ' ' || coalesce(role, '') || ' ' || coalesce(company, ''))",
+        persisted=True,
+    )))
+
     owner = relationship("User", backref="contacts", foreign_keys=[user_id])
+
+    # Keyset pagination: newest-first page scans
+    __table_args__ = (
+        Index("ix_scraped_contacts_created_at_id", "created_at", "id"),
+        Index("ix_scraped_contacts_search_text_trgm", "search_text", postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}),
+        Index("ix_scraped_contacts_search_vector", "search_vector", postgresql_using="gin"),
+    )
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class CrawlTarget(Base):
+    """
+    One row per distinct URL crawled on a schedule, shared by every user who configured it
+    (and by daily discovery), maintained by app/services/crawl_scheduler.py.
+
+    interval_seconds adapts between min/max_interval_seconds: it shrinks when a crawl finds
+    new jobs and grows when it finds none. change_rate is an exponentially weighted estimate
+    of the probability that a crawl finds something new.
+    """
+    __tablename__ = "crawl_targets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, nullable=False, unique=True)
+    target_type = Column(String, nullable=False, default="jobs", server_default="jobs")
+    # User the crawl runs (and logs) as; NULL for discovery URLs no user configured
+    owner_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    subscribers = Column(Integer, nullable=False, default=0, server_default="0")
+    active = Column(Boolean, nullable=False, default=True, server_default="true")
+
+    min_interval_seconds = Column(Integer, nullable=False)
+    max_interval_seconds = Column(Integer, nullable=False)
+    interval_seconds = Column(Integer, nullable=False)
+    next_due_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    leased_until = Column(DateTime(timezone=True), nullable=True)  # set while a dispatched crawl is in flight
+
+    change_rate = Column(Float, nullable=False, default=0.5, server_default="0.5")
+    failure_streak = Column(Integer, nullable=False, default=0, server_default="0")
+    last_crawled_at = Column(DateTime(timezone=True), nullable=True)
+    last_changed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        # Serves the "due now" dispatch scan
+        Index("ix_crawl_targets_due", "next_due_at", postgresql_where=text("active")),
+    )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 from app.db.base_class import Base
 
@@ -12,9 +13,29 @@ class EmailTemplate(Base):
     name = Column(String, nullable=False, unique=True, index=True)
     subject = Column(String, nullable=False)
     body_text = Column(Text, nullable=False)
+    compiled_tokens = Column(JSON, nullable=True) # Token list from template_engine, rebuilt on every save
     is_active = Column(Boolean, default=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Generated search columns (see services/text_search.py). Trigrams cover the short
+    # fields only; the body is searchable by word prefix through the tsvector.
+    search_text = deferred(Column(Text, Computed(
+        "lower(name || ' ' || subject)",
+        persisted=True,
+    )))
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple'::regconfig, name || ' ' || subject), 'A') || "
+        "setweight(to_tsvector('simple'::regconfig, body_text), 'C')",
+        persisted=True,
+    )))
+
     owner = relationship("User", backref="templates", foreign_keys=[user_id])
+
+    # Keyset pagination: newest-first page scans
+    __table_args__ = (
+        Index("ix_email_templates_created_at_id", "created_at", "id"),
+        Index("ix_email_templates_search_text_trgm", "search_text", postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}),
+        Index("ix_email_templates_search_vector", "search_vector", postgresql_using="gin"),
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -23,6 +23,12 @@ class Feedback(Base):
     user = relationship("User", backref="feedbacks", foreign_keys=[user_id])
     comments = relationship("FeedbackComment", back_populates="feedback", cascade="all, delete-orphan", order_by="FeedbackComment.created_at.asc()")
 
+    # Keyset pagination: newest-first page scans
+    __table_args__ = (
+        Index("ix_feedbacks_created_at_id", "created_at", "id"),
+        Index("ix_feedbacks_upvotes_created_at_id", "upvotes", "created_at", "id"),
+    )
+
 class FeedbackComment(Base):
     __tablename__ = "feedback_comments"
 
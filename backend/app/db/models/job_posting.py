@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import Vector, HALFVEC
 
 from app.db.base_class import Base
 
@@ -19,9 +21,35 @@ class JobPosting(Base):
     
     # Intelligence output
     embedding = Column(Vector(384)) # matches all-MiniLM-L6-v2 dimensionality
+    embedding_model = Column(String, nullable=True) # EMBEDDING_VERSION that produced `embedding` (services/embeddings.py)
+    # Half-precision copy kept by Postgres; carries the ANN index (see services/vector_search.py)
+    embedding_half = deferred(Column(HALFVEC(384), Computed("(embedding)::halfvec(384)", persisted=True)))
     relevance_score = Column(Float, nullable=True) # Optional global or pre-computed score
     
     metadata_json = Column(JSON, nullable=True) # Store extra raw data from adapters
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Generated full-text column for hybrid search (see services/job_search.py)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english'::regconfig, title), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, company || ' ' || coalesce(location, '')), 'B') || "
+        "setweight(to_tsvector('english'::regconfig, description), 'C')",
+        persisted=True,
+    )))
+
+    # Keyset pagination: newest-first page scans
+    __table_args__ = (
+        Index("ix_job_postings_created_at_id", "created_at", "id"),
+        # Exact dedup for feed items (services/feed_adapters.py)
+        Index(
+            "uq_job_postings_source_external_id", "source", "external_id",
+            unique=True, postgresql_where=text("external_id IS NOT NULL"),
+        ),
+        Index("ix_job_postings_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_job_postings_embedding_half_hnsw", "embedding_half",
+            postgresql_using="hnsw", postgresql_ops={"embedding_half": "halfvec_cosine_ops"},
+        ),
+    )
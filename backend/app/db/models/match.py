@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class JobResumeMatch(Base):
+    """
+    Precomputed job/resume similarity, maintained by app/services/match_store.py.
+    Each resume keeps at most MATCHES_PER_RESUME rows (its best-scoring jobs).
+
+    score uses the same 0-100 scale as find_best_resume_for_job: (1 - cosine_distance / 2) * 100.
+    """
+    __tablename__ = "job_resume_matches"
+
+    job_id = Column(Integer, ForeignKey("job_postings.id", ondelete="CASCADE"), primary_key=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # denormalized from resumes
+    score = Column(Float, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    job = relationship("JobPosting")
+
+    __table_args__ = (
+        # "My best matches": range scan from the top score down, per user
+        Index("ix_job_resume_matches_user_score", "user_id", "score", "job_id", "resume_id"),
+        # Per-resume top-N trimming
+        Index("ix_job_resume_matches_resume_score", "resume_id", "score"),
+    )
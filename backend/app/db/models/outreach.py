@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, UniqueConstraint, Index, text
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class Outreach(Base):
+    """
+    Per-user cold mail ledger. One row per (user, contact, template) that has been queued
+    or sent, so the scheduler never mails the same contact twice from the same account.
+
+    Status lifecycle: queued -> sending -> sent | failed | abandoned
+    `failed` rows are retried on a later cycle; `abandoned` rows have exhausted their attempts.
+    """
+    __tablename__ = "outreach"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    contact_id = Column(Integer, ForeignKey("scraped_contacts.id", ondelete="CASCADE"), nullable=False)
+    template_id = Column(Integer, ForeignKey("email_templates.id", ondelete="CASCADE"), nullable=False)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="SET NULL"), nullable=True)
+
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=1, server_default="1")
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "contact_id", "template_id", name="uq_outreach_user_contact_template"),
+        # Serves "contacts not yet mailed by this user" anti-joins; failed rows are retryable so excluded
+        Index("ix_outreach_user_contact_mailed", "user_id", "contact_id",
+              postgresql_where=text("status <> 'failed'")),
+        # Serves the FOR UPDATE SKIP LOCKED work queue
+        Index("ix_outreach_queued", "id", postgresql_where=text("status = 'queued'")),
+    )
+
+class OutreachDailyCounter(Base):
+    """Atomic per-user, per-day counter enforcing UserSetting.daily_cold_mail_limit."""
+    __tablename__ = "outreach_daily_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, JSON, LargeBinary
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, JSON, LargeBinary, Index
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector
 
@@ -15,8 +15,12 @@ class Resume(Base):
     label = Column(String, nullable=True) # e.g., "Frontend Engineer", "Product Manager"
     
     # Storage
-    # Physically stored on disk within app/uploads/resumes/ AND as byte payload in database
-    file_data = Column(LargeBinary, nullable=True)
+    # File bytes live in the content-addressed blob store (app/services/blob_store.py);
+    # the row only keeps the SHA-256 key and size.
+    blob_key = Column(String(64), nullable=True, index=True)
+    file_size = Column(Integer, nullable=True)
+    # Legacy in-row payload. Never loaded by default; migrated into the blob store on first access.
+    file_data = deferred(Column(LargeBinary, nullable=True), raiseload=True)
     
     # Extraction output
     raw_text = Column(Text, nullable=True)
@@ -24,6 +28,7 @@ class Resume(Base):
     
     # Intelligence output
     embedding = Column(Vector(384)) # matches all-MiniLM-L6-v2 dimensionality
+    embedding_model = Column(String, nullable=True) # EMBEDDING_VERSION that produced `embedding` (services/embeddings.py)
     structural_score = Column(Float, nullable=True)
     semantic_score = Column(Float, nullable=True)
     ats_score = Column(Float, nullable=True)
@@ -35,3 +40,8 @@ class Resume(Base):
 
     # Relationships
     owner = relationship("User", backref="resumes")
+
+    # Keyset pagination: newest-first page scans
+    __table_args__ = (
+        Index("ix_resumes_user_created_at_id", "user_id", "created_at", "id"),
+    )
@@ -23,3 +23,5 @@ class ScrapedContactRead(ScrapedContactBase):
 class ScrapedContactList(BaseModel):
     items: List[ScrapedContactRead]
     total: int
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+    total_is_estimate: bool = False
@@ -29,3 +29,5 @@ class EmailTemplateRead(EmailTemplateBase):
 class EmailTemplateList(BaseModel):
     items: List[EmailTemplateRead]
     total: int
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+    total_is_estimate: bool = False
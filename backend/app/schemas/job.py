@@ -26,6 +26,33 @@ class JobPostingRead(JobPostingBase):
 class JobPostingList(BaseModel):
     items: List[JobPostingRead]
     total: int
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+    total_is_estimate: bool = False
+
+class JobSearchHit(BaseModel):
+    job: JobPostingRead
+    score: float  # reciprocal rank fusion score, higher is better
+    lexical_rank: Optional[int] = None  # position in the full-text ranking, if matched
+    vector_rank: Optional[int] = None  # position in the embedding ranking, if matched
+
+class JobSearchResults(BaseModel):
+    query: str
+    items: List[JobSearchHit]
+    total: int  # fused candidates, capped by the search depth
+
+class StoredJobMatch(BaseModel):
+    job: JobPostingRead
+    resume_id: int
+    score: float  # 0-100, same scale as JobMatchResult.match_score
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class StoredJobMatchList(BaseModel):
+    items: List[StoredJobMatch]
+    min_score: float
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
 
 class JobMatchResult(BaseModel):
     job: JobPostingRead
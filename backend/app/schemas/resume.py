@@ -19,6 +19,7 @@ class ResumeRead(ResumeBase):
     id: int
     user_id: int
     status: str
+    file_size: Optional[int] = None
     structural_score: Optional[float] = None
     semantic_score: Optional[float] = None
     raw_text: Optional[str] = None
@@ -32,3 +33,5 @@ class ResumeRead(ResumeBase):
 class ResumeList(BaseModel):
     items: List[ResumeRead]
     total: int
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+    total_is_estimate: bool = False
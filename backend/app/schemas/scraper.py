@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 
 
 class ScraperJobRequest(BaseModel):
@@ -12,3 +12,8 @@ class ColdMailDispatchRequest(BaseModel):
     template_id: int
     resume_id: int
     attach_resume: bool = True
+
+class ColdMailBulkPreviewRequest(BaseModel):
+    contact_ids: List[int]
+    template_id: int
+    resume_id: int
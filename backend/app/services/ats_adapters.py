@@ -0,0 +1,247 @@
+"""
+Applicant tracking system (ATS) job boards read through their public JSON APIs.
+
+Career pages hosted on Greenhouse, Lever, Ashby or Workable list every opening in one or
+a few small JSON responses, with exact titles, locations and full descriptions. That
+replaces a headless browser session plus spaCy or LLM extraction.
+
+detect_ats() recognises a board in two ways:
+- from the URL itself (boards.greenhouse.io/acme, jobs.lever.co/acme, ...),
+- from a company careers page that embeds or links to the board. The static HTML is
+  searched, so no browser is needed. A page that merely mentions a board (a news post, a
+  job aggregator) must not be replaced by it, so the page counts only if it embeds the
+  board (script/iframe), links a board whose token matches the page's host, or points
+  most of its board links at one board.
+
+Each board maps onto a FeedJobAdapter (feed_adapters.py), so ingestion, exact
+(source, external_id) dedup and the scraper fallback are the same as for feeds. Board ids
+are only unique per board, so external_id is "<board token>:<posting id>".
+"""
+import html as html_lib
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.services.feed_adapters import FeedJobAdapter, html_to_text, parse_date
+
+# Lever pages are requested this many postings at a time, up to MAX_PAGES
+LEVER_PAGE_SIZE = 100
+MAX_PAGES = 20
+
+# Path segments that look like board tokens but are not
+_NOT_TOKENS = frozenset({"embed", "api", "j", "jobs", "v0", "v1", "v3", "www", "apply", "static", "assets"})
+
+# A careers page linking this many postings, mostly on one board, is that board's listing
+MIN_LINKED_POSTINGS = 3
+
+_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("greenhouse", re.compile(r"(?:boards|job-boards)\.greenhouse\.io/embed/job_(?:board|app)(?:/js)?\?(?:[^\"'\s]*&)?for=([A-Za-z0-9_-]+)", re.I)),
+    ("greenhouse", re.compile(r"(?:boards|job-boards)\.greenhouse\.io/([A-Za-z0-9_-]+)", re.I)),
+    ("lever", re.compile(r"jobs\.lever\.co/([A-Za-z0-9_.-]+)", re.I)),
+    ("ashby", re.compile(r"jobs\.ashbyhq\.com/([A-Za-z0-9_.-]+)", re.I)),
+    ("workable", re.compile(r"apply\.workable\.com/([A-Za-z0-9_-]+)", re.I)),
+    ("workable", re.compile(r"//([A-Za-z0-9-]+)\.workable\.com", re.I)),
+]
+
+_EMBED_SRC = re.compile(r"<(?:script|iframe)\b[^>]*?\bsrc\s*=\s*[\"']([^\"']+)", re.I)
+_LINK_HREF = re.compile(r"<a\b[^>]*?\bhref\s*=\s*[\"']([^\"']+)", re.I)
+
+
+@dataclass(frozen=True)
+class AtsBoard:
+    kind: str  # greenhouse, lever, ashby, workable
+    token: str  # board / company slug on that platform
+
+    def adapter(self) -> "AtsBoardAdapter":
+        return _ADAPTERS[self.kind](self.token)
+
+
+def _board_in(text: str) -> Optional[AtsBoard]:
+    for kind, pattern in _PATTERNS:
+        for match in pattern.finditer(text):
+            token = match.group(1).strip(".").lower()
+            if token and token not in _NOT_TOKENS:
+                return AtsBoard(kind, token)
+    return None
+
+
+def _compact(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def detect_ats(url: str, page_html: Optional[str] = None) -> Optional[AtsBoard]:
+    """The ATS board behind `url`, or embedded in / linked from its HTML. None if there is none."""
+    board = _board_in(url)
+    if board is not None or not page_html:
+        return board
+
+    for src in _EMBED_SRC.findall(page_html):
+        board = _board_in(html_lib.unescape(src))
+        if board is not None:
+            return board
+
+    linked = [board for board in (_board_in(html_lib.unescape(href)) for href in _LINK_HREF.findall(page_html)) if board]
+    if not linked:
+        return None
+    host_labels = {_compact(label) for label in (urlparse(url).hostname or "").split(".")}
+    for board in linked:
+        if _compact(board.token) in host_labels:
+            return board
+    board, count = Counter(linked).most_common(1)[0]
+    if count >= MIN_LINKED_POSTINGS and count * 2 > len(linked):
+        return board
+    return None
+
+
+def _company_from_token(token: str) -> str:
+    return re.sub(r"[-_.]+", " ", token).title()
+
+
+class AtsBoardAdapter(FeedJobAdapter):
+    """One company's board on an ATS. Boards are not ordered by date, so there is no early stop."""
+
+    newest_first = False
+
+    def __init__(self, token: str, feed_url: str):
+        super().__init__(feed_url)
+        self.token = token
+
+    def _external_id(self, posting_id: Any) -> str:
+        return f"{self.token}:{posting_id}"
+
+
+class GreenhouseAdapter(AtsBoardAdapter):
+    source = "greenhouse"
+    API_BASE = "https://boards-api.greenhouse.io/v1/boards"
+
+    def __init__(self, token: str):
+        super().__init__(token, f"{self.API_BASE}/{token}/jobs?content=true")
+
+    def jobs_from_payload(self, payload: Dict[str, Any], company: str) -> Iterator[Dict[str, Any]]:
+        for item in payload.get("jobs") or []:
+            if not item.get("id") or not item.get("title"):
+                continue
+            yield {
+                "external_id": self._external_id(item["id"]),
+                "title": item["title"][:200],
+                "company": company[:200],
+                "location": ((item.get("location") or {}).get("name") or "Not specified")[:200],
+                # Greenhouse returns the description as entity-escaped HTML
+                "description": html_to_text(html_lib.unescape(item.get("content") or "")) or item["title"],
+                "source_url": item.get("absolute_url") or f"https://boards.greenhouse.io/{self.token}/jobs/{item['id']}",
+                "posted_at": parse_date(item.get("first_published") or item.get("updated_at")),
+                "metadata": {"departments": [d.get("name") for d in item.get("departments") or [] if d.get("name")]},
+            }
+
+    def iter_jobs(self) -> Iterator[Dict[str, Any]]:
+        try:
+            company = self._get(f"{self.API_BASE}/{self.token}").json().get("name") or _company_from_token(self.token)
+        except Exception:
+            company = _company_from_token(self.token)
+        yield from self.jobs_from_payload(self._get(self.feed_url).json(), company)
+
+
+class LeverAdapter(AtsBoardAdapter):
+    source = "lever"
+    API_BASE = "https://api.lever.co/v0/postings"
+
+    def __init__(self, token: str):
+        super().__init__(token, f"{self.API_BASE}/{token}?mode=json")
+
+    def jobs_from_payload(self, payload: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for item in payload:
+            if not item.get("id") or not item.get("text"):
+                continue
+            categories = item.get("categories") or {}
+            sections = [item.get("descriptionPlain") or ""]
+            for block in item.get("lists") or []:
+                sections.append(f"{block.get('text', '')}: {html_to_text(block.get('content'))}")
+            sections.append(item.get("additionalPlain") or "")
+            created = item.get("createdAt")
+            yield {
+                "external_id": self._external_id(item["id"]),
+                "title": item["text"][:200],
+                "company": _company_from_token(self.token)[:200],
+                "location": (categories.get("location") or item.get("workplaceType") or "Not specified")[:200],
+                "description": " ".join(s for s in sections if s).strip()[:5000] or item["text"],
+                "source_url": item.get("hostedUrl") or f"https://jobs.lever.co/{self.token}/{item['id']}",
+                "posted_at": datetime.fromtimestamp(created / 1000, tz=timezone.utc) if created else None,
+                "metadata": {k: categories[k] for k in ("team", "department", "commitment") if categories.get(k)},
+            }
+
+    def iter_jobs(self) -> Iterator[Dict[str, Any]]:
+        for page in range(MAX_PAGES):
+            payload = self._get(f"{self.feed_url}&skip={page * LEVER_PAGE_SIZE}&limit={LEVER_PAGE_SIZE}").json()
+            yield from self.jobs_from_payload(payload)
+            if len(payload) < LEVER_PAGE_SIZE:
+                break
+
+
+class AshbyAdapter(AtsBoardAdapter):
+    source = "ashby"
+    API_BASE = "https://api.ashbyhq.com/posting-api/job-board"
+
+    def __init__(self, token: str):
+        super().__init__(token, f"{self.API_BASE}/{token}?includeCompensation=true")
+
+    def jobs_from_payload(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        for item in payload.get("jobs") or []:
+            if not item.get("id") or not item.get("title") or item.get("isListed") is False:
+                continue
+            yield {
+                "external_id": self._external_id(item["id"]),
+                "title": item["title"][:200],
+                "company": _company_from_token(self.token)[:200],
+                "location": (item.get("location") or ("Remote" if item.get("isRemote") else "Not specified"))[:200],
+                "description": (item.get("descriptionPlain") or html_to_text(item.get("descriptionHtml")) or item["title"])[:5000],
+                "source_url": item.get("jobUrl") or f"https://jobs.ashbyhq.com/{self.token}/{item['id']}",
+                "posted_at": parse_date(item.get("publishedAt")),
+                "metadata": {k: item[k] for k in ("department", "team", "employmentType") if item.get(k)},
+            }
+
+    def iter_jobs(self) -> Iterator[Dict[str, Any]]:
+        yield from self.jobs_from_payload(self._get(self.feed_url).json())
+
+
+class WorkableAdapter(AtsBoardAdapter):
+    """Workable's widget API returns the whole board, descriptions included, in one response."""
+
+    source = "workable"
+    API_BASE = "https://apply.workable.com/api/v1/widget/accounts"
+
+    def __init__(self, token: str):
+        super().__init__(token, f"{self.API_BASE}/{token}?details=true")
+
+    def jobs_from_payload(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        company = payload.get("name") or _company_from_token(self.token)
+        for item in payload.get("jobs") or []:
+            posting_id = item.get("shortcode") or item.get("code")
+            if not posting_id or not item.get("title"):
+                continue
+            place = ", ".join(p for p in (item.get("city"), item.get("state"), item.get("country")) if p)
+            if item.get("telecommuting"):
+                place = f"Remote ({place})" if place else "Remote"
+            yield {
+                "external_id": self._external_id(posting_id),
+                "title": item["title"][:200],
+                "company": company[:200],
+                "location": (place or "Not specified")[:200],
+                "description": html_to_text(item.get("description")) or item["title"],
+                "source_url": item.get("url") or item.get("shortlink") or f"https://apply.workable.com/{self.token}/j/{posting_id}/",
+                "posted_at": parse_date(item.get("published_on") or item.get("created_at")),
+                "metadata": {k: item[k] for k in ("department", "employment_type", "function") if item.get(k)},
+            }
+
+    def iter_jobs(self) -> Iterator[Dict[str, Any]]:
+        yield from self.jobs_from_payload(self._get(self.feed_url).json())
+
+
+_ADAPTERS = {
+    "greenhouse": GreenhouseAdapter,
+    "lever": LeverAdapter,
+    "ashby": AshbyAdapter,
+    "workable": WorkableAdapter,
+}
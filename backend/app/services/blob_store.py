@@ -0,0 +1,181 @@
+"""
+Content-addressed blob storage for uploaded files.
+
+Blobs are keyed by the SHA-256 of their contents, so identical uploads are stored once
+and rows only need to keep the key and size. The local backend lays files out as
+<root>/ab/cd/<sha256>; other backends register themselves in _BACKENDS.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple, Type
+
+from loguru import logger
+from app.core.config import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobNotFound(FileNotFoundError):
+    pass
+
+
+class BlobTooLarge(ValueError):
+    """Raised when a streamed upload exceeds its size cap."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the {max_bytes // (1024 * 1024)} MB limit")
+        self.max_bytes = max_bytes
+
+
+class BlobStore(ABC):
+    """Minimal interface every storage backend implements. Keys are lowercase hex SHA-256 digests."""
+
+    @abstractmethod
+    def put_file(self, src_path: Path, sha256: str) -> None:
+        """Move an already-hashed local file into the store. The source file is consumed."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Open a blob for binary reading. Raises BlobNotFound."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path of the blob when the backend is disk-backed, else None."""
+        return None
+
+    def staging_dir(self) -> Optional[Path]:
+        """Directory for in-progress uploads (same filesystem as the blobs where possible)."""
+        return None
+
+    async def put_upload(self, upload, max_bytes: int) -> Tuple[str, int]:
+        """
+        Stream an upload (anything with an async `read(n)`, e.g. FastAPI's UploadFile) into
+        the store in fixed-size chunks, hashing as it goes. Memory use is one chunk regardless
+        of file size. Raises BlobTooLarge once more than `max_bytes` have been read.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(prefix="upload-", dir=self.staging_dir())
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = await upload.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise BlobTooLarge(max_bytes)
+                    hasher.update(chunk)
+                    out.write(chunk)
+            sha256 = hasher.hexdigest()
+            if size:
+                self.put_file(Path(tmp), sha256)
+            return sha256, size
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def put_bytes(self, data: bytes) -> Tuple[str, int]:
+        """Store an in-memory payload. Returns (key, size)."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        if not self.exists(sha256):
+            fd, tmp = tempfile.mkstemp(prefix="blob-", dir=self.staging_dir())
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            self.put_file(Path(tmp), sha256)
+        return sha256, len(data)
+
+    def read_bytes(self, key: str) -> bytes:
+        with self.open(key) as f:
+            return f.read()
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream a blob in fixed-size chunks (suitable for StreamingResponse)."""
+        with self.open(key) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+class LocalBlobStore(BlobStore):
+    """Stores blobs on local disk under a two-level fan-out directory tree."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return self.root / key[:2] / key[2:4] / key
+
+    def put_file(self, src_path: Path, sha256: str) -> None:
+        dest = self._path(sha256)
+        if dest.exists():
+            # Same content already stored — drop the duplicate
+            os.unlink(src_path)
+            return
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        # Stage next to the destination so the final rename is atomic on the same filesystem
+        staged = dest.with_name(f".{sha256}.{os.getpid()}.tmp")
+        shutil.move(str(src_path), staged)
+        os.replace(staged, dest)
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return open(self._path(key), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
+
+    def staging_dir(self) -> Optional[Path]:
+        path = self.root / "tmp"
+        path.mkdir(exist_ok=True)
+        return path
+
+
+_BACKENDS: Dict[str, Type[BlobStore]] = {
+    "local": LocalBlobStore,
+}
+
+_store: Optional[BlobStore] = None
+
+
+def register_backend(name: str, backend: Type[BlobStore]) -> None:
+    """Register an additional storage backend selectable via BLOB_STORAGE_BACKEND."""
+    _BACKENDS[name] = backend
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        backend = _BACKENDS.get(settings.BLOB_STORAGE_BACKEND)
+        if backend is None:
+            raise ValueError(f"Unknown BLOB_STORAGE_BACKEND: {settings.BLOB_STORAGE_BACKEND}")
+        _store = backend(settings.BLOB_STORAGE_DIR)
+        logger.info(f"Blob store initialised: {settings.BLOB_STORAGE_BACKEND} at {settings.BLOB_STORAGE_DIR}")
+    return _store
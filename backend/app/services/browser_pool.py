@@ -0,0 +1,100 @@
+"""
+Shared headless Chromium for page renders (spiders, form filler).
+
+Starting Playwright and launching Chromium costs about a second per render. Inside a
+Celery worker process, app/worker/runtime.py calls keep_alive(), and one browser is
+launched on first use and reused by every task on that process's event loop. The runtime
+closes it at shutdown. Each render still gets a fresh browser context, so cookies and
+storage never carry over between pages or users.
+
+Without keep_alive() (the API, scripts, a solo-pool worker), new_context() launches a
+browser for the render and closes it afterwards. That way a short-lived event loop never
+leaves an orphaned Chromium behind.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from loguru import logger
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+LAUNCH_ARGS = ["--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage"]
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+_persistent = False
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock: Optional[asyncio.Lock] = None
+_playwright = None
+_browser = None
+
+
+def keep_alive() -> None:
+    """Reuse one browser across renders in this process (call from a long-lived event loop)."""
+    global _persistent
+    _persistent = True
+
+
+async def _launch():
+    if async_playwright is None:
+        raise RuntimeError("playwright is not installed")
+    playwright = await async_playwright().start()
+    try:
+        return playwright, await playwright.chromium.launch(args=LAUNCH_ARGS)
+    except BaseException:
+        await playwright.stop()
+        raise
+
+
+async def _shared_browser():
+    global _loop, _lock, _playwright, _browser
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        # Handles from another (closed) loop cannot be used or closed from this one
+        _loop, _lock, _playwright, _browser = loop, asyncio.Lock(), None, None
+    async with _lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is not None:
+                await _playwright.stop()
+            _playwright, _browser = await _launch()
+            logger.info("Launched shared headless browser")
+    return _browser
+
+
+@asynccontextmanager
+async def new_context(**kwargs) -> AsyncIterator:
+    """A fresh browser context, closed on exit, from the shared browser or a one-off one."""
+    kwargs.setdefault("user_agent", USER_AGENT)
+    if _persistent:
+        context = await (await _shared_browser()).new_context(**kwargs)
+        try:
+            yield context
+        finally:
+            await context.close()
+        return
+
+    playwright, browser = await _launch()
+    try:
+        yield await browser.new_context(**kwargs)
+    finally:
+        await browser.close()
+        await playwright.stop()
+
+
+async def close() -> None:
+    """Close the shared browser, if this event loop launched one."""
+    global _playwright, _browser
+    if _loop is not asyncio.get_running_loop():
+        return
+    try:
+        if _browser is not None:
+            await _browser.close()
+        if _playwright is not None:
+            await _playwright.stop()
+    except Exception as e:
+        logger.warning(f"Error closing shared browser: {e}")
+    finally:
+        _playwright, _browser = None, None
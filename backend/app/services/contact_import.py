@@ -0,0 +1,192 @@
+"""
+Chunked CSV/Excel contact import.
+
+Files are read in bounded chunks (pandas chunked CSV reader, openpyxl read-only mode for
+.xlsx), each chunk is normalized and validated with vectorized pandas operations, and the
+valid rows are COPY'd into a per-connection staging table and moved into scraped_contacts
+with INSERT ... ON CONFLICT (email) DO NOTHING. Deduplication against existing contacts
+happens in the database, so the existing email set is never loaded into Python.
+"""
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+IMPORT_CHUNK_ROWS = 5000
+
+# Per-row rejects returned to the client are capped; counts always cover every row
+MAX_REPORTED_REJECTS = 1000
+
+_EMAIL_PATTERN = r'^[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}$'
+
+_STAGING_COLUMNS = ["email", "name", "company", "role"]
+
+
+@dataclass
+class ImportColumns:
+    email: str
+    name: Optional[str] = None
+    company: Optional[str] = None
+    role: Optional[str] = None
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    imported: int = 0
+    skipped: int = 0  # already in the contacts table
+    rejected: int = 0  # invalid or duplicated within the file
+    rejects: List[dict] = field(default_factory=list)  # first MAX_REPORTED_REJECTS rows not imported
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "rejected": self.rejected,
+            "rejects": self.rejects,
+        }
+
+
+def resolve_columns(columns) -> Optional[ImportColumns]:
+    """Map lowercased header names to contact fields. Returns None without an email column."""
+    columns = [str(col).lower().strip() for col in columns]
+    email_col = next((col for col in columns if 'email' in col), None)
+    if not email_col:
+        return None
+    return ImportColumns(
+        email=email_col,
+        name=next((col for col in columns if 'name' in col), None),
+        company=next((col for col in columns if 'company' in col or 'org' in col), None),
+        role=next((col for col in columns if 'role' in col or 'title' in col), None),
+    )
+
+
+def iter_chunks(file: BinaryIO, filename: str, chunk_rows: int = IMPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield string-typed DataFrames of at most `chunk_rows` rows. Blocking; run off the event loop."""
+    lower = filename.lower()
+    if lower.endswith('.csv'):
+        for chunk in pd.read_csv(file, chunksize=chunk_rows, dtype=str, keep_default_na=False):
+            yield chunk
+    elif lower.endswith('.xlsx'):
+        from openpyxl import load_workbook
+        wb = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [str(h) if h is not None else f"column_{i}" for i, h in enumerate(header)]
+            buffer = []
+            for row in rows:
+                buffer.append(["" if v is None else str(v) for v in row])
+                if len(buffer) >= chunk_rows:
+                    yield pd.DataFrame(buffer, columns=header)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header)
+        finally:
+            wb.close()
+    elif lower.endswith('.xls'):
+        # Legacy binary format has no streaming reader; load once and slice
+        df = pd.read_excel(file, dtype=str).fillna("")
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+    else:
+        raise ValueError("Invalid file format. Must be CSV or Excel.")
+
+
+def normalize_chunk(df: pd.DataFrame, cols: ImportColumns, first_row: int, seen: set, stats: ImportStats) -> pd.DataFrame:
+    """
+    Vectorized cleanup of one chunk. Returns the valid rows (columns: email, name, company,
+    role, row) and records rejects on `stats`. `first_row` is the spreadsheet row number of
+    df's first row (the header is row 1); `seen` carries emails across chunks to catch
+    in-file duplicates.
+    """
+    df = df.rename(columns=lambda c: str(c).lower().strip())
+    out = pd.DataFrame(index=df.index)
+    out["email"] = df[cols.email].astype(str).str.strip().str.lower()
+    for name in ("name", "company", "role"):
+        source = getattr(cols, name)
+        if source:
+            values = df[source].astype(str).str.strip()
+            out[name] = values.where(values != "", None)
+        else:
+            out[name] = None
+    out["row"] = range(first_row, first_row + len(df))
+
+    invalid = ~out["email"].str.match(_EMAIL_PATTERN)
+    duplicate = ~invalid & (out["email"].duplicated() | out["email"].isin(seen))
+
+    for reason, mask in (("invalid email", invalid), ("duplicate in file", duplicate)):
+        stats.rejected += int(mask.sum())
+        room = MAX_REPORTED_REJECTS - len(stats.rejects)
+        if room > 0:
+            hits = out.loc[mask].head(room)
+            stats.rejects.extend(
+                {"row": int(row), "email": email, "reason": reason}
+                for row, email in zip(hits["row"], hits["email"])
+            )
+
+    valid = out[~(invalid | duplicate)]
+    seen.update(valid["email"])
+    return valid
+
+
+async def _ensure_staging(db: AsyncSession) -> None:
+    # Temp table is per connection and emptied on commit, so concurrent imports never share rows
+    await db.execute(text("""
+        CREATE TEMP TABLE IF NOT EXISTS contact_import_staging (
+            email TEXT NOT NULL,
+            name TEXT,
+            company TEXT,
+            role TEXT
+        ) ON COMMIT DELETE ROWS
+    """))
+
+
+async def write_chunk(db: AsyncSession, valid: pd.DataFrame, user_id: int, source_label: str) -> set:
+    """
+    COPY one validated chunk into staging and merge it into scraped_contacts.
+    Returns the set of emails that were actually inserted. Commits.
+    """
+    if valid.empty:
+        return set()
+    await _ensure_staging(db)
+
+    records = list(valid[_STAGING_COLUMNS].itertuples(index=False, name=None))
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "contact_import_staging", records=records, columns=_STAGING_COLUMNS
+    )
+
+    result = await db.execute(
+        text("""
+            INSERT INTO scraped_contacts (email, name, company, role, source_url, is_verified, user_id, created_at)
+            SELECT email, name, company, role, :source_url, false, :user_id, now()
+            FROM contact_import_staging
+            ON CONFLICT (email) DO NOTHING
+            RETURNING email
+        """),
+        {"source_url": source_label, "user_id": user_id},
+    )
+    inserted = set(result.scalars().all())
+    await db.commit()
+    return inserted
+
+
+def record_chunk_result(valid: pd.DataFrame, inserted: set, stats: ImportStats) -> Dict[str, int]:
+    """Fold one chunk's insert result into the running stats."""
+    stats.imported += len(inserted)
+    stats.skipped += len(valid) - len(inserted)
+    room = MAX_REPORTED_REJECTS - len(stats.rejects)
+    if len(inserted) < len(valid) and room > 0:
+        existing = valid[~valid["email"].isin(inserted)].head(room)
+        stats.rejects.extend(
+            {"row": int(row), "email": email, "reason": "already exists"}
+            for row, email in zip(existing["row"], existing["email"])
+        )
+    return {"rows": stats.rows, "imported": stats.imported, "skipped": stats.skipped, "rejected": stats.rejected}
@@ -0,0 +1,204 @@
+"""
+Adaptive recrawl scheduling for configured scrape URLs (crawl_targets).
+
+Every URL any user lists in scrape_urls, plus the daily discovery boards, becomes one
+CrawlTarget. A URL configured by several users is therefore fetched once per due time,
+not once per user. It runs as its first subscriber, and the jobs it finds are global anyway.
+
+Each target's interval adapts to how often the page actually changes:
+- a crawl that finds new jobs halves the interval (CHANGE_SPEEDUP),
+- a crawl that finds nothing stretches it by CHANGE_SLOWDOWN,
+- the result is clamped to [min, max]. max is the shortest scrape_frequency_hours among the
+  URL's subscribers, so nobody is crawled less often than they asked. min is
+  CRAWL_MIN_INTERVAL_MINUTES.
+A failed crawl leaves the interval alone and retries with exponential backoff from min,
+capped at max. Next-due times carry a little jitter so targets do not stay in lockstep.
+
+The beat task only calls sync_targets() and claim_due(), then enqueues one scrape per due
+target. The scraper reports back through record_crawl().
+"""
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from urllib.parse import urldefrag
+
+from loguru import logger
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.crawl import CrawlTarget
+from app.db.models.setting import UserSetting
+
+# Boards crawled for everyone, whether or not a user configured them
+DISCOVERY_URLS = [
+    "https://remoteok.com/remote-software-engineer-jobs",
+    "https://news.ycombinator.com/jobs",
+]
+DISCOVERY_MAX_HOURS = 24
+DEFAULT_FREQUENCY_HOURS = 24
+
+CHANGE_SPEEDUP = 0.5
+CHANGE_SLOWDOWN = 1.5
+CHANGE_RATE_ALPHA = 0.3  # weight of the latest crawl in the change_rate average
+JITTER = 0.1
+
+DISPATCH_BATCH = 50
+# A claimed target is not handed out again for this long, unless its crawl reports back first
+LEASE_SECONDS = 30 * 60
+
+
+@dataclass
+class DueTarget:
+    id: int
+    url: str
+    target_type: str
+    owner_user_id: Optional[int]
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "url": self.url,
+            "target_type": self.target_type,
+            "owner_user_id": self.owner_user_id,
+        }
+
+
+def normalize_url(url: str) -> str:
+    """Key for deduplicating one URL across users: trimmed, without its #fragment."""
+    return urldefrag((url or "").strip())[0]
+
+
+def next_interval(current: float, changed: bool, lo: float, hi: float) -> float:
+    factor = CHANGE_SPEEDUP if changed else CHANGE_SLOWDOWN
+    return min(max(current * factor, lo), hi)
+
+
+def backoff_interval(failure_streak: int, lo: float, hi: float) -> float:
+    return min(lo * (2 ** min(failure_streak, 16)), hi)
+
+
+def _jittered(seconds: float, hi: float) -> timedelta:
+    """`seconds` +/- JITTER, never past the max interval."""
+    return timedelta(seconds=min(seconds * random.uniform(1 - JITTER, 1 + JITTER), hi))
+
+
+async def sync_targets(db: AsyncSession) -> int:
+    """Upsert one crawl target per distinct configured URL and deactivate the rest. Returns the active count."""
+    rows = (await db.execute(
+        select(UserSetting.user_id, UserSetting.scrape_urls, UserSetting.scrape_frequency_hours)
+        .where(UserSetting.scrape_urls.is_not(None))
+        .order_by(UserSetting.user_id)
+    )).all()
+
+    wanted: Dict[str, dict] = {}
+    for user_id, urls, frequency_hours in rows:
+        if not isinstance(urls, list):
+            continue
+        hours = frequency_hours if frequency_hours and frequency_hours > 0 else DEFAULT_FREQUENCY_HOURS
+        for raw in urls:
+            url = normalize_url(raw) if isinstance(raw, str) else ""
+            if not url:
+                continue
+            entry = wanted.setdefault(url, {"owner": user_id, "users": set(), "max_hours": hours})
+            entry["users"].add(user_id)
+            entry["max_hours"] = min(entry["max_hours"], hours)
+    for url in DISCOVERY_URLS:
+        entry = wanted.setdefault(url, {"owner": None, "users": set(), "max_hours": DISCOVERY_MAX_HOURS})
+        entry["max_hours"] = min(entry["max_hours"], DISCOVERY_MAX_HOURS)
+
+    min_seconds = max(settings.CRAWL_MIN_INTERVAL_MINUTES, 1) * 60
+    values = []
+    for url, entry in wanted.items():
+        hi = entry["max_hours"] * 3600
+        lo = min(min_seconds, hi)
+        values.append({
+            "url": url,
+            "target_type": "jobs",
+            "owner_user_id": entry["owner"],
+            "subscribers": len(entry["users"]),
+            "active": True,
+            "min_interval_seconds": lo,
+            "max_interval_seconds": hi,
+            # New targets start a quarter of the way up and adapt from there; first crawl is immediate
+            "interval_seconds": max(lo, hi // 4),
+        })
+
+    if values:
+        stmt = pg_insert(CrawlTarget).values(values)
+        excluded = stmt.excluded
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[CrawlTarget.url],
+            set_={
+                "owner_user_id": excluded.owner_user_id,
+                "subscribers": excluded.subscribers,
+                "active": True,
+                "min_interval_seconds": excluded.min_interval_seconds,
+                "max_interval_seconds": excluded.max_interval_seconds,
+                # Keep the learned interval, moved into the (possibly changed) bounds
+                "interval_seconds": text(
+                    "LEAST(GREATEST(crawl_targets.interval_seconds, excluded.min_interval_seconds), "
+                    "excluded.max_interval_seconds)"
+                ),
+                # A reactivated target, or a tightened max, must not wait out its old due time
+                "next_due_at": text(
+                    "CASE WHEN NOT crawl_targets.active THEN now() "
+                    "ELSE LEAST(crawl_targets.next_due_at, "
+                    "COALESCE(crawl_targets.last_crawled_at, now()) + make_interval(secs => excluded.max_interval_seconds)) END"
+                ),
+            },
+        ))
+    await db.execute(
+        update(CrawlTarget)
+        .where(CrawlTarget.active.is_(True), CrawlTarget.url.not_in(list(wanted)))
+        .values(active=False, leased_until=None)
+    )
+    return len(values)
+
+
+async def claim_due(db: AsyncSession, limit: int = DISPATCH_BATCH) -> List[DueTarget]:
+    """Lease up to `limit` due targets, most overdue first. Concurrent dispatchers never claim the same row."""
+    result = await db.execute(text("""
+        UPDATE crawl_targets SET leased_until = now() + make_interval(secs => :lease)
+        WHERE id IN (
+            SELECT id FROM crawl_targets
+            WHERE active AND next_due_at <= now()
+              AND (leased_until IS NULL OR leased_until < now())
+            ORDER BY next_due_at
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, url, target_type, owner_user_id
+    """), {"lease": LEASE_SECONDS, "limit": limit})
+    return [DueTarget(*row) for row in result.all()]
+
+
+async def record_crawl(db: AsyncSession, url: str, new_jobs: int = 0, error: Optional[str] = None) -> None:
+    """Adapt the target's schedule to one crawl's outcome. No-op for URLs that are not scheduled. Caller commits."""
+    target = (await db.execute(
+        select(CrawlTarget).where(CrawlTarget.url == normalize_url(url)).with_for_update()
+    )).scalars().first()
+    if target is None:
+        return
+
+    now = datetime.now(timezone.utc)
+    lo, hi = target.min_interval_seconds, target.max_interval_seconds
+    target.last_crawled_at = now
+    target.leased_until = None
+    if error is not None:
+        target.failure_streak += 1
+        target.last_error = error[:500]
+        target.next_due_at = now + _jittered(backoff_interval(target.failure_streak, lo, hi), hi)
+        logger.info(f"Crawl of {target.url} failed ({target.failure_streak} in a row); retrying later")
+        return
+
+    changed = new_jobs > 0
+    target.failure_streak = 0
+    target.last_error = None
+    target.change_rate = (1 - CHANGE_RATE_ALPHA) * target.change_rate + CHANGE_RATE_ALPHA * float(changed)
+    if changed:
+        target.last_changed_at = now
+    target.interval_seconds = int(next_interval(target.interval_seconds, changed, lo, hi))
+    target.next_due_at = now + _jittered(target.interval_seconds, hi)
@@ -0,0 +1,54 @@
+"""
+Sentence embeddings for jobs and resumes, and the version tag stored with each vector.
+
+Every stored embedding carries `embedding_model` = EMBEDDING_VERSION, i.e. the model name
+plus the version of the text format fed to it. Vectors produced under different versions
+live in different spaces, so every similarity query compares only rows whose version
+matches (see matching_engine, match_store, job_search, vector_snapshot). After
+EMBEDDING_MODEL or the text format changes, app/worker/reembed.py re-embeds the old rows
+in the background; until it finishes, a row on the old version simply does not match
+anything on the new one.
+
+The model must keep producing EMBEDDING_DIM-dimensional vectors (the column type).
+"""
+from typing import List, Sequence
+
+from sentence_transformers import SentenceTransformer
+
+from app.core.config import settings
+
+EMBEDDING_DIM = 384
+
+# Bump when job_text() / resume_text() change what gets embedded
+TEXT_FORMAT_VERSION = 1
+
+EMBEDDING_VERSION = f"{settings.EMBEDDING_MODEL}/v{TEXT_FORMAT_VERSION}"
+
+# Resumes are truncated before embedding; MiniLM-L6-v2 has a ~256 token window, 8000 chars is generous
+_RESUME_TEXT_CHARS = 8000
+
+# Shared model, loaded once per process
+model = SentenceTransformer(settings.EMBEDDING_MODEL)
+
+
+def job_text(title: str, company: str, description: str) -> str:
+    return f"Title: {title}\nCompany: {company}\nDescription: {description}"
+
+
+def resume_text(raw_text: str) -> str:
+    return raw_text[:_RESUME_TEXT_CHARS]
+
+
+def embed(text: str) -> List[float]:
+    return model.encode(text).tolist()
+
+
+def embed_job(title: str, company: str, description: str) -> List[float]:
+    return embed(job_text(title, company, description))
+
+
+def embed_batch(texts: Sequence[str], batch_size: int = 64) -> List[List[float]]:
+    """One batched forward pass over many texts (much faster than encoding one at a time)."""
+    if not texts:
+        return []
+    return model.encode(list(texts), batch_size=batch_size, show_progress_bar=False).tolist()
@@ -0,0 +1,187 @@
+"""
+Streaming table exports (CSV, NDJSON, Parquet).
+
+Rows are read through a server-side cursor (`AsyncSession.stream` with `yield_per`), so only
+one partition is held in memory at a time, and each partition is encoded and yielded as
+soon as it arrives. The download starts with the first partition and memory stays flat
+regardless of table size.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+
+# Rows fetched per server-side cursor round trip (and per encoded chunk)
+EXPORT_BATCH_ROWS = 2000
+
+_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    header: str
+    expr: Any  # SQLAlchemy column expression selected for this field
+    kind: str = "string"  # string, int, float, bool, timestamp (Parquet type)
+    csv_format: Optional[Callable[[Any], str]] = None  # CSV-only presentation
+
+    @property
+    def key(self) -> str:
+        return self.header.lower().replace(" ", "_")
+
+
+def yes_no(value) -> str:
+    return "Yes" if value else "No"
+
+
+def date_only(value) -> str:
+    return value.strftime("%Y-%m-%d") if value else ""
+
+
+def select_columns(columns: List[ExportColumn]):
+    """SELECT exactly the expressions the export columns describe, in order."""
+    return select(*(col.expr for col in columns))
+
+
+def _csv_text(rows) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+
+def _csv_row(row: tuple, columns: List[ExportColumn]) -> list:
+    return [
+        col.csv_format(value) if col.csv_format else ("" if value is None else value)
+        for col, value in zip(columns, row)
+    ]
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class _ParquetSink:
+    """Write-only file object that hands back whatever pyarrow wrote since the last drain."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _parquet_schema(pa, columns: List[ExportColumn]):
+    types = {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(col.key, types[col.kind]) for col in columns])
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow to be installed on the server.")
+    return pa, pq
+
+
+async def _iter_partitions(db: AsyncSession, stmt) -> AsyncIterator[Sequence[tuple]]:
+    result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_ROWS))
+    async for partition in result.partitions():
+        yield partition
+
+
+async def stream_rows(db: AsyncSession, stmt, columns: List[ExportColumn], fmt: str) -> AsyncIterator[bytes]:
+    """Encode the statement's rows as `fmt`, one chunk per cursor partition."""
+    if fmt == "csv":
+        yield _csv_text([[col.header for col in columns]]).encode("utf-8")
+        async for rows in _iter_partitions(db, stmt):
+            yield _csv_text(_csv_row(row, columns) for row in rows).encode("utf-8")
+
+    elif fmt == "ndjson":
+        keys = [col.key for col in columns]
+        async for rows in _iter_partitions(db, stmt):
+            yield "".join(
+                json.dumps(dict(zip(keys, row)), default=_json_default) + "\n" for row in rows
+            ).encode("utf-8")
+
+    elif fmt == "parquet":
+        pa, pq = _load_pyarrow()
+        schema = _parquet_schema(pa, columns)
+        sink = _ParquetSink()
+        # One row group per partition keeps the writer's buffered state to a single batch
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+        try:
+            async for rows in _iter_partitions(db, stmt):
+                arrays = [pa.array([row[i] for row in rows], type=schema.field(i).type) for i in range(len(columns))]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def export_response(db: AsyncSession, stmt, columns: List[ExportColumn], fmt: str, name: str) -> StreamingResponse:
+    """
+    Build a streaming download for `stmt`, which must select exactly the expressions in
+    `columns`, in order. Raises HTTPException for unknown formats or missing Parquet support.
+    """
+    fmt = (fmt or "csv").lower()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if fmt == "parquet":
+        _load_pyarrow()  # fail with a 400 before the response starts
+
+    filename = f"{name}_export_{datetime.now().strftime('%Y%m%d')}.{fmt}"
+    response = StreamingResponse(stream_rows(db, stmt, columns, fmt), media_type=_MEDIA_TYPES[fmt])
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
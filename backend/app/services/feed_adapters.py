@@ -0,0 +1,351 @@
+"""
+Job adapters over structured feeds (RSS/Atom and JSON APIs) instead of rendered HTML.
+
+Feeds are a fraction of the size of the pages they replace. Each item also carries a
+stable id, which is stored as JobPosting.external_id and gives two things:
+- exact dedup, enforced by the unique (source, external_id) index,
+- an incremental stop: feeds list newest first, so reading stops once a run of
+  already-stored ids shows up.
+
+feed_adapter_for(url) maps a URL onto its adapter, including ATS job boards
+(ats_adapters.py). The scraper and daily discovery try that adapter first and fall back to
+HTML scraping only when the URL has none or the feed fails.
+
+Parsing is split from fetching (parse_rss, RemoteOKAdapter.jobs_from_payload, ...), so the
+adapters can be exercised against recorded feed files.
+"""
+import asyncio
+import re
+import xml.etree.ElementTree as ET
+from abc import abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.job_posting import JobPosting
+from app.services import embeddings, http_client
+from app.services.job_ingestion import BaseJobAdapter
+
+REQUEST_TIMEOUT = 20
+USER_AGENT = "Mozilla/5.0 (compatible; job-feed-reader/1.0)"
+
+# Items taken from one feed read
+MAX_FEED_ITEMS = 200
+
+# Newest-first feeds stop after this many consecutive already-stored items (pinned or
+# featured posts can appear out of order, so one known item is not enough)
+STOP_AFTER_KNOWN = 5
+
+# Stored ids loaded per source for the incremental stop
+KNOWN_IDS_WINDOW = 2000
+
+_MAX_DESCRIPTION_CHARS = 5000
+
+
+def html_to_text(html: Optional[str]) -> str:
+    if not html:
+        return ""
+    if "<" not in html:
+        return html.strip()[:_MAX_DESCRIPTION_CHARS]
+    return BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True)[:_MAX_DESCRIPTION_CHARS]
+
+
+def _local(tag: str) -> str:
+    """Element name without its XML namespace ({http://www.w3.org/2005/Atom}entry -> entry)."""
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value)  # RSS (RFC 822)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))  # Atom (RFC 3339)
+    except ValueError:
+        return None
+
+
+def parse_rss(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """
+    Stream entries out of an RSS 2.0 or Atom document. Each <item>/<entry> is yielded as
+    a flat dict of its children's local names, then cleared, so memory stays flat however
+    long the feed is. Atom <link href=...> is read into "link".
+    """
+    for _, elem in ET.iterparse(stream, events=("end",)):
+        if _local(elem.tag) not in ("item", "entry"):
+            continue
+        entry: Dict[str, Any] = {}
+        for child in elem:
+            name = _local(child.tag)
+            if name == "link" and child.get("href"):
+                if child.get("rel", "alternate") == "alternate":
+                    entry["link"] = child.get("href")
+                continue
+            text = (child.text or "").strip()
+            if text and name not in entry:
+                entry[name] = text
+        yield entry
+        elem.clear()
+
+
+@dataclass
+class FeedIngestResult:
+    fetched: int  # items read from the feed before the incremental stop
+    job_ids: List[int]  # rows inserted (after filtering and dedup)
+
+
+class FeedJobAdapter(BaseJobAdapter):
+    """A feed with stable item ids. fetch_jobs returns job dicts carrying `external_id`."""
+
+    source = "feed"
+    newest_first = True
+
+    def __init__(self, feed_url: str):
+        self.feed_url = feed_url
+
+    @abstractmethod
+    def iter_jobs(self) -> Iterator[Dict[str, Any]]:
+        pass
+
+    def _take_new(self, items: Iterable[Any], key: Callable[[Any], str], known_ids: Set[str], limit: int) -> List[Any]:
+        new: List[Any] = []
+        known_run = 0
+        for item in items:
+            if key(item) in known_ids:
+                known_run += 1
+                if self.newest_first and known_run >= STOP_AFTER_KNOWN:
+                    break
+                continue
+            known_run = 0
+            new.append(item)
+            if len(new) >= limit:
+                break
+        return new
+
+    def fetch_jobs(self, known_ids: Set[str] = frozenset(), limit: int = MAX_FEED_ITEMS, **kwargs) -> List[Dict[str, Any]]:
+        return self._take_new(self.iter_jobs(), lambda job: job["external_id"], known_ids, limit)
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        response = http_client.session().get(url, headers={"User-Agent": USER_AGENT}, timeout=REQUEST_TIMEOUT, **kwargs)
+        response.raise_for_status()
+        return response
+
+
+class RssFeedAdapter(FeedJobAdapter):
+    """Any RSS 2.0 / Atom job feed."""
+
+    source = "rss"
+
+    def job_from_entry(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        title = entry.get("title")
+        external_id = entry.get("guid") or entry.get("id") or entry.get("link")
+        if not title or not external_id:
+            return None
+        return {
+            "external_id": external_id,
+            "title": title[:200],
+            "company": (entry.get("author") or entry.get("creator") or "Unknown")[:200],
+            "location": entry.get("location") or "Not specified",
+            "description": html_to_text(entry.get("encoded") or entry.get("content") or entry.get("description") or entry.get("summary")) or title,
+            "source_url": entry.get("link") or self.feed_url,
+            "posted_at": parse_date(entry.get("pubdate") or entry.get("published") or entry.get("updated")),
+            "metadata": {},
+        }
+
+    def jobs_from_stream(self, stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+        for entry in parse_rss(stream):
+            job = self.job_from_entry(entry)
+            if job:
+                yield job
+
+    def iter_jobs(self) -> Iterator[Dict[str, Any]]:
+        with self._get(self.feed_url, stream=True) as response:
+            response.raw.decode_content = True
+            yield from self.jobs_from_stream(response.raw)
+
+
+class WeWorkRemotelyAdapter(RssFeedAdapter):
+    """WeWorkRemotely category RSS feeds; item titles read "Company: Role"."""
+
+    source = "weworkremotely"
+    DEFAULT_FEED = "https://weworkremotely.com/remote-jobs.rss"
+
+    def job_from_entry(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        job = super().job_from_entry(entry)
+        if job is None:
+            return None
+        company, sep, role = job["title"].partition(": ")
+        if sep:
+            job["company"], job["title"] = company.strip()[:200], role.strip()[:200]
+        job["location"] = entry.get("region") or "Remote"
+        job["metadata"] = {k: entry[k] for k in ("type", "category", "skills") if entry.get(k)}
+        return job
+
+
+class RemoteOKAdapter(FeedJobAdapter):
+    """RemoteOK's public JSON API (the first array element is a legal notice, not a job)."""
+
+    source = "remoteok"
+    API_URL = "https://remoteok.com/api"
+
+    def __init__(self, feed_url: str = API_URL):
+        super().__init__(feed_url)
+
+    def jobs_from_payload(self, payload: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for item in payload:
+            if not isinstance(item, dict) or not item.get("id") or not item.get("position"):
+                continue
+            yield {
+                "external_id": str(item["id"]),
+                "title": str(item["position"])[:200],
+                "company": str(item.get("company") or "Unknown")[:200],
+                "location": item.get("location") or "Remote",
+                "description": html_to_text(item.get("description")) or str(item["position"]),
+                "source_url": item.get("url") or f"https://remoteok.com/remote-jobs/{item['id']}",
+                "posted_at": parse_date(item.get("date")),
+                "metadata": {"tags": item.get("tags") or [], "salary_min": item.get("salary_min"), "salary_max": item.get("salary_max")},
+            }
+
+    def iter_jobs(self) -> Iterator[Dict[str, Any]]:
+        yield from self.jobs_from_payload(self._get(self.feed_url).json())
+
+
+class HackerNewsJobsAdapter(FeedJobAdapter):
+    """Hacker News job stories through the official Firebase API (one request per new item)."""
+
+    source = "hackernews"
+    API_BASE = "https://hacker-news.firebaseio.com/v0"
+    MAX_NEW_ITEMS = 60
+
+    _COMPANY = re.compile(r"^(.+?)\s*(?:\((?:YC|ycombinator)[^)]*\)|\bis hiring\b|\bhiring\b|[-–|:])", re.I)
+
+    def __init__(self, feed_url: str = f"{API_BASE}/jobstories.json"):
+        super().__init__(feed_url)
+
+    def job_from_item(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not item or item.get("deleted") or item.get("dead") or not item.get("title"):
+            return None
+        title = item["title"]
+        match = self._COMPANY.match(title)
+        return {
+            "external_id": str(item["id"]),
+            "title": title[:200],
+            "company": (match.group(1).strip() if match else "YC Company")[:200],
+            "location": "Remote / On-site",
+            "description": html_to_text(item.get("text")) or title,
+            "source_url": item.get("url") or f"https://news.ycombinator.com/item?id={item['id']}",
+            "posted_at": datetime.fromtimestamp(item["time"], tz=timezone.utc) if item.get("time") else None,
+            "metadata": {},
+        }
+
+    def iter_jobs(self) -> Iterator[Dict[str, Any]]:
+        for story_id in self._get(self.feed_url).json():
+            job = self.job_from_item(self._get(f"{self.API_BASE}/item/{story_id}.json").json())
+            if job:
+                yield job
+
+    def fetch_jobs(self, known_ids: Set[str] = frozenset(), limit: int = MAX_FEED_ITEMS, **kwargs) -> List[Dict[str, Any]]:
+        # The id list is free; only unseen items are fetched
+        story_ids = [str(i) for i in self._get(self.feed_url).json()]
+        jobs = []
+        for story_id in self._take_new(story_ids, lambda i: i, known_ids, min(limit, self.MAX_NEW_ITEMS)):
+            try:
+                job = self.job_from_item(self._get(f"{self.API_BASE}/item/{story_id}.json").json())
+            except requests.RequestException as e:
+                logger.warning(f"Hacker News item {story_id} failed: {e}")
+                continue
+            if job:
+                jobs.append(job)
+        return jobs
+
+
+def feed_adapter_for(url: str) -> Optional[FeedJobAdapter]:
+    """The feed or ATS board adapter serving the jobs behind `url`, or None when it has neither."""
+    from app.services.ats_adapters import detect_ats  # ats_adapters builds on this module
+
+    board = detect_ats(url)
+    if board is not None:
+        return board.adapter()
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().removeprefix("www.")
+    path = parsed.path.lower().rstrip("/")
+    if host == "remoteok.com":
+        return RemoteOKAdapter()
+    if host == "weworkremotely.com":
+        if path.endswith(".rss"):
+            return WeWorkRemotelyAdapter(url)
+        category = re.match(r"^/categories/([\w-]+)$", path)
+        if category:
+            return WeWorkRemotelyAdapter(f"https://weworkremotely.com/categories/{category.group(1)}.rss")
+        return WeWorkRemotelyAdapter(WeWorkRemotelyAdapter.DEFAULT_FEED)
+    if host == "news.ycombinator.com" and path == "/jobs":
+        return HackerNewsJobsAdapter()
+    if path.endswith((".rss", ".atom")) or path.endswith("/feed") or path.endswith("/rss"):
+        return RssFeedAdapter(url)
+    return None
+
+
+async def ingest_feed(
+    db: AsyncSession,
+    adapter: FeedJobAdapter,
+    job_filter: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+) -> FeedIngestResult:
+    """
+    Read a feed and insert its unseen jobs (embedded in one batch). Rows whose
+    (source, external_id) already exists are skipped by the database. The caller commits.
+    """
+    known = set((await db.execute(
+        select(JobPosting.external_id)
+        .where(JobPosting.source == adapter.source, JobPosting.external_id.is_not(None))
+        .order_by(JobPosting.id.desc())
+        .limit(KNOWN_IDS_WINDOW)
+    )).scalars().all())
+    jobs = await asyncio.to_thread(adapter.fetch_jobs, known_ids=known)
+    fetched = len(jobs)
+    if job_filter:
+        jobs = job_filter(jobs)
+    if not jobs:
+        return FeedIngestResult(fetched=fetched, job_ids=[])
+
+    vectors = await asyncio.to_thread(
+        embeddings.embed_batch,
+        [embeddings.job_text(j["title"], j["company"], j["description"]) for j in jobs],
+    )
+    stmt = (
+        pg_insert(JobPosting)
+        .values([
+            {
+                "source": adapter.source,
+                "external_id": job["external_id"],
+                "source_url": job["source_url"],
+                "title": job["title"],
+                "company": job["company"],
+                "location": job["location"],
+                "description": job["description"],
+                "embedding": vector,
+                "embedding_model": embeddings.EMBEDDING_VERSION,
+                "metadata_json": {**job["metadata"], "posted_at": job["posted_at"].isoformat() if job["posted_at"] else None},
+            }
+            for job, vector in zip(jobs, vectors)
+        ])
+        .on_conflict_do_nothing(
+            index_elements=[JobPosting.source, JobPosting.external_id],
+            index_where=JobPosting.external_id.is_not(None),
+        )
+        .returning(JobPosting.id)
+    )
+    job_ids = list((await db.execute(stmt)).scalars().all())
+    logger.info(f"Feed {adapter.feed_url}: {fetched} unseen items, {len(jobs)} kept, {len(job_ids)} inserted")
+    return FeedIngestResult(fetched=fetched, job_ids=job_ids)
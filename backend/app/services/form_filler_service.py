@@ -4,12 +4,8 @@ import numpy as np
 from loguru import logger
 from typing import Dict, Any
 
-try:
-    from playwright.async_api import async_playwright
-except ImportError:
-    pass
-
 from app.db.models.setting import UserSetting
+from app.services import browser_pool
 from app.services.job_ingestion import model as sentence_model # Re-use the all-MiniLM-L6-v2 transformer instance
 
 def calculate_cosine_similarity(vec1, vec2):
@@ -26,13 +22,7 @@ async def fill_application_form(url: str, payload: Dict[str, Any], user_settings
     logger.info(f"Attempting Local ML Auto-Fill for {url}")
     
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                args=["--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage"]
-            )
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
+        async with browser_pool.new_context() as context:
             page = await context.new_page()
             
             response = await page.goto(url, wait_until="networkidle", timeout=30000)
@@ -75,7 +65,6 @@ async def fill_application_form(url: str, payload: Dict[str, Any], user_settings
             fields_data = await page.evaluate(extract_script)
             
             if not fields_data:
-                await browser.close()
                 return "Failed: No valid input fields identified on the DOM."
                 
             logger.info(f"Extracted {len(fields_data)} form fields from DOM. Pre-computing payload vectors...")
@@ -83,7 +72,6 @@ async def fill_application_form(url: str, payload: Dict[str, Any], user_settings
             # Embed the generated answer keys
             payload_keys = list(payload.keys())
             if not payload_keys:
-                await browser.close()
                 return "Failed: AI Payload provided no answer keys."
                 
             # e.g., mapping "first_name" -> [0.01, 0.05, ...]
@@ -136,7 +124,6 @@ async def fill_application_form(url: str, payload: Dict[str, Any], user_settings
                     logger.debug(f"Could not interact with field natively {selector}: {eval_err}")
                     continue
             
-            await browser.close()
             return f"Successfully accessed form. Local ML mapped and executed {fields_filled} accurate inputs out of {len(fields_data)} available fields autonomously."
             
     except Exception as e:
@@ -0,0 +1,38 @@
+"""
+Process-wide HTTP session for outbound page, feed and ATS fetches.
+
+A shared requests.Session keeps connections, and their TLS sessions, to the same job
+boards alive across fetches and across Celery tasks, instead of opening a new one per
+request. The session belongs to the process that created it. A forked child, such as a
+Celery prefork worker, transparently gets its own.
+"""
+import os
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Idle keep-alive connections kept per host, for up to this many hosts
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 8
+
+_session: Optional[requests.Session] = None
+_pid: Optional[int] = None
+
+
+def session() -> requests.Session:
+    global _session, _pid
+    if _session is None or _pid != os.getpid():
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+        _pid = os.getpid()
+    return _session
+
+
+def close() -> None:
+    global _session, _pid
+    if _session is not None and _pid == os.getpid():
+        _session.close()
+    _session, _pid = None, None
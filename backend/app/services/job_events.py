@@ -0,0 +1,147 @@
+"""
+Job ingestion event stream (Redis Streams).
+
+Every ingest path (scraper, scheduled discovery, manual ingest) publishes the IDs of the
+jobs it just committed to JOB_STREAM. The matcher process (app/worker/job_matcher.py)
+reads the stream through the MATCHER_GROUP consumer group, so new jobs are scored and
+shortlisted within seconds instead of waiting for the daily batch.
+
+Delivery is at-least-once: an entry is acknowledged only after its batch is committed.
+Entries left pending by a crashed consumer are reclaimed with XAUTOCLAIM once they sit
+idle for CLAIM_IDLE_MS. Entries that keep failing are moved to DEAD_LETTER_STREAM after
+MAX_DELIVERIES attempts. Consumers must therefore be idempotent.
+"""
+import asyncio
+import weakref
+from typing import Iterable, List, Optional
+
+import redis.asyncio as aioredis
+from loguru import logger
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services import match_store
+
+JOB_STREAM = "jobs:ingested"
+DEAD_LETTER_STREAM = "jobs:ingested:dead"
+MATCHER_GROUP = "job-matcher"
+
+# Approximate cap on retained entries; trimming never drops unread entries in practice
+STREAM_MAXLEN = 100_000
+
+CLAIM_IDLE_MS = 60_000
+MAX_DELIVERIES = 5
+
+# One shared client per event loop: a Celery worker process runs every task on one loop
+# (app/worker/runtime.py), so publishes and registry updates reuse its connection pool
+_shared: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def redis_client() -> aioredis.Redis:
+    """New client that the caller owns and closes. Use it for blocking reads or a connection of its own."""
+    return aioredis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0, decode_responses=True)
+
+
+def shared_client() -> aioredis.Redis:
+    """This event loop's shared client. Callers must not close it; see close_shared_client()."""
+    loop = asyncio.get_running_loop()
+    client = _shared.get(loop)
+    if client is None:
+        client = _shared[loop] = redis_client()
+    return client
+
+
+async def close_shared_client() -> None:
+    """Close this event loop's shared client (worker shutdown)."""
+    client = _shared.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def encode_job_ids(job_ids: Iterable[int]) -> str:
+    return ",".join(str(i) for i in job_ids)
+
+
+def decode_job_ids(value: Optional[str]) -> List[int]:
+    return [int(i) for i in (value or "").split(",") if i.strip().isdigit()]
+
+
+async def publish_jobs(job_ids: Iterable[int], source: str) -> Optional[str]:
+    """XADD one event for a committed ingest batch. Returns the entry ID, None for no jobs."""
+    job_ids = sorted(set(job_ids))
+    if not job_ids:
+        return None
+    return await shared_client().xadd(
+        JOB_STREAM,
+        {"job_ids": encode_job_ids(job_ids), "source": source},
+        maxlen=STREAM_MAXLEN,
+        approximate=True,
+    )
+
+
+async def announce_jobs(db: AsyncSession, job_ids: Iterable[int], source: str) -> None:
+    """
+    Hand freshly committed jobs to the matching pipeline. Falls back to scoring inline
+    (no auto-shortlisting) when events are disabled or Redis is unreachable, so matches
+    are never lost. Never raises.
+    """
+    job_ids = sorted(set(job_ids))
+    if not job_ids:
+        return
+    if settings.JOB_EVENTS_ENABLED:
+        try:
+            await publish_jobs(job_ids, source)
+            return
+        except RedisError as e:
+            logger.warning(f"Could not publish {len(job_ids)} jobs to {JOB_STREAM}, scoring inline: {e}")
+    try:
+        # Savepoint: a scoring failure must not expire objects the caller still uses
+        async with db.begin_nested():
+            await match_store.score_jobs(db, job_ids)
+        await db.commit()
+    except Exception as e:
+        logger.warning(f"Match scoring failed for {len(job_ids)} new jobs: {e}")
+
+
+async def ensure_group(client: aioredis.Redis) -> None:
+    try:
+        # "0": a brand-new group also picks up events published before the matcher first started
+        await client.xgroup_create(JOB_STREAM, MATCHER_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def stream_metrics(client: aioredis.Redis) -> dict:
+    """Stream length, consumer-group lag and pending (delivered, unacknowledged) entries."""
+    metrics = {
+        "stream": JOB_STREAM,
+        "group": MATCHER_GROUP,
+        "length": 0,
+        "lag": None,
+        "pending": 0,
+        "oldest_pending_ms": None,
+        "consumers": [],
+        "dead_letters": 0,
+    }
+    if not await client.exists(JOB_STREAM):
+        return metrics
+    metrics["length"] = await client.xlen(JOB_STREAM)
+    metrics["dead_letters"] = await client.xlen(DEAD_LETTER_STREAM)
+
+    group = next((g for g in await client.xinfo_groups(JOB_STREAM) if g["name"] == MATCHER_GROUP), None)
+    if group is None:
+        return metrics
+    # `lag` (entries not yet delivered to the group) needs Redis 7+
+    metrics["lag"] = group.get("lag")
+    metrics["pending"] = group.get("pending", 0)
+    metrics["consumers"] = [
+        {"name": c["name"], "pending": c["pending"], "idle_ms": c["idle"]}
+        for c in await client.xinfo_consumers(JOB_STREAM, MATCHER_GROUP)
+    ]
+    if metrics["pending"]:
+        oldest = await client.xpending_range(JOB_STREAM, MATCHER_GROUP, min="-", max="+", count=1)
+        if oldest:
+            metrics["oldest_pending_ms"] = oldest[0]["time_since_delivered"]
+    return metrics
@@ -1,10 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List
 from loguru import logger
-from sentence_transformers import SentenceTransformer
-
-# Shared model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+from app.services.embeddings import model, embed_job, EMBEDDING_VERSION  # noqa: F401 (model is re-used by form_filler_service)
 
 class BaseJobAdapter(ABC):
     @abstractmethod
@@ -20,8 +17,7 @@ class BaseJobAdapter(ABC):
         company = job_data.get("company", "")
         description = job_data.get("description", "")
         
-        combined_text = f"Title: {title}\nCompany: {company}\nDescription: {description}"
-        embedding = model.encode(combined_text).tolist()
+        embedding = embed_job(title, company, description)
         
         return {
             "source": self.__class__.__name__,
@@ -29,6 +25,7 @@ class BaseJobAdapter(ABC):
             "company": company,
             "description": description,
             "embedding": embedding,
+            "embedding_model": EMBEDDING_VERSION,
             "metadata_json": job_data.get("metadata", {})
         }
 
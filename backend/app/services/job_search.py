@@ -0,0 +1,161 @@
+"""
+Hybrid job search: full-text + vector similarity, merged with reciprocal rank fusion.
+
+A query runs two index-backed candidate searches over the same filters:
+
+- lexical: `job_postings.search_vector` (english tsvector over title, company, location and
+  description, GIN index) matched with websearch_to_tsquery and ranked by ts_rank_cd.
+  This catches exact terms such as "rust" or a company name.
+- semantic: cosine distance between the query's MiniLM embedding and the job embeddings
+  (halfvec HNSW index with exact rerank, see vector_search.py). This catches paraphrases
+  ("backend" vs "server-side"). Only jobs embedded by the current model version take part.
+
+Each list contributes 1 / (RRF_K + rank) per job, and jobs are ordered by the sum. RRF
+needs no score calibration between the two rankers, and a job found by both outranks a
+job found by only one. Query embeddings are cached in-process, so repeated and paged
+searches skip the model.
+"""
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.job_posting import JobPosting
+from app.services import vector_search
+
+# Standard RRF damping constant; higher values flatten the contribution of top ranks
+RRF_K = 60
+
+# Each ranker contributes at least this many candidates, and at most MAX_CANDIDATES
+MIN_CANDIDATES = 100
+MAX_CANDIDATES = 1000
+
+# Semantic candidates further than this (cosine distance) are unrelated to the query
+VECTOR_MAX_DISTANCE = 0.75
+
+_QUERY_EMBEDDING_CACHE_SIZE = 2048
+
+
+@dataclass
+class JobSearchFilters:
+    company: Optional[str] = None
+    location: Optional[str] = None
+    source: Optional[str] = None
+    posted_after: Optional[datetime] = None
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.company:
+            conditions.append(func.lower(JobPosting.company) == self.company.strip().lower())
+        if self.location:
+            conditions.append(JobPosting.location.ilike(f"%{self.location.strip()}%"))
+        if self.source:
+            conditions.append(JobPosting.source == self.source)
+        if self.posted_after:
+            conditions.append(JobPosting.created_at >= self.posted_after)
+        return conditions
+
+
+@dataclass
+class JobSearchHit:
+    job: JobPosting
+    score: float
+    lexical_rank: Optional[int]
+    vector_rank: Optional[int]
+
+    def as_dict(self) -> dict:
+        # Shallow on purpose: `job` stays the ORM object for response-model serialization
+        return {
+            "job": self.job,
+            "score": self.score,
+            "lexical_rank": self.lexical_rank,
+            "vector_rank": self.vector_rank,
+        }
+
+
+def normalize_query(q: str) -> str:
+    return " ".join(q.lower().split())
+
+
+@lru_cache(maxsize=_QUERY_EMBEDDING_CACHE_SIZE)
+def _embed_query_cached(query: str) -> Tuple[float, ...]:
+    from app.services.embeddings import embed
+    return tuple(embed(query))
+
+
+async def embed_query(q: str) -> List[float]:
+    """MiniLM embedding for a normalized query; the forward pass runs off the event loop."""
+    return list(await asyncio.to_thread(_embed_query_cached, normalize_query(q)))
+
+
+async def _lexical_candidates(db: AsyncSession, q: str, conditions: list, depth: int) -> List[int]:
+    tsquery = func.websearch_to_tsquery("english", q)
+    stmt = (
+        select(JobPosting.id)
+        .where(JobPosting.search_vector.op("@@")(tsquery), *conditions)
+        .order_by(func.ts_rank_cd(JobPosting.search_vector, tsquery).desc(), JobPosting.id.desc())
+        .limit(depth)
+    )
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def _vector_candidates(db: AsyncSession, embedding: List[float], conditions: list, depth: int) -> List[int]:
+    from app.services.embeddings import EMBEDDING_VERSION
+    await vector_search.set_ef_search(db, vector_search.ann_candidates(depth))
+    # The query is embedded by the current model; jobs still on an older one are not comparable
+    conditions = [*conditions, JobPosting.embedding_model == EMBEDDING_VERSION]
+    stmt = vector_search.nearest_jobs_stmt(embedding, depth, conditions, max_distance=VECTOR_MAX_DISTANCE)
+    return list((await db.execute(stmt)).scalars().all())
+
+
+def reciprocal_rank_fusion(*rankings: List[int], k: int = RRF_K) -> List[Tuple[int, float, List[Optional[int]]]]:
+    """
+    Fuse ranked id lists. Returns (id, score, [1-based rank in each list or None]),
+    best first; ties break on the higher id (newer job).
+    """
+    scores: Dict[int, float] = {}
+    ranks: Dict[int, List[Optional[int]]] = {}
+    for i, ranking in enumerate(rankings):
+        for position, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + position)
+            ranks.setdefault(item_id, [None] * len(rankings))[i] = position
+    ordered = sorted(scores, key=lambda item_id: (scores[item_id], item_id), reverse=True)
+    return [(item_id, scores[item_id], ranks[item_id]) for item_id in ordered]
+
+
+async def search_jobs(
+    db: AsyncSession,
+    q: str,
+    filters: Optional[JobSearchFilters] = None,
+    *,
+    limit: int = 20,
+    skip: int = 0,
+) -> Tuple[List[JobSearchHit], int]:
+    """
+    Hybrid search. Returns (hits for the requested page, number of fused candidates).
+    Both rankers fetch enough candidates to cover skip + limit, so deeper pages cost more.
+    """
+    conditions = (filters or JobSearchFilters()).conditions()
+    depth = min(max(MIN_CANDIDATES, skip + limit), MAX_CANDIDATES)
+
+    embedding = await embed_query(q)
+    lexical = await _lexical_candidates(db, q, conditions, depth)
+    semantic = await _vector_candidates(db, embedding, conditions, depth)
+
+    fused = reciprocal_rank_fusion(lexical, semantic)
+    page = fused[skip:skip + limit]
+    if not page:
+        return [], len(fused)
+
+    res = await db.execute(select(JobPosting).where(JobPosting.id.in_([item_id for item_id, _, _ in page])))
+    jobs: Dict[int, Any] = {job.id: job for job in res.scalars().all()}
+    hits = [
+        JobSearchHit(job=jobs[item_id], score=round(score, 6), lexical_rank=ranks[0], vector_rank=ranks[1])
+        for item_id, score, ranks in page
+        if item_id in jobs
+    ]
+    return hits, len(fused)
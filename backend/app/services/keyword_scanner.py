@@ -0,0 +1,104 @@
+"""
+Single-pass multi-keyword scanning.
+
+Heuristics across the app ask "which of these N keywords occur in this text?", which used
+to be N separate `kw in text` scans. A KeywordScanner compiles every keyword (grouped into
+named classes) and optional regex patterns into one regular expression, walks the text
+once in the C regex engine, and reports per-class results.
+
+Keyword semantics match plain substring containment exactly: a keyword counts once if it
+appears anywhere in the text, including inside a longer keyword ("java" in "javascript").
+Pattern classes count non-overlapping matches of each pattern, summed over the class
+(the same total as calling re.findall per pattern). At a single start position only the
+first matching alternative is reported, so keywords and patterns should not share a
+leading character (in practice patterns start with digits or symbols).
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Mapping, Optional, Set
+
+
+@dataclass
+class ScanResult:
+    keywords: Dict[str, Set[str]]   # class -> distinct keywords found
+    patterns: Dict[str, int]        # class -> non-overlapping pattern match count
+
+    def count(self, cls: str) -> int:
+        """Distinct keywords found for a keyword class, or match count for a pattern class."""
+        if cls in self.keywords:
+            return len(self.keywords[cls])
+        return self.patterns.get(cls, 0)
+
+
+class KeywordScanner:
+    def __init__(
+        self,
+        keyword_classes: Mapping[str, Iterable[str]],
+        pattern_classes: Optional[Mapping[str, Iterable[str]]] = None,
+    ):
+        self._classes_of: Dict[str, FrozenSet[str]] = {}
+        for cls, words in keyword_classes.items():
+            for w in words:
+                if w:
+                    self._classes_of[w] = self._classes_of.get(w, frozenset()) | {cls}
+        self._keyword_classes = tuple(keyword_classes)
+        self._pattern_classes = tuple(pattern_classes or ())
+
+        # Longest first, so the alternation reports the longest keyword starting at a position;
+        # every shorter keyword contained in it is recovered from the precomputed closure.
+        words = sorted(self._classes_of, key=len, reverse=True)
+        self._contained = {w: frozenset(k for k in words if k in w) for w in words}
+        keyword_alt = "|".join(map(re.escape, words))
+
+        alternatives = []
+        if keyword_alt:
+            alternatives.append(f"(?P<kw>{keyword_alt})")
+        # One named group per pattern, mapped to the class it counts towards
+        self._pattern_groups: Dict[str, str] = {}
+        for i, cls in enumerate(self._pattern_classes):
+            for j, pattern in enumerate(pattern_classes[cls]):
+                name = f"p{i}_{j}"
+                alternatives.append(f"(?P<{name}>{pattern})")
+                self._pattern_groups[name] = cls
+
+        # Zero-width lookahead at each position lets overlapping keywords be seen in one pass
+        self._scan_re = re.compile(f"(?=(?:{'|'.join(alternatives)}))") if alternatives else None
+        self._has_keywords = bool(keyword_alt)
+        self._any_re = re.compile(keyword_alt) if keyword_alt else None
+
+    def scan(self, text: str) -> ScanResult:
+        """Walk `text` once. Callers lowercase first if they want case-insensitive keywords."""
+        keywords: Dict[str, Set[str]] = {cls: set() for cls in self._keyword_classes}
+        patterns: Dict[str, int] = {cls: 0 for cls in self._pattern_classes}
+        if self._scan_re is None:
+            return ScanResult(keywords, patterns)
+
+        seen_longest = set()
+        pattern_end = dict.fromkeys(self._pattern_groups, 0)
+        for m in self._scan_re.finditer(text):
+            word = m.group("kw") if self._has_keywords else None
+            if word is not None:
+                seen_longest.add(word)
+                continue
+            name = m.lastgroup
+            # Only count a match that does not overlap the previous match of the same pattern
+            if name in pattern_end and m.start(name) >= pattern_end[name]:
+                patterns[self._pattern_groups[name]] += 1
+                pattern_end[name] = m.end(name)
+
+        for longest in seen_longest:
+            for word in self._contained[longest]:
+                for cls in self._classes_of[word]:
+                    keywords[cls].add(word)
+        return ScanResult(keywords, patterns)
+
+    def contains_any(self, text: str) -> bool:
+        """True if any keyword occurs in `text` (stops at the first hit)."""
+        return self._any_re is not None and self._any_re.search(text) is not None
+
+
+@lru_cache(maxsize=256)
+def scanner_for_terms(terms: FrozenSet[str]) -> KeywordScanner:
+    """Cached single-class scanner for ad-hoc term lists (e.g. a user's keyword filter)."""
+    return KeywordScanner({"terms": terms})
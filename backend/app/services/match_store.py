@@ -0,0 +1,176 @@
+"""
+Incrementally maintained job/resume match scores (the job_resume_matches table).
+
+Scores are written when either side changes, so "best matches" views are an index range
+scan instead of a similarity pass over every job:
+
+- New jobs: score_jobs() scores a batch of jobs against every completed resume in one
+  INSERT ... SELECT, then trims each affected resume back to its top MATCHES_PER_RESUME.
+- New or re-embedded resumes: rescore_resume() replaces the resume's rows with its nearest
+  recent jobs, found through the halfvec HNSW index and reranked exactly (vector_search.py).
+- Full rebuilds: the worker scores resumes in batches against the mapped embedding
+  snapshot (vector_snapshot.py) and writes each result with replace_resume_matches().
+
+Only vectors from the same embedding model version are compared (services/embeddings.py).
+Both run inside the caller's transaction; the caller commits.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.db.models.match import JobResumeMatch
+from app.services.pagination import fetch_page
+from app.services import vector_search
+
+# Best-scoring jobs kept per resume
+MATCHES_PER_RESUME = 200
+
+# Scores below this (cosine similarity < 0) are never worth storing
+MIN_STORED_SCORE = 50.0
+
+# A (re)embedded resume is matched against jobs posted within this window
+RESCORE_WINDOW_DAYS = 30
+
+_SCORE_SQL = "(1 - (r.embedding <=> j.embedding) / 2) * 100"
+
+
+async def _trim(db: AsyncSession, resume_ids: List[int]) -> None:
+    """Drop rows beyond each resume's top MATCHES_PER_RESUME."""
+    await db.execute(
+        text("""
+            DELETE FROM job_resume_matches m
+            USING (
+                SELECT job_id, resume_id FROM (
+                    SELECT job_id, resume_id,
+                           row_number() OVER (PARTITION BY resume_id ORDER BY score DESC, job_id DESC) AS rn
+                    FROM job_resume_matches
+                    WHERE resume_id = ANY(:resume_ids)
+                ) ranked
+                WHERE rn > :keep
+            ) extra
+            WHERE m.job_id = extra.job_id AND m.resume_id = extra.resume_id
+        """),
+        {"resume_ids": resume_ids, "keep": MATCHES_PER_RESUME},
+    )
+
+
+async def score_jobs(db: AsyncSession, job_ids: Iterable[int]) -> int:
+    """Score newly ingested jobs against all completed resumes. Returns rows written."""
+    job_ids = sorted(set(job_ids))
+    if not job_ids:
+        return 0
+    result = await db.execute(
+        text(f"""
+            INSERT INTO job_resume_matches (job_id, resume_id, user_id, score, created_at, updated_at)
+            SELECT j.id, r.id, r.user_id, {_SCORE_SQL}, now(), now()
+            FROM job_postings j
+            JOIN resumes r ON r.embedding IS NOT NULL AND r.status = 'completed'
+                           AND r.embedding_model = j.embedding_model
+            WHERE j.id = ANY(:job_ids)
+              AND j.embedding IS NOT NULL
+              AND {_SCORE_SQL} >= :min_score
+            ON CONFLICT (job_id, resume_id) DO UPDATE
+                SET score = EXCLUDED.score, updated_at = now()
+            RETURNING resume_id
+        """),
+        {"job_ids": job_ids, "min_score": MIN_STORED_SCORE},
+    )
+    rows = result.scalars().all()
+    if rows:
+        await _trim(db, sorted(set(rows)))
+    return len(rows)
+
+
+async def rescore_resume(db: AsyncSession, resume_id: int) -> int:
+    """Replace a resume's matches with its nearest recent jobs. Returns rows written."""
+    await db.execute(text("DELETE FROM job_resume_matches WHERE resume_id = :resume_id"), {"resume_id": resume_id})
+    candidates = vector_search.ann_candidates(MATCHES_PER_RESUME)
+    await vector_search.set_ef_search(db, candidates)
+    # Inner scan walks the halfvec index; the outer ORDER BY reranks by exact float32 distance
+    result = await db.execute(
+        text(f"""
+            INSERT INTO job_resume_matches (job_id, resume_id, user_id, score, created_at, updated_at)
+            SELECT j.id, r.id, r.user_id, {_SCORE_SQL}, now(), now()
+            FROM resumes r
+            CROSS JOIN LATERAL (
+                SELECT ann.id, ann.embedding FROM (
+                    SELECT id, embedding FROM job_postings
+                    WHERE embedding_half IS NOT NULL AND created_at >= :since
+                      AND embedding_model = r.embedding_model
+                    ORDER BY embedding_half <=> r.embedding::halfvec({vector_search.EMBEDDING_DIM})
+                    LIMIT :candidates
+                ) ann
+                ORDER BY ann.embedding <=> r.embedding
+                LIMIT :keep
+            ) j
+            WHERE r.id = :resume_id
+              AND r.embedding IS NOT NULL
+              AND {_SCORE_SQL} >= :min_score
+            RETURNING job_id
+        """),
+        {
+            "resume_id": resume_id,
+            "since": datetime.utcnow() - timedelta(days=RESCORE_WINDOW_DAYS),
+            "candidates": candidates,
+            "keep": MATCHES_PER_RESUME,
+            "min_score": MIN_STORED_SCORE,
+        },
+    )
+    return len(result.scalars().all())
+
+
+async def replace_resume_matches(
+    db: AsyncSession, resume_id: int, user_id: int, job_ids: Sequence[int], scores: Sequence[float],
+) -> int:
+    """Replace a resume's matches with precomputed (job_id, score) pairs. Returns rows written."""
+    await db.execute(text("DELETE FROM job_resume_matches WHERE resume_id = :resume_id"), {"resume_id": resume_id})
+    rows = [
+        {"job_id": int(job_id), "score": float(score)}
+        for job_id, score in zip(job_ids, scores)
+        if score >= MIN_STORED_SCORE
+    ][:MATCHES_PER_RESUME]
+    if not rows:
+        return 0
+    # The snapshot may still list jobs deleted since the export; the join drops them
+    result = await db.execute(
+        text("""
+            INSERT INTO job_resume_matches (job_id, resume_id, user_id, score, created_at, updated_at)
+            SELECT j.id, :resume_id, :user_id, s.score, now(), now()
+            FROM unnest(CAST(:job_ids AS integer[]), CAST(:scores AS double precision[])) AS s(job_id, score)
+            JOIN job_postings j ON j.id = s.job_id
+            ON CONFLICT (job_id, resume_id) DO UPDATE
+                SET score = EXCLUDED.score, updated_at = now()
+            RETURNING job_id
+        """),
+        {
+            "resume_id": resume_id,
+            "user_id": user_id,
+            "job_ids": [r["job_id"] for r in rows],
+            "scores": [r["score"] for r in rows],
+        },
+    )
+    return len(result.scalars().all())
+
+
+async def best_matches(
+    db: AsyncSession,
+    user_id: int,
+    min_score: float,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    resume_id: Optional[int] = None,
+):
+    """A user's stored matches at or above `min_score`, best first. Returns (matches, next_cursor)."""
+    stmt = (
+        select(JobResumeMatch)
+        .options(selectinload(JobResumeMatch.job))
+        .where(JobResumeMatch.user_id == user_id, JobResumeMatch.score >= min_score)
+    )
+    if resume_id is not None:
+        stmt = stmt.where(JobResumeMatch.resume_id == resume_id)
+    key_columns = (JobResumeMatch.score, JobResumeMatch.job_id, JobResumeMatch.resume_id)
+    return await fetch_page(db, stmt, key_columns, limit=limit, cursor=cursor)
@@ -22,6 +22,7 @@ async def find_best_resume_for_job(db: AsyncSession, job_id: int, user_id: int)
         select(Resume, Resume.embedding.cosine_distance(job.embedding).label("distance"))
         .where(Resume.user_id == user_id)
         .where(Resume.embedding.is_not(None))
+        .where(Resume.embedding_model == job.embedding_model)  # vectors from different models don't compare
         .order_by(Resume.embedding.cosine_distance(job.embedding))
         .limit(1)
     )
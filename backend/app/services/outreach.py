@@ -0,0 +1,194 @@
+"""
+Outreach ledger and work queue for scheduled cold mail.
+
+The scheduler reserves today's quota with an atomic counter, enqueues the next contacts
+this user has not mailed yet into the `outreach` ledger, and then drains queued rows with
+FOR UPDATE SKIP LOCKED so several workers can dispatch concurrently without double-sending.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from loguru import logger
+from sqlalchemy import select, update, exists, and_, or_, literal, text, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.contact import ScrapedContact
+from app.db.models.outreach import Outreach, OutreachDailyCounter
+
+# A failed send is retried on later cycles until it has been attempted this many times
+MAX_ATTEMPTS = 3
+
+# Rows stuck in "sending" longer than this (worker died mid-send) go back to the queue
+STALE_CLAIM_AFTER = timedelta(hours=1)
+
+
+def _today():
+    return datetime.now(timezone.utc).date()
+
+
+async def reserve_daily_quota(db: AsyncSession, user_id: int, limit: int) -> int:
+    """
+    Atomically reserve as many of today's remaining sends as possible (up to `limit`).
+    Returns the number of slots granted. Concurrent callers serialize on the counter row,
+    so the sum of grants never exceeds the daily limit.
+    """
+    if not limit or limit <= 0:
+        return 0
+    day = _today()
+    await db.execute(
+        pg_insert(OutreachDailyCounter)
+        .values(user_id=user_id, day=day, reserved=0)
+        .on_conflict_do_nothing(index_elements=["user_id", "day"])
+    )
+    result = await db.execute(
+        text("""
+            WITH prev AS (
+                SELECT reserved FROM outreach_daily_counters
+                WHERE user_id = :user_id AND day = :day
+                FOR UPDATE
+            )
+            UPDATE outreach_daily_counters AS c
+            SET reserved = LEAST(c.reserved + :limit, :limit)
+            FROM prev
+            WHERE c.user_id = :user_id AND c.day = :day AND c.reserved < :limit
+            RETURNING c.reserved - prev.reserved
+        """),
+        {"user_id": user_id, "day": day, "limit": limit},
+    )
+    return result.scalar() or 0
+
+
+async def release_daily_quota(db: AsyncSession, user_id: int, count: int) -> None:
+    """Give back reserved slots that could not be used (e.g. not enough unsent contacts)."""
+    if count <= 0:
+        return
+    await db.execute(
+        update(OutreachDailyCounter)
+        .where(OutreachDailyCounter.user_id == user_id, OutreachDailyCounter.day == _today())
+        .values(reserved=func.greatest(OutreachDailyCounter.reserved - count, 0))
+    )
+
+
+async def enqueue_next_contacts(db: AsyncSession, user_id: int, template_id: int, resume_id: int, limit: int) -> int:
+    """
+    Queue up to `limit` contacts this user has not mailed yet. Previously failed
+    (user, contact, template) rows are re-queued with their attempt counter bumped.
+    Returns the number of rows queued.
+    """
+    if limit <= 0:
+        return 0
+
+    already_mailed = exists().where(
+        Outreach.user_id == user_id,
+        Outreach.contact_id == ScrapedContact.id,
+        Outreach.status != "failed",
+    )
+    candidates = (
+        select(
+            literal(user_id), ScrapedContact.id, literal(template_id), literal(resume_id),
+            literal("queued"), literal(1),
+        )
+        .where(~already_mailed)
+        .order_by(ScrapedContact.id)
+        .limit(limit)
+    )
+    stmt = pg_insert(Outreach).from_select(
+        ["user_id", "contact_id", "template_id", "resume_id", "status", "attempts"], candidates
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_outreach_user_contact_template",
+        set_={
+            "status": "queued",
+            "attempts": Outreach.attempts + 1,
+            "resume_id": stmt.excluded.resume_id,
+            "error": None,
+            "claimed_at": None,
+            "updated_at": func.now(),
+        },
+        where=and_(Outreach.status == "failed", Outreach.attempts < MAX_ATTEMPTS),
+    ).returning(Outreach.id)
+
+    result = await db.execute(stmt)
+    return len(result.scalars().all())
+
+
+async def requeue_stale_claims(db: AsyncSession) -> int:
+    """Return rows abandoned mid-send by a crashed worker to the queue."""
+    cutoff = datetime.now(timezone.utc) - STALE_CLAIM_AFTER
+    result = await db.execute(
+        update(Outreach)
+        .where(Outreach.status == "sending", Outreach.claimed_at < cutoff)
+        .values(status="queued", claimed_at=None)
+    )
+    await db.commit()
+    if result.rowcount:
+        logger.warning(f"Re-queued {result.rowcount} stale outreach claims")
+    return result.rowcount
+
+
+async def claim_queued(db: AsyncSession, batch_size: int = 100) -> List[Outreach]:
+    """
+    Claim a batch of queued sends. Rows locked by another worker are skipped, and the
+    claim is committed before returning so the lock is held only for the status flip.
+    """
+    stmt = (
+        select(Outreach)
+        .where(Outreach.status == "queued")
+        .order_by(Outreach.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = (await db.execute(stmt)).scalars().all()
+    now = datetime.now(timezone.utc)
+    for row in rows:
+        row.status = "sending"
+        row.claimed_at = now
+    await db.commit()
+    return list(rows)
+
+
+async def record_outreach_result(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    contact_id: int,
+    template_id: int,
+    resume_id: Optional[int] = None,
+    outreach_id: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    """
+    Mark a send as sent or failed. Scheduled sends update their claimed ledger row;
+    manual dispatches upsert one so the scheduler will not mail that contact again.
+    Does not commit — the caller commits alongside its ActionLog.
+    """
+    now = datetime.now(timezone.utc)
+    if outreach_id is not None:
+        values = {"status": "sent", "sent_at": now, "error": None}
+        if error:
+            attempts = (await db.execute(select(Outreach.attempts).where(Outreach.id == outreach_id))).scalar()
+            exhausted = attempts is not None and attempts >= MAX_ATTEMPTS
+            values = {"status": "abandoned" if exhausted else "failed", "error": error[:2000]}
+        await db.execute(update(Outreach).where(Outreach.id == outreach_id).values(**values))
+        return
+
+    status = "failed" if error else "sent"
+    stmt = pg_insert(Outreach).values(
+        user_id=user_id, contact_id=contact_id, template_id=template_id, resume_id=resume_id,
+        status=status, attempts=1, error=error[:2000] if error else None,
+        sent_at=None if error else now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_outreach_user_contact_template",
+        set_={
+            "status": stmt.excluded.status,
+            "error": stmt.excluded.error,
+            "sent_at": stmt.excluded.sent_at,
+            "resume_id": stmt.excluded.resume_id,
+            "updated_at": func.now(),
+        },
+        # A failed manual retry must not un-send a contact that was already mailed
+        where=or_(Outreach.status != "sent", stmt.excluded.status == "sent"),
+    )
+    await db.execute(stmt)
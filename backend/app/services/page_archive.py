@@ -0,0 +1,197 @@
+"""
+Local archive of every fetched job page, for offline reparsing (app.worker.reparse).
+
+Page bodies are zstd-compressed and stored content-addressed, so an unchanged page
+re-fetched on every crawl is stored only once:
+
+    <root>/objects/ab/cd/<sha256>.zst
+
+Each fetch also appends a header line to the index file for its UTC day:
+
+    <root>/index/2026-03-19.jsonl   {"url", "fetched_at", "status", "tier", "sha256", "size", ...}
+
+`tier` says how the page was fetched: "static" (plain HTTP) or "headless" (rendered by
+Playwright). A snapshot is an index line plus the object it points to. Appends are single
+small O_APPEND writes, so concurrent worker processes can share one index file.
+
+Retention works per day: prune() deletes index files older than PAGE_ARCHIVE_RETENTION_DAYS,
+then deletes every object that no remaining index line references.
+
+Archiving never fails a crawl. Errors, or a missing `zstandard` module, are logged and the
+page is skipped.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Optional, Set, Union
+
+from loguru import logger
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # archive disabled; crawling is unaffected
+    zstandard = None
+
+_OBJECTS = "objects"
+_INDEX = "index"
+
+_PRUNE_GRACE_SECONDS = 3600
+
+
+@dataclass
+class PageSnapshot:
+    url: str
+    fetched_at: str  # ISO 8601, UTC
+    status: int
+    tier: str  # static, headless
+    sha256: str
+    size: int
+    content_type: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "fetched_at": self.fetched_at,
+            "status": self.status,
+            "tier": self.tier,
+            "sha256": self.sha256,
+            "size": self.size,
+            "content_type": self.content_type,
+        }
+
+
+def _root() -> Path:
+    return Path(settings.PAGE_ARCHIVE_DIR)
+
+
+def _object_path(root: Path, sha256: str) -> Path:
+    return root / _OBJECTS / sha256[:2] / sha256[2:4] / f"{sha256}.zst"
+
+
+def enabled() -> bool:
+    return settings.PAGE_ARCHIVE_ENABLED and zstandard is not None
+
+
+def archive_page(
+    url: str,
+    body: Union[bytes, str],
+    *,
+    status: int,
+    tier: str,
+    content_type: Optional[str] = None,
+) -> Optional[PageSnapshot]:
+    """Store one fetched page. Returns its snapshot header, or None when archiving is off or failed."""
+    if not enabled():
+        return None
+    try:
+        raw = body.encode("utf-8") if isinstance(body, str) else bytes(body)
+        root = _root()
+        sha256 = hashlib.sha256(raw).hexdigest()
+        path = _object_path(root, sha256)
+        if path.exists():
+            os.utime(path)  # marks it live for a prune() running concurrently
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            compressed = zstandard.ZstdCompressor(level=settings.PAGE_ARCHIVE_ZSTD_LEVEL).compress(raw)
+            fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=path.parent)
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    out.write(compressed)
+                os.replace(tmp, path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+
+        now = datetime.now(timezone.utc)
+        snapshot = PageSnapshot(
+            url=url,
+            fetched_at=now.isoformat(),
+            status=int(status),
+            tier=tier,
+            sha256=sha256,
+            size=len(raw),
+            content_type=content_type,
+        )
+        index_dir = root / _INDEX
+        index_dir.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(snapshot.as_dict(), separators=(",", ":")) + "\n").encode("utf-8")
+        fd = os.open(index_dir / f"{now.date().isoformat()}.jsonl", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        return snapshot
+    except Exception as e:
+        logger.warning(f"Could not archive page {url}: {e}")
+        return None
+
+
+def read_body(sha256: str) -> bytes:
+    """Decompressed page body. Raises FileNotFoundError when the object was pruned."""
+    if zstandard is None:
+        raise RuntimeError("zstandard is not installed")
+    with open(_object_path(_root(), sha256), "rb") as f:
+        return zstandard.ZstdDecompressor().decompress(f.read())
+
+
+def _index_files(root: Path, since: Optional[date] = None, until: Optional[date] = None) -> Iterator[Path]:
+    for path in sorted((root / _INDEX).glob("*.jsonl")):
+        try:
+            day = date.fromisoformat(path.stem)
+        except ValueError:
+            continue
+        if (since and day < since) or (until and day > until):
+            continue
+        yield path
+
+
+def iter_snapshots(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    url_contains: Optional[str] = None,
+) -> Iterator[PageSnapshot]:
+    """Archived snapshot headers, oldest day first, filtered by fetch day and URL substring."""
+    needle = url_contains.lower() if url_contains else None
+    for path in _index_files(_root(), since, until):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    snapshot = PageSnapshot(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # a torn line from a crash mid-append
+                if needle and needle not in snapshot.url.lower():
+                    continue
+                yield snapshot
+
+
+def prune(retention_days: Optional[int] = None) -> dict:
+    """Drop index days past retention, then every object no remaining snapshot references."""
+    root = _root()
+    if not (root / _INDEX).exists():
+        return {"index_files": 0, "objects": 0}
+    # Objects written or re-referenced while the index is being read are left for the next run
+    grace_before = time.time() - _PRUNE_GRACE_SECONDS
+    days = settings.PAGE_ARCHIVE_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
+
+    removed_days = 0
+    for path in _index_files(root, until=cutoff - timedelta(days=1)):
+        path.unlink(missing_ok=True)
+        removed_days += 1
+
+    referenced: Set[str] = {snapshot.sha256 for snapshot in iter_snapshots()}
+    removed_objects = 0
+    for path in (root / _OBJECTS).glob("*/*/*.zst"):
+        if path.name[:-len(".zst")] not in referenced and path.stat().st_mtime < grace_before:
+            path.unlink(missing_ok=True)
+            removed_objects += 1
+
+    logger.info(f"Pruned page archive: {removed_days} index days, {removed_objects} objects (kept {days} days)")
+    return {"index_files": removed_days, "objects": removed_objects}
@@ -0,0 +1,132 @@
+"""
+Offline HTML parsers for job pages: pure functions of a parsed page, with no network access
+or model calls. The scraper applies them to freshly fetched pages, and app.worker.reparse
+replays them over archived snapshots (see page_archive.py).
+"""
+import json
+from typing import Callable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+
+def parse_remoteok_jobs(soup):
+    """Site-specific parser for RemoteOK."""
+    jobs = []
+    for row in soup.find_all('tr', class_='job'):
+        title_el = row.find('h2')
+        company_el = row.find('h3')
+        tags = [tag.get_text(strip=True) for tag in row.find_all('div', class_='tag')]
+        if title_el:
+            jobs.append({
+                "title": title_el.get_text(strip=True),
+                "company": company_el.get_text(strip=True) if company_el else "Unknown",
+                "location": "Remote",
+                "description": f"Tags: {', '.join(tags[:5])}" if tags else "Remote position",
+            })
+    return jobs
+
+
+def parse_hackernews_jobs(soup):
+    """Site-specific parser for Hacker News jobs."""
+    jobs = []
+    for item in soup.find_all('tr', class_='athing'):
+        title_link = item.find('a', class_='titleline') or item.find('span', class_='titleline')
+        if title_link:
+            text = title_link.get_text(strip=True)
+            if len(text) > 10 and len(text) < 200:
+                # Try to extract company from " at Company" or "Company - " patterns
+                company = "YC Company"
+                if " at " in text:
+                    parts = text.split(" at ", 1)
+                    company = parts[1].split("(")[0].strip() if len(parts) > 1 else company
+                elif " - " in text:
+                    company = text.split(" - ")[0].strip()
+                jobs.append({
+                    "title": text,
+                    "company": company,
+                    "location": "Remote / On-site",
+                    "description": text,
+                })
+    return jobs
+
+
+def parse_weworkremotely_jobs(soup):
+    """Site-specific parser for WeWorkRemotely."""
+    jobs = []
+    for listing in soup.find_all('li', class_='feature'):
+        link = listing.find('a')
+        if not link:
+            continue
+        spans = link.find_all('span')
+        title = ""
+        company = ""
+        for span in spans:
+            cls = span.get('class', [])
+            if 'title' in cls:
+                title = span.get_text(strip=True)
+            elif 'company' in cls:
+                company = span.get_text(strip=True)
+        if title:
+            jobs.append({
+                "title": title,
+                "company": company or "Unknown",
+                "location": "Remote",
+                "description": f"{title} at {company}" if company else title,
+            })
+    return jobs
+
+
+def parse_json_ld_jobs(soup):
+    """Extract job postings from JSON-LD structured data."""
+    jobs = []
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string)
+            items = data if isinstance(data, list) else [data]
+            for item in list(items):
+                if isinstance(item, dict) and item.get('@graph'):
+                    items.extend(item['@graph'])
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                item_type = str(item.get('@type', ''))
+                if 'JobPosting' not in item_type:
+                    continue
+                title = item.get('title') or item.get('name', '')
+                company = ''
+                org = item.get('hiringOrganization', {})
+                if isinstance(org, dict):
+                    company = org.get('name', '')
+                location = ''
+                loc = item.get('jobLocation', {})
+                if isinstance(loc, dict):
+                    addr = loc.get('address', {})
+                    if isinstance(addr, dict):
+                        location = addr.get('addressLocality', '')
+                description = item.get('description', '')
+                if '<' in description:
+                    description = BeautifulSoup(description, 'html.parser').get_text(separator=' ', strip=True)
+                if title:
+                    jobs.append({"title": title.strip(), "company": company.strip() or "Unknown",
+                                 "location": location.strip() or "Not specified",
+                                 "description": (description[:500] if description else title)})
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            continue
+    return jobs
+
+
+# Sites with a dedicated parser, matched on a substring of the lowercased URL
+_SITE_PARSERS: List[Tuple[Tuple[str, ...], str, Callable]] = [
+    (("remoteok.com",), "remoteok", parse_remoteok_jobs),
+    (("news.ycombinator.com", "ycombinator.com/jobs"), "hackernews", parse_hackernews_jobs),
+    (("weworkremotely.com",), "weworkremotely", parse_weworkremotely_jobs),
+]
+
+
+def site_parser(url: str) -> Optional[Tuple[str, Callable]]:
+    """(name, parser) of the site-specific parser for `url`, or None."""
+    url_lower = url.lower()
+    for needles, name, parser in _SITE_PARSERS:
+        if any(needle in url_lower for needle in needles):
+            return name, parser
+    return None
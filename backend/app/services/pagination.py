@@ -0,0 +1,167 @@
+"""
+Keyset pagination and cheap totals for list endpoints.
+
+Pages are ordered by a fixed key, newest first — (created_at, id) by default — and the
+client gets an opaque `next_cursor` that encodes the last row's key. The next page is a
+`WHERE (key) < (cursor)` range scan on an index, so page N costs the same as page 1.
+`skip` still works for old clients but degrades with depth like any OFFSET.
+
+Totals avoid a count(*) per page: unfiltered lists use the planner's row estimate from
+pg_class, filtered lists use a short-lived cached count, and `exact=true` forces a real
+count. Small tables are always counted exactly since that is cheap.
+"""
+import base64
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, text, tuple_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Below this many estimated rows, an exact count is cheaper than being wrong
+EXACT_COUNT_THRESHOLD = 10_000
+
+# Filtered counts are reused for this long
+COUNT_CACHE_TTL_SECONDS = 60
+_COUNT_CACHE_MAX = 1024
+
+_count_cache: Dict[str, Tuple[float, int]] = {}
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: int
+    total_is_estimate: bool
+
+    def as_dict(self) -> dict:
+        return {
+            "items": self.items,
+            "total": self.total,
+            "next_cursor": self.next_cursor,
+            "total_is_estimate": self.total_is_estimate,
+        }
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """Decode a cursor token. Raises HTTPException(400) for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("wrong cursor size")
+        return [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in payload]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+
+def _key_of(item: Any, key_columns: Sequence[Any]) -> List[Any]:
+    return [getattr(item, col.key) for col in key_columns]
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt,
+    key_columns: Sequence[Any],
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Run `stmt` (a select of one ORM entity, filters applied, no ORDER BY) for one page,
+    ordered by `key_columns` descending. Uses the cursor when given, else `skip`.
+    Returns (items, next_cursor).
+    """
+    stmt = stmt.order_by(*(col.desc() for col in key_columns))
+    if cursor:
+        values = decode_cursor(cursor, len(key_columns))
+        stmt = stmt.where(tuple_(*key_columns) < tuple_(*values))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    # One extra row tells us whether there is a next page without a count
+    res = await db.execute(stmt.limit(limit + 1))
+    items = list(res.scalars().all())
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(_key_of(items[-1], key_columns))
+    return items, next_cursor
+
+
+async def _planner_estimate(db: AsyncSession, table_name: str) -> int:
+    res = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"),
+        {"t": table_name},
+    )
+    return res.scalar() or -1
+
+
+def _cache_key(db: AsyncSession, stmt) -> str:
+    # Include the engine URL: personal databases can run the very same filtered query
+    compiled = stmt.compile()
+    return f"{getattr(db.bind, 'url', '')}|{compiled}|{sorted(compiled.params.items())!r}"
+
+
+async def count_total(
+    db: AsyncSession,
+    model,
+    filters: Sequence[Any] = (),
+    *,
+    exact: bool = False,
+) -> Tuple[int, bool]:
+    """Total rows matching `filters`. Returns (total, is_estimate)."""
+    count_stmt = select(func.count()).select_from(model)
+    if filters:
+        count_stmt = count_stmt.where(*filters)
+
+    if not exact and not filters:
+        estimate = await _planner_estimate(db, model.__tablename__)
+        if estimate >= EXACT_COUNT_THRESHOLD:
+            return estimate, True
+
+    if not exact and filters:
+        key = _cache_key(db, count_stmt)
+        hit = _count_cache.get(key)
+        if hit and time.monotonic() - hit[0] < COUNT_CACHE_TTL_SECONDS:
+            return hit[1], True
+
+    total = (await db.execute(count_stmt)).scalar() or 0
+    if filters:
+        if len(_count_cache) >= _COUNT_CACHE_MAX:
+            _count_cache.clear()
+        _count_cache[_cache_key(db, count_stmt)] = (time.monotonic(), total)
+    return total, False
+
+
+async def paginate(
+    db: AsyncSession,
+    model,
+    filters: Sequence[Any] = (),
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    exact: bool = False,
+    key_columns: Optional[Sequence[Any]] = None,
+    options: Sequence[Any] = (),
+) -> Page:
+    """List `model` rows matching `filters` newest first, plus a (possibly estimated) total."""
+    key_columns = key_columns or (model.created_at, model.id)
+    stmt = select(model).options(*options)
+    if filters:
+        stmt = stmt.where(*filters)
+    items, next_cursor = await fetch_page(db, stmt, key_columns, limit=limit, cursor=cursor, skip=skip)
+    total, is_estimate = await count_total(db, model, filters, exact=exact)
+    return Page(items=items, next_cursor=next_cursor, total=total, total_is_estimate=is_estimate)
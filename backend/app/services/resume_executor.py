@@ -0,0 +1,184 @@
+"""
+Isolated, warm resume parsing for the embed-cpu workers.
+
+PDF/DOCX parsing runs native code (PyMuPDF, lxml) on untrusted uploads, so a malformed file
+can hang it or crash the whole process. The parse itself therefore runs in a helper
+process. The helper imports the parser and sentence model once at start-up, then serves
+one parse per request over its stdin/stdout, so jobs only pay for the actual parse. Each
+worker process keeps one helper per event loop and sends its parses to it one at a time.
+The worker's Celery concurrency decides how many resumes are parsed at once.
+
+- Timeouts: a parse that exceeds RESUME_EXECUTOR_TIMEOUT_SECONDS fails with
+  ResumeJobTimeout. The helper is killed, so a stuck parse does not keep holding the
+  worker, and the next parse starts a fresh one.
+- Crash isolation: a helper that dies mid-parse (e.g. a MuPDF segfault on a malformed PDF)
+  takes only itself down. The parse is retried once on a fresh helper; a file that keeps
+  crashing it fails on its own, and the task marks the resume 'error' as usual.
+
+Celery prefork children are daemonic and may not own a multiprocessing pool, so the helper
+is a plain subprocess driven with asyncio. Run with no arguments, this module is that
+helper:
+
+    python -m app.services.resume_executor
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from loguru import logger
+
+from app.core.config import settings
+
+# Replies carry the full resume text; asyncio's default 64 KiB line limit is too small
+_MAX_REPLY_BYTES = 16 * 1024 * 1024
+
+
+class ResumeJobTimeout(TimeoutError):
+    pass
+
+
+class _HelperDied(Exception):
+    pass
+
+
+@contextmanager
+def _as_path(source: Union[Path, str, bytes], filename: str) -> Iterator[Path]:
+    """The helper reads files by path; bytes (non-disk blob backends) are spooled to a temp file."""
+    if not isinstance(source, (bytes, bytearray)):
+        yield Path(source)
+        return
+    fd, name = tempfile.mkstemp(suffix=Path(filename).suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+        yield Path(name)
+    finally:
+        os.unlink(name)
+
+
+class ResumeExecutor:
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+
+    # ── helper lifecycle ──
+
+    async def _helper(self) -> asyncio.subprocess.Process:
+        if self._proc is None or self._proc.returncode is not None:
+            self._proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "app.services.resume_executor",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                cwd=str(settings.BASE_DIR),
+                limit=_MAX_REPLY_BYTES,
+            )
+            logger.info(f"Started resume parser helper (pid {self._proc.pid})")
+        return self._proc
+
+    def _kill(self, reason: str) -> None:
+        """Drop a stuck or broken helper; the next parse starts a fresh one."""
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.returncode is None:
+            logger.warning(f"Killing resume parser helper (pid {proc.pid}): {reason}")
+            proc.kill()
+
+    async def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.returncode is None:
+            proc.stdin.close()  # the helper exits at end of input
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                proc.kill()
+
+    # ── jobs ──
+
+    async def _request(self, proc: asyncio.subprocess.Process, path: Path, filename: str) -> dict:
+        try:
+            proc.stdin.write(json.dumps({"path": str(path), "filename": filename}).encode("utf-8") + b"\n")
+            await proc.stdin.drain()
+            line = await proc.stdout.readline()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise _HelperDied() from e
+        if not line:
+            raise _HelperDied()
+        return json.loads(line)
+
+    async def extract(self, source: Union[Path, str, bytes], filename: str) -> dict:
+        """Run parse_and_embed_resume for one file in the helper process."""
+        async with self._lock:
+            with _as_path(source, filename) as path:
+                for attempt in (1, 2):
+                    proc = await self._helper()
+                    started = time.monotonic()
+                    try:
+                        reply = await asyncio.wait_for(self._request(proc, path, filename), timeout=self.timeout)
+                    except asyncio.TimeoutError:
+                        self._kill(f"parse of {filename} exceeded {self.timeout:.0f}s")
+                        raise ResumeJobTimeout(f"Extraction timed out after {self.timeout:.0f}s")
+                    except _HelperDied:
+                        self._kill(f"helper died while parsing {filename}")
+                        if attempt == 2:
+                            raise ValueError("Extraction crashed the parser; the file may be malformed.")
+                        logger.warning(f"Retrying {filename} after a parser crash")
+                        continue
+                    except asyncio.CancelledError:
+                        # A half-answered request would desync the next reply
+                        self._kill(f"parse of {filename} was cancelled")
+                        raise
+                    if "error" in reply:
+                        error = ValueError if reply.get("kind") == "ValueError" else RuntimeError
+                        raise error(reply["error"])
+                    logger.info(f"Parsed {filename} in {time.monotonic() - started:.1f}s")
+                    return reply["result"]
+
+
+# One executor per event loop (a Celery worker process keeps one loop, see app/worker/runtime.py)
+_executors: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ResumeExecutor]" = weakref.WeakKeyDictionary()
+
+
+def get_resume_executor() -> ResumeExecutor:
+    loop = asyncio.get_running_loop()
+    executor = _executors.get(loop)
+    if executor is None:
+        executor = _executors[loop] = ResumeExecutor(timeout=settings.RESUME_EXECUTOR_TIMEOUT_SECONDS)
+    return executor
+
+
+async def close() -> None:
+    """Stop this event loop's parser helper (worker shutdown)."""
+    executor = _executors.pop(asyncio.get_running_loop(), None)
+    if executor is not None:
+        await executor.close()
+
+
+def _serve() -> None:
+    """Helper process: one JSON request per stdin line, one JSON reply per stdout line."""
+    # Keep the reply channel to ourselves; anything else printing to stdout goes to stderr
+    replies = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    from app.services.resume_parser import parse_and_embed_resume  # loads the sentence model once
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            reply = {"result": parse_and_embed_resume(Path(request["path"]), request["filename"])}
+        except Exception as e:
+            reply = {"error": str(e) or type(e).__name__, "kind": type(e).__name__}
+        # default=float covers numpy scalars in the scores
+        replies.write(json.dumps(reply, default=float) + "\n")
+        replies.flush()
+
+
+if __name__ == "__main__":
+    _serve()
@@ -0,0 +1,85 @@
+"""
+Resume file access on top of the blob store.
+
+Resume rows only carry `blob_key` and `file_size`. Rows uploaded before the blob store
+existed still have their bytes in the deferred `file_data` column or as
+UPLOAD_DIR/<id>_<filename>; those are moved into the blob store the first time they are read.
+"""
+import asyncio
+from pathlib import Path
+from typing import Optional, Union
+
+from loguru import logger
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.resume import Resume
+from app.services.blob_store import get_blob_store
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "doc": "application/msword",
+    "txt": "text/plain",
+    "md": "text/markdown",
+}
+
+
+async def ensure_resume_blob(db: AsyncSession, resume: Resume) -> Optional[str]:
+    """
+    Return the blob key for a resume, migrating legacy storage on first access.
+    Returns None when no copy of the file exists anywhere. Does not commit.
+    """
+    store = get_blob_store()
+    if resume.blob_key and await asyncio.to_thread(store.exists, resume.blob_key):
+        return resume.blob_key
+
+    # Legacy row: load the deferred payload explicitly (never part of a normal select)
+    data = (await db.execute(select(Resume.file_data).where(Resume.id == resume.id))).scalar()
+    if not data:
+        legacy_path = settings.UPLOAD_DIR / f"{resume.id}_{resume.filename}"
+        if legacy_path.exists():
+            data = await asyncio.to_thread(legacy_path.read_bytes)
+    if not data:
+        return None
+
+    key, size = await asyncio.to_thread(store.put_bytes, data)
+    await db.execute(
+        update(Resume).where(Resume.id == resume.id).values(blob_key=key, file_size=size, file_data=None)
+    )
+    resume.blob_key = key
+    resume.file_size = size
+    logger.info(f"Resume {resume.id}: migrated {size} bytes into blob store ({key[:12]})")
+    return key
+
+
+async def read_resume_bytes(db: AsyncSession, resume: Resume) -> Optional[bytes]:
+    """Read the full resume file (e.g. for a MIME attachment). Returns None if unavailable."""
+    key = await ensure_resume_blob(db, resume)
+    if not key:
+        return None
+    return await asyncio.to_thread(get_blob_store().read_bytes, key)
+
+
+async def resume_file_source(db: AsyncSession, resume: Resume) -> Optional[Union[Path, bytes]]:
+    """
+    What the parser should read: the blob's path when the backend is disk-backed (so the
+    file is never loaded whole), otherwise its bytes. Returns None if unavailable.
+    """
+    key = await ensure_resume_blob(db, resume)
+    if not key:
+        return None
+    path = get_blob_store().local_path(key)
+    if path is not None:
+        return path
+    return await asyncio.to_thread(get_blob_store().read_bytes, key)
+
+
+async def release_resume_blob(db: AsyncSession, blob_key: Optional[str]) -> None:
+    """Delete a blob once no resume row references it any more (blobs are shared by content)."""
+    if not blob_key:
+        return
+    still_used = (await db.execute(select(func.count(Resume.id)).where(Resume.blob_key == blob_key))).scalar()
+    if not still_used:
+        await asyncio.to_thread(get_blob_store().delete, blob_key)
@@ -1,13 +1,14 @@
 import io
 import re
 import unicodedata
+from pathlib import Path
+from typing import Union
 import fitz  # PyMuPDF
 import docx
-from sentence_transformers import SentenceTransformer
 from loguru import logger
-
-# Lazy-loaded at module level for worker reuse
-model = SentenceTransformer('all-MiniLM-L6-v2')
+from app.services.keyword_scanner import KeywordScanner
+# Loaded at module import for worker reuse
+from app.services.embeddings import embed, resume_text, EMBEDDING_VERSION
 
 # Resume section headers — used for both scoring and text segmentation
 _SECTION_HEADERS = frozenset({
@@ -27,6 +28,33 @@ _ACTION_VERBS = frozenset({
 })
 
 
+# Technical depth — mentions of specific technologies
+_TECH_KEYWORDS = frozenset({
+    "python", "javascript", "react", "aws", "docker", "kubernetes",
+    "sql", "typescript", "node", "java", "api", "microservices",
+    "ci/cd", "agile", "machine learning", "deep learning",
+})
+
+# Quantified achievements
+_QUANT_PATTERNS = (
+    r'\d+[%+]',                           # Percentages / growth
+    r'\$[\d,]+[KMB]?',                    # Dollar amounts
+    r'\d+\s*(users|customers|clients)',    # User counts
+    r'\d+\s*(projects|applications)',      # Project counts
+    r'\d+x\s',                            # Multipliers
+)
+
+# Both scores read from a single pass over the lowercased text
+_SCORING_SCANNER = KeywordScanner(
+    {"sections": _SECTION_HEADERS, "verbs": _ACTION_VERBS, "tech": _TECH_KEYWORDS},
+    {"quant": _QUANT_PATTERNS},
+)
+
+
+# Resume input: either in-memory bytes or a path to a file-backed copy (e.g. a blob on disk)
+FileSource = Union[bytes, str, Path]
+
+
 def _normalize_text(text: str) -> str:
     """Clean extracted text: normalize unicode, collapse whitespace, strip noise."""
     # Normalize unicode (e.g. ligatures, special chars)
@@ -60,11 +88,18 @@ def _normalize_text(text: str) -> str:
     return '\n'.join(result).strip()
 
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    """Extract and clean text from a PDF byte stream."""
+def _open_pdf(source: FileSource):
+    # Opening by path lets MuPDF read pages from the file on demand instead of from a full in-memory copy
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(str(source), filetype="pdf")
+
+
+def extract_text_from_pdf(source: FileSource) -> str:
+    """Extract and clean text from a PDF (bytes or file path)."""
     text_parts = []
     try:
-        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        with _open_pdf(source) as doc:
             for page_num, page in enumerate(doc):
                 page_text = page.get_text("text")
                 if page_text and page_text.strip():
@@ -72,7 +107,7 @@ def extract_text_from_pdf(file_bytes: bytes) -> str:
                     
         if not text_parts:
             # Fallback: try extracting with different method (handles some scanned PDFs better)
-            with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            with _open_pdf(source) as doc:
                 for page in doc:
                     page_text = page.get_text("blocks")
                     if page_text:
@@ -91,11 +126,12 @@ def extract_text_from_pdf(file_bytes: bytes) -> str:
     return _normalize_text(raw)
 
 
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    """Extract and clean text from a DOCX byte stream."""
+def extract_text_from_docx(source: FileSource) -> str:
+    """Extract and clean text from a DOCX (bytes or file path)."""
     text_parts = []
     try:
-        doc = docx.Document(io.BytesIO(file_bytes))
+        # python-docx reads the zip members it needs straight from the file when given a path
+        doc = docx.Document(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else str(source))
         for para in doc.paragraphs:
             if para.text.strip():
                 text_parts.append(para.text)
@@ -115,13 +151,14 @@ def extract_text_from_docx(file_bytes: bytes) -> str:
     return _normalize_text(raw)
 
 
-def _compute_structural_score(text: str) -> float:
+def _compute_structural_score(text: str, scan=None) -> float:
     """Score how well-structured this resume is (0.0 - 1.0)."""
     score = 0.0
     text_lower = text.lower()
+    scan = scan or _SCORING_SCANNER.scan(text_lower)
     
     # Section coverage (up to 0.4)
-    found_sections = sum(1 for s in _SECTION_HEADERS if s in text_lower)
+    found_sections = scan.count("sections")
     score += min(found_sections / 4.0, 1.0) * 0.4
     
     # Bullet points / structured lists (up to 0.3)
@@ -142,40 +179,30 @@ def _compute_structural_score(text: str) -> float:
     return round(min(score, 1.0), 2)
 
 
-def _compute_semantic_score(text: str) -> float:
+def _compute_semantic_score(text: str, scan=None) -> float:
     """Score how content-rich this resume is (0.0 - 1.0)."""
-    text_lower = text.lower()
+    scan = scan or _SCORING_SCANNER.scan(text.lower())
     
     # Action verbs (up to 0.4)
-    verb_count = sum(1 for v in _ACTION_VERBS if v in text_lower)
+    verb_count = scan.count("verbs")
     verb_score = min(verb_count / 6.0, 1.0) * 0.4
     
     # Quantified achievements (up to 0.3)
-    quant_patterns = [
-        r'\d+[%+]',                           # Percentages / growth
-        r'\$[\d,]+[KMB]?',                    # Dollar amounts
-        r'\d+\s*(users|customers|clients)',    # User counts
-        r'\d+\s*(projects|applications)',      # Project counts
-        r'\d+x\s',                            # Multipliers
-    ]
-    quant_count = sum(len(re.findall(p, text_lower)) for p in quant_patterns)
+    quant_count = scan.count("quant")
     quant_score = min(quant_count / 4.0, 1.0) * 0.3
     
     # Technical depth — mentions of specific technologies (up to 0.3)
-    tech_keywords = [
-        "python", "javascript", "react", "aws", "docker", "kubernetes",
-        "sql", "typescript", "node", "java", "api", "microservices",
-        "ci/cd", "agile", "machine learning", "deep learning",
-    ]
-    tech_count = sum(1 for t in tech_keywords if t in text_lower)
+    tech_count = scan.count("tech")
     tech_score = min(tech_count / 5.0, 1.0) * 0.3
     
     return round(min(verb_score + quant_score + tech_score, 1.0), 2)
 
 
-def parse_and_embed_resume(file_bytes: bytes, filename: str) -> dict:
+def parse_and_embed_resume(source: FileSource, filename: str) -> dict:
     """
-    Full resume processing pipeline:
+    Full resume processing pipeline. `source` is the file bytes or a path to the file;
+    passing a path keeps large uploads out of memory.
+
     1. Extract text based on file extension
     2. Normalize and clean the text
     3. Generate sentence embedding for semantic matching
@@ -187,11 +214,14 @@ def parse_and_embed_resume(file_bytes: bytes, filename: str) -> dict:
     ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
     
     if ext == "pdf":
-        raw_text = extract_text_from_pdf(file_bytes)
+        raw_text = extract_text_from_pdf(source)
     elif ext in ("docx", "doc"):
-        raw_text = extract_text_from_docx(file_bytes)
+        raw_text = extract_text_from_docx(source)
     elif ext in ("txt", "md"):
-        raw_text = file_bytes.decode('utf-8', errors='ignore')
+        if isinstance(source, (bytes, bytearray)):
+            raw_text = source.decode('utf-8', errors='ignore')
+        else:
+            raw_text = Path(source).read_text(encoding='utf-8', errors='ignore')
         raw_text = _normalize_text(raw_text)
     else:
         raise ValueError(f"Unsupported file format: .{ext}")
@@ -204,18 +234,18 @@ def parse_and_embed_resume(file_bytes: bytes, filename: str) -> dict:
 
     logger.info(f"Extracted {len(raw_text)} chars from {filename}")
     
-    # Truncate for embedding — MiniLM-L6-v2 has ~256 token window, 8000 chars is generous
-    embed_text = raw_text[:8000]
-    embedding = model.encode(embed_text).tolist()
+    embedding = embed(resume_text(raw_text))
     
-    structural_score = _compute_structural_score(raw_text)
-    semantic_score = _compute_semantic_score(raw_text)
+    scan = _SCORING_SCANNER.scan(raw_text.lower())
+    structural_score = _compute_structural_score(raw_text, scan)
+    semantic_score = _compute_semantic_score(raw_text, scan)
     
     logger.info(f"Resume {filename}: structural={structural_score}, semantic={semantic_score}")
     
     return {
         "raw_text": raw_text,
         "embedding": embedding,
+        "embedding_model": EMBEDDING_VERSION,
         "structural_score": structural_score,
         "semantic_score": semantic_score,
     }
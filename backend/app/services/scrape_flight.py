@@ -0,0 +1,141 @@
+"""
+Single-flight coalescing of identical scrapes across users and processes (Redis).
+
+A scrape is keyed by (normalized URL, target_type, extraction tier). The first caller takes
+a Redis lock and runs the fetch and extraction. Its result is cached as JSON for
+SCRAPE_FLIGHT_TTL_SECONDS. Callers that arrive while the lock is held, or shortly after,
+get that cached result instead of fetching, rendering and parsing the page again.
+
+Only the raw extraction is shared. Each caller still applies its own keyword filter and
+dedups and embeds against the database, so users get the same jobs they would have got
+from their own crawl.
+
+A failed extraction is cached for ERROR_TTL_SECONDS, so a broken site is not hit once per
+waiting user. If the lock holder dies, its lock expires and a waiter takes over. If Redis
+is unreachable, the scrape simply runs uncoalesced.
+"""
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Tuple
+
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.services import job_events
+from app.services.crawl_scheduler import normalize_url
+
+# Longer than the slowest crawl (headless page plus linked sub-pages)
+LOCK_TTL_SECONDS = 600
+ERROR_TTL_SECONDS = 30
+POLL_SECONDS = 1.0
+
+# Deletes the lock only if this caller still holds it
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class ScrapeFlightError(Exception):
+    """The shared extraction failed; carries the leader's error message."""
+
+
+def flight_key(url: str, target_type: str, tier: str) -> str:
+    digest = hashlib.sha1(f"{normalize_url(url)}|{target_type}|{tier}".encode("utf-8")).hexdigest()
+    return f"scrape:flight:{digest}"
+
+
+def _unpack(cached: str) -> Any:
+    payload = json.loads(cached)
+    if "error" in payload:
+        raise ScrapeFlightError(payload["error"])
+    return payload["result"]
+
+
+async def _cache(client, key: str, payload: dict, ttl: int) -> None:
+    """Publish the leader's outcome; the caller keeps its own result if Redis fails."""
+    try:
+        await client.set(f"{key}:result", json.dumps(payload), ex=ttl)
+    except RedisError as e:
+        logger.warning(f"Could not cache scrape result {key}: {e}")
+
+
+async def _lead(client, key: str, token: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+    try:
+        # A previous leader may have finished between our cache miss and taking the lock
+        try:
+            cached = await client.get(f"{key}:result")
+        except RedisError as e:
+            logger.warning(f"Could not read scrape result {key} ({e}); crawling directly")
+            cached = None
+        if cached is not None:
+            return _unpack(cached)
+        try:
+            result = await compute()
+        except Exception as e:
+            await _cache(client, key, {"error": f"{type(e).__name__}: {e}"}, ERROR_TTL_SECONDS)
+            raise
+        ttl = settings.SCRAPE_FLIGHT_TTL_SECONDS
+        if ttl > 0:
+            await _cache(client, key, {"result": result}, ttl)
+        return result
+    finally:
+        try:
+            await client.eval(_RELEASE_LOCK, 1, f"{key}:lock", token)
+        except RedisError as e:
+            logger.warning(f"Could not release scrape lock {key}: {e}")
+
+
+async def single_flight(
+    url: str,
+    target_type: str,
+    tier: str,
+    compute: Callable[[], Awaitable[Any]],
+) -> Tuple[Any, bool]:
+    """
+    Run `compute` (returning JSON-serializable data) at most once per key across all workers.
+    Returns (result, shared); shared is True when the result came from another caller's crawl.
+    Raises ScrapeFlightError when the shared crawl failed.
+    """
+    key = flight_key(url, target_type, tier)
+    client = job_events.redis_client()
+    try:
+        try:
+            cached = await client.get(f"{key}:result")
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for scrape coalescing ({e}); crawling {url} directly")
+            return await compute(), False
+        if cached is not None:
+            return _unpack(cached), True
+
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + LOCK_TTL_SECONDS
+        leader = False
+        try:
+            while time.monotonic() < deadline:
+                if await client.set(f"{key}:lock", token, nx=True, ex=LOCK_TTL_SECONDS):
+                    leader = True
+                    break
+                # Another caller is crawling this URL: wait for its result, or for its lock to go away
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(POLL_SECONDS)
+                    cached = await client.get(f"{key}:result")
+                    if cached is not None:
+                        return _unpack(cached), True
+                    if not await client.exists(f"{key}:lock"):
+                        break
+        except RedisError as e:
+            logger.warning(f"Redis failed while waiting for the in-flight crawl of {url} ({e}); crawling it directly")
+        else:
+            if leader:
+                return await _lead(client, key, token, compute), False
+            logger.warning(f"Timed out waiting for the in-flight crawl of {url}; crawling it directly")
+        return await compute(), False
+    finally:
+        await client.aclose()
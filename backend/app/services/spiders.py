@@ -4,13 +4,10 @@ import json
 import logging
 from typing import List, Dict, Any
 
-try:
-    from playwright.async_api import async_playwright
-except ImportError:
-    pass
-
 import spacy
 from bs4 import BeautifulSoup
+from app.services.keyword_scanner import KeywordScanner
+from app.services import browser_pool, page_archive
 
 logger = logging.getLogger(__name__)
 
@@ -43,19 +40,108 @@ def extract_entities(text: str) -> Dict[str, set]:
             locs.add(ent.text.strip())
     return {"orgs": orgs, "locs": locs}
 
+_JOB_TITLE_SCANNER = KeywordScanner({"title": (
+    "engineer", "developer", "manager", "designer", "director", "specialist",
+    "vp", "president", "associate", "analyst", "representative", "coordinator",
+    "intern", "lead", "architect", "consultant", "technician", "administrator",
+    "writer", "recruiter", "executive",
+)})
+
 def is_job_title(text: str) -> bool:
     """Fast local heuristic for detecting job titles."""
     text = text.lower().strip()
     if len(text) < 5 or len(text) > 80:
         return False
-        
-    keywords = [
-        "engineer", "developer", "manager", "designer", "director", "specialist",
-        "vp", "president", "associate", "analyst", "representative", "coordinator",
-        "intern", "lead", "architect", "consultant", "technician", "administrator",
-        "writer", "recruiter", "executive"
-    ]
-    return any(kw in text for kw in keywords)
+    return _JOB_TITLE_SCANNER.contains_any(text)
+
+def extract_jobs_from_html(content: str) -> List[Dict[str, Any]]:
+    """
+    Jobs from a rendered page: schema.org JSON-LD first, then DOM traversal + spaCy NER.
+    A pure function of the HTML, so archived pages can be replayed through it (app.worker.reparse).
+    """
+    jobs = []
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # --- STRATEGY 1: JSON-LD (Perfect Accuracy, 0 Cost) ---
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string)
+            items = data if isinstance(data, list) else [data]
+            for item in list(items):
+                if isinstance(item, dict) and item.get('@graph'):
+                    items.extend(item['@graph'])
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+
+                item_type = str(item.get('@type', ''))
+                if 'JobPosting' in item_type:
+                    title = str(item.get('title') or item.get('name', '')).strip()
+                    org = item.get('hiringOrganization', {})
+                    company = str(org.get('name', '')) if isinstance(org, dict) else ''
+
+                    loc = item.get('jobLocation', {})
+                    location = ''
+                    if isinstance(loc, dict):
+                        addr = loc.get('address', {})
+                        if isinstance(addr, dict):
+                            location = str(addr.get('addressLocality', ''))
+
+                    desc = str(item.get('description', ''))
+
+                    if title:
+                        jobs.append({
+                            "title": title[:200],
+                            "company": company[:200] or "Unknown Company",
+                            "location": location[:200] or "Not specified",
+                            "description": BeautifulSoup(desc, 'html.parser').get_text(separator=' ', strip=True)[:1000] if desc else title
+                        })
+        except Exception as eval_e:
+            logger.debug(f"JSON-LD pass skipped: {eval_e}")
+
+    if jobs:
+        unique_jobs = {j['title'].lower(): j for j in jobs}.values()
+        logger.info(f"Successfully extracted {len(unique_jobs)} via schema.org JSON-LD.")
+        return list(unique_jobs)[:50]
+
+    # --- STRATEGY 2: Local ML DOM Traversal (High Accuracy, 0 Cost) ---
+    logger.info("JSON-LD failed. Falling back to Local ML (spaCy) DOM parser.")
+
+    for element in soup.find_all(['a', 'h2', 'h3', 'li', 'div', 'article']):
+        text = element.get_text(separator=" ", strip=True)
+
+        if len(text) < 10 or len(text) > 800:
+            continue
+
+        parts = [p.strip() for p in text.split('\n') if p.strip()]
+        if not parts:
+            continue
+
+        candidate_title = parts[0]
+        if is_job_title(candidate_title):
+            entities = extract_entities(text)
+
+            company = "Unknown Company"
+            location = "Not specified"
+
+            if entities["orgs"]:
+                company = list(entities["orgs"])[0]
+            if entities["locs"]:
+                location = list(entities["locs"])[0]
+            elif "remote" in text.lower():
+                location = "Remote"
+
+            jobs.append({
+                "title": candidate_title[:200],
+                "company": company[:200],
+                "location": location[:200],
+                "description": text[:1000]
+            })
+
+    unique_jobs = {j['title'].lower(): j for j in jobs}.values()
+    logger.info(f"Successfully extracted {len(unique_jobs)} via local heuristics.")
+    return list(unique_jobs)[:50]
+
 
 async def scrape_jobs_headless(url: str, user_settings=None) -> List[Dict[str, Any]]:
     """
@@ -69,12 +155,7 @@ async def scrape_jobs_headless(url: str, user_settings=None) -> List[Dict[str, A
     logger.info(f"Starting Local ML Scrape for: {url}")
     
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(args=["--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage"])
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            
+        async with browser_pool.new_context() as context:
             # Block heavy assets for speed
             await context.route("**/*", lambda route: route.continue_() if route.request.resource_type in ["document", "script", "xhr", "fetch"] else route.abort())
             
@@ -83,94 +164,13 @@ async def scrape_jobs_headless(url: str, user_settings=None) -> List[Dict[str, A
             
             if not response or not response.ok:
                 logger.error(f"Failed to load URL {url}: {response.status if response else 'No response'}")
-                await browser.close()
                 return jobs
                 
             await page.wait_for_timeout(2000)
             content = await page.content()
-            await browser.close()
-            
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # --- STRATEGY 1: JSON-LD (Perfect Accuracy, 0 Cost) ---
-            for script in soup.find_all('script', type='application/ld+json'):
-                try:
-                    data = json.loads(script.string)
-                    items = data if isinstance(data, list) else [data]
-                    for item in list(items):
-                        if isinstance(item, dict) and item.get('@graph'):
-                            items.extend(item['@graph'])
-                    for item in items:
-                        if not isinstance(item, dict):
-                            continue
-                        
-                        item_type = str(item.get('@type', ''))
-                        if 'JobPosting' in item_type:
-                            title = str(item.get('title') or item.get('name', '')).strip()
-                            org = item.get('hiringOrganization', {})
-                            company = str(org.get('name', '')) if isinstance(org, dict) else ''
-                            
-                            loc = item.get('jobLocation', {})
-                            location = ''
-                            if isinstance(loc, dict):
-                                addr = loc.get('address', {})
-                                if isinstance(addr, dict):
-                                    location = str(addr.get('addressLocality', ''))
-                            
-                            desc = str(item.get('description', ''))
-                            
-                            if title:
-                                jobs.append({
-                                    "title": title[:200],
-                                    "company": company[:200] or "Unknown Company",
-                                    "location": location[:200] or "Not specified",
-                                    "description": BeautifulSoup(desc, 'html.parser').get_text(separator=' ', strip=True)[:1000] if desc else title
-                                })
-                except Exception as eval_e:
-                    logger.debug(f"JSON-LD pass skipped: {eval_e}")
-                    
-            if jobs:
-                unique_jobs = {j['title'].lower(): j for j in jobs}.values()
-                logger.info(f"Successfully extracted {len(unique_jobs)} via schema.org JSON-LD.")
-                return list(unique_jobs)[:50]
-                
-            # --- STRATEGY 2: Local ML DOM Traversal (High Accuracy, 0 Cost) ---
-            logger.info("JSON-LD failed. Falling back to Local ML (spaCy) DOM parser.")
-            
-            for element in soup.find_all(['a', 'h2', 'h3', 'li', 'div', 'article']):
-                text = element.get_text(separator=" ", strip=True)
-                
-                if len(text) < 10 or len(text) > 800:
-                    continue
-                    
-                parts = [p.strip() for p in text.split('\n') if p.strip()]
-                if not parts:
-                    continue
-                    
-                candidate_title = parts[0]
-                if is_job_title(candidate_title):
-                    entities = extract_entities(text)
-                    
-                    company = "Unknown Company"
-                    location = "Not specified"
-                    
-                    if entities["orgs"]:
-                        company = list(entities["orgs"])[0]
-                    if entities["locs"]:
-                        location = list(entities["locs"])[0]
-                    elif "remote" in text.lower():
-                        location = "Remote"
-                        
-                    jobs.append({
-                        "title": candidate_title[:200],
-                        "company": company[:200],
-                        "location": location[:200],
-                        "description": text[:1000]
-                    })
-                    
-            unique_jobs = {j['title'].lower(): j for j in jobs}.values()
-            logger.info(f"Successfully extracted {len(unique_jobs)} via local heuristics.")
-            return list(unique_jobs)[:50]
+
+        page_archive.archive_page(url, content, status=response.status, tier="headless")
+        return extract_jobs_from_html(content)
 
     except Exception as e:
         logger.error(f"Playwright Scraper Error for {url}: {e}")
@@ -1,90 +1,352 @@
 """
-In-memory task registry for tracking and cancelling background async tasks.
-Used when Celery/Redis is unavailable or for direct inline execution.
+Registry of running background tasks, shared through Redis by every API worker and Celery
+worker, for tracking and stopping them.
+
+Each task is a hash at tasks:<task_id> (user, type, status, stage, done/total progress,
+worker, heartbeat). A per-user set at tasks:user:<user_id> indexes it. While the task runs,
+a watcher in its own process refreshes the heartbeat and keeps the hash alive for
+RUNNING_TTL_SECONDS. If the process dies, the task drops out of the running list within
+that time. A finished task keeps its final status for FINISHED_TTL_SECONDS.
+
+Stopping is cross-process. cancel_task() / cancel_user_tasks() set a cancel flag on the
+hash, and the task reacts in two ways:
+- its watcher sees the flag within WATCH_SECONDS and cancels the asyncio task,
+- checkpoint(), called by pipelines at stage boundaries, raises TaskCancelled. This also
+  covers work the watcher cannot interrupt, such as a thread or process-pool call.
+
+The API registers work with enqueue_task() before sending it to Celery, so it shows up as
+"queued" at once. The Celery task body wraps itself in run_tracked() with that ID. A task
+stopped while still queued is skipped when a worker picks it up. If Redis is down, tasks
+still run, and stop/status fall back to the tasks of the current process.
 """
 import asyncio
-from typing import Dict, Optional
-from dataclasses import dataclass, field
-from datetime import datetime
+import contextvars
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Coroutine, Dict, List, Optional
+
+import redis.asyncio as aioredis
 from loguru import logger
+from redis.exceptions import RedisError
+
+from app.services import job_events
+
+KEY_PREFIX = "tasks"
+RUNNING_TTL_SECONDS = 60
+FINISHED_TTL_SECONDS = 3600
+WATCH_SECONDS = 2
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Updates fields and TTL only while the task hash exists (so an expired task is not
+# resurrected as a partial hash); returns the cancel flag
+_TOUCH = """
+if redis.call('exists', KEYS[1]) == 0 then return false end
+if #ARGV > 1 then redis.call('hset', KEYS[1], unpack(ARGV, 2)) end
+redis.call('expire', KEYS[1], ARGV[1])
+return redis.call('hget', KEYS[1], 'cancel_requested')
+"""
+
+
+class TaskCancelled(asyncio.CancelledError):
+    """Raised by checkpoint() when the current task was asked to stop."""
 
 
 @dataclass
 class TaskInfo:
     task_id: str
     user_id: int
-    task_type: str  # "scraper", "resume_extraction"
-    status: str = "running"  # running, completed, cancelled, failed
-    asyncio_task: Optional[asyncio.Task] = field(default=None, repr=False)
-    created_at: datetime = field(default_factory=datetime.utcnow)
+    task_type: str  # "scraper", "resume_extraction", "inbox_sync", ...
+    label: str = ""  # what the task works on, e.g. "resume:42"
+    status: str = "running"  # queued, running, completed, cancelled, failed
+    stage: str = ""
+    done: int = 0
+    total: int = 0
+    worker: str = ""
+    created_at: str = ""
+    heartbeat_at: str = ""
+
+    @classmethod
+    def from_hash(cls, data: Dict[str, str]) -> "TaskInfo":
+        return cls(
+            task_id=data["task_id"],
+            user_id=int(data["user_id"]),
+            task_type=data.get("task_type", ""),
+            label=data.get("label", ""),
+            status=data.get("status", "running"),
+            stage=data.get("stage", ""),
+            done=int(data.get("done") or 0),
+            total=int(data.get("total") or 0),
+            worker=data.get("worker", ""),
+            created_at=data.get("created_at", ""),
+            heartbeat_at=data.get("heartbeat_at", ""),
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "task_id": self.task_id,
+            "task_type": self.task_type,
+            "label": self.label or None,
+            "status": self.status,
+            "stage": self.stage or None,
+            "done": self.done,
+            "total": self.total,
+            "worker": self.worker,
+            "created_at": self.created_at,
+            "heartbeat_at": self.heartbeat_at,
+        }
+
+
+@dataclass
+class _LocalTask:
+    info: TaskInfo
+    task: asyncio.Task
+    stop_requested: bool = False
+
+
+# Tasks running in this process
+_local: Dict[str, _LocalTask] = {}
+_current_task_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("task_registry_task_id", default=None)
+
+
+def _redis() -> aioredis.Redis:
+    return job_events.shared_client()
+
+
+def _task_key(task_id: str) -> str:
+    return f"{KEY_PREFIX}:{task_id}"
+
 
+def _user_key(user_id: int) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}"
 
-# Global registry
-_tasks: Dict[str, TaskInfo] = {}
-_counter = 0
 
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
 
-def register_task(user_id: int, task_type: str, asyncio_task: asyncio.Task) -> str:
-    """Register a new async task and return its ID."""
-    global _counter
-    _counter += 1
-    task_id = f"{task_type}_{user_id}_{_counter}"
-    _tasks[task_id] = TaskInfo(
-        task_id=task_id,
+
+async def _touch(task_id: str, ttl: int, **fields: Any) -> bool:
+    """Update a live task's fields and TTL. True when a stop was requested for it."""
+    args: List[Any] = [ttl]
+    for name, value in fields.items():
+        args += [name, value]
+    try:
+        return await _redis().eval(_TOUCH, 1, _task_key(task_id), *args) == "1"
+    except RedisError as e:
+        logger.debug(f"Task registry update for {task_id} failed: {e}")
+        return False
+
+
+async def _keep_user_index(user_id: int) -> None:
+    """The user's index must outlive every task it lists."""
+    try:
+        await _redis().expire(_user_key(user_id), FINISHED_TTL_SECONDS)
+    except RedisError:
+        pass
+
+
+async def _register(
+    user_id: int,
+    task_type: str,
+    status: str = "running",
+    task_id: Optional[str] = None,
+    label: str = "",
+    created_at: Optional[str] = None,
+) -> TaskInfo:
+    now = _now()
+    info = TaskInfo(
+        task_id=task_id or f"{task_type}_{user_id}_{uuid.uuid4().hex[:12]}",
         user_id=user_id,
         task_type=task_type,
-        asyncio_task=asyncio_task,
+        label=label,
+        status=status,
+        worker=WORKER_ID if status == "running" else "",
+        created_at=created_at or now,
+        heartbeat_at=now,
     )
-    logger.info(f"Registered task {task_id}")
-    return task_id
+    # Queued tasks have no heartbeat yet; they wait for a worker as long as a finished task is kept
+    ttl = RUNNING_TTL_SECONDS if status == "running" else FINISHED_TTL_SECONDS
+    try:
+        async with _redis().pipeline(transaction=True) as pipe:
+            pipe.hset(_task_key(info.task_id), mapping={"user_id": user_id, **info.as_dict(), "label": label, "stage": ""})
+            pipe.expire(_task_key(info.task_id), ttl)
+            pipe.sadd(_user_key(user_id), info.task_id)
+            pipe.expire(_user_key(user_id), FINISHED_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Task registry unavailable, {info.task_id} is only visible to this process: {e}")
+    logger.info(f"Registered task {info.task_id}")
+    return info
+
+
+async def _watch(local: _LocalTask) -> None:
+    """Heartbeat while the task runs, and cancel it once a stop is requested from any process."""
+    while True:
+        await asyncio.sleep(WATCH_SECONDS)
+        if await _touch(local.info.task_id, RUNNING_TTL_SECONDS, heartbeat_at=_now()) and not local.stop_requested:
+            local.stop_requested = True
+            local.task.cancel()
+        await _keep_user_index(local.info.user_id)
+
+
+async def _run(info: TaskInfo, coro: Coroutine[Any, Any, Any]) -> Any:
+    _current_task_id.set(info.task_id)
+    local = _local[info.task_id] = _LocalTask(info, asyncio.current_task())
+    watcher = asyncio.create_task(_watch(local))
+    status = "failed"
+    try:
+        result = await coro
+        status = "completed"
+        return result
+    except asyncio.CancelledError as e:
+        status = "cancelled"
+        # A requested stop ends the task quietly; any other cancellation (shutdown) propagates
+        if isinstance(e, TaskCancelled) or local.stop_requested:
+            logger.info(f"Task {info.task_id} stopped")
+            return None
+        raise
+    finally:
+        watcher.cancel()
+        _local.pop(info.task_id, None)
+        await _touch(info.task_id, FINISHED_TTL_SECONDS, status=status, heartbeat_at=_now())
+        await _keep_user_index(info.user_id)
+
+
+async def enqueue_task(user_id: int, task_type: str, label: str = "") -> str:
+    """Register work about to be sent to a worker queue; returns the ID to pass to run_tracked()."""
+    return (await _register(user_id, task_type, status="queued", label=label)).task_id
 
 
-def cancel_task(task_id: str) -> bool:
-    """Cancel a running task by ID. Returns True if cancelled."""
-    info = _tasks.get(task_id)
-    if not info:
+async def run_tracked(
+    user_id: Optional[int],
+    task_type: str,
+    coro: Coroutine[Any, Any, Any],
+    task_id: Optional[str] = None,
+) -> Any:
+    """
+    Await `coro` as a tracked task (for Celery task bodies). `task_id` is the ID from
+    enqueue_task(); the task is skipped if it was stopped while queued. Untracked when
+    there is no user.
+    """
+    if user_id is None:
+        return await coro
+    queued: Dict[str, str] = {}
+    if task_id is not None:
+        try:
+            queued = await _redis().hgetall(_task_key(task_id))
+        except RedisError:
+            pass
+        if queued.get("cancel_requested") == "1":
+            coro.close()
+            await _touch(task_id, FINISHED_TTL_SECONDS, status="cancelled", heartbeat_at=_now())
+            logger.info(f"Task {task_id} was stopped before it started")
+            return None
+    info = await _register(
+        user_id, task_type, task_id=task_id, label=queued.get("label", ""), created_at=queued.get("created_at"),
+    )
+    return await _run(info, coro)
+
+
+async def checkpoint(
+    stage: Optional[str] = None,
+    done: Optional[int] = None,
+    total: Optional[int] = None,
+) -> None:
+    """
+    Report progress of the current tracked task, and raise TaskCancelled if it was asked to
+    stop. Call it at stage boundaries. A no-op outside a tracked task.
+    """
+    task_id = _current_task_id.get()
+    if task_id is None:
+        return
+    fields: Dict[str, Any] = {"heartbeat_at": _now()}
+    if stage is not None:
+        fields["stage"] = stage
+    if done is not None:
+        fields["done"] = done
+    if total is not None:
+        fields["total"] = total
+    local = _local.get(task_id)
+    if await _touch(task_id, RUNNING_TTL_SECONDS, **fields) or (local and local.stop_requested):
+        if local:
+            local.stop_requested = True
+        raise TaskCancelled(f"Task {task_id} was stopped")
+
+
+async def _user_tasks(user_id: int) -> List[TaskInfo]:
+    client = _redis()
+    task_ids = sorted(await client.smembers(_user_key(user_id)))
+    if not task_ids:
+        return []
+    async with client.pipeline(transaction=False) as pipe:
+        for task_id in task_ids:
+            pipe.hgetall(_task_key(task_id))
+        hashes = await pipe.execute()
+    expired = [task_id for task_id, data in zip(task_ids, hashes) if not data]
+    if expired:
+        await client.srem(_user_key(user_id), *expired)
+    return [TaskInfo.from_hash(data) for data in hashes if data and "task_id" in data]
+
+
+def _cancel_local(task_id: str) -> bool:
+    local = _local.get(task_id)
+    if local is None or local.task.done():
         return False
-    if info.asyncio_task and not info.asyncio_task.done():
-        info.asyncio_task.cancel()
-        info.status = "cancelled"
-        logger.info(f"Cancelled task {task_id}")
-        return True
-    return False
+    local.stop_requested = True
+    local.task.cancel()
+    return True
+
+
+async def cancel_task(task_id: str) -> bool:
+    """Ask a queued or running task to stop, wherever it runs. Returns True if it had not finished."""
+    try:
+        client = _redis()
+        data = await client.hgetall(_task_key(task_id))
+        if not data or data.get("status") not in ("queued", "running"):
+            return _cancel_local(task_id)
+        fields = {"cancel_requested": "1"}
+        if data["status"] == "queued":
+            fields["status"] = "cancelled"
+        await client.hset(_task_key(task_id), mapping=fields)
+    except RedisError as e:
+        logger.warning(f"Task registry unavailable, stopping {task_id} only if it runs here: {e}")
+        return _cancel_local(task_id)
+    # Tasks in this process stop right away; elsewhere their watcher picks up the flag
+    _cancel_local(task_id)
+    logger.info(f"Requested stop of task {task_id}")
+    return True
 
 
-def cancel_user_tasks(user_id: int, task_type: Optional[str] = None) -> int:
-    """Cancel all running tasks for a user, optionally filtered by type."""
+async def cancel_user_tasks(user_id: int, task_type: Optional[str] = None) -> int:
+    """Ask all of a user's queued and running tasks to stop, optionally only one type. Returns how many."""
+    try:
+        running = [t for t in await _user_tasks(user_id) if t.status in ("queued", "running")]
+    except RedisError as e:
+        logger.warning(f"Task registry unavailable, stopping this process's tasks only: {e}")
+        running = [l.info for l in _local.values() if l.info.user_id == user_id]
     count = 0
-    for info in _tasks.values():
-        if info.user_id == user_id and info.status == "running":
-            if task_type and info.task_type != task_type:
-                continue
-            if info.asyncio_task and not info.asyncio_task.done():
-                info.asyncio_task.cancel()
-                info.status = "cancelled"
-                count += 1
+    for info in running:
+        if task_type and info.task_type != task_type:
+            continue
+        if await cancel_task(info.task_id):
+            count += 1
     logger.info(f"Cancelled {count} tasks for user {user_id}")
     return count
 
 
-def get_running_tasks(user_id: int) -> list:
-    """Get all running tasks for a user. Auto-cleans up finished tasks."""
-    # Auto-cleanup: mark done tasks and remove old ones
-    to_remove = []
-    for k, v in _tasks.items():
-        if v.asyncio_task and v.asyncio_task.done() and v.status == "running":
-            v.status = "completed"
-        # Remove tasks older than 1 hour to prevent memory leak
-        if v.asyncio_task and v.asyncio_task.done():
-            age = (datetime.utcnow() - v.created_at).total_seconds()
-            if age > 3600:
-                to_remove.append(k)
-    for k in to_remove:
-        del _tasks[k]
-    
-    return [
-        {"task_id": t.task_id, "task_type": t.task_type, "created_at": t.created_at.isoformat()}
-        for t in _tasks.values()
-        if t.user_id == user_id and t.status == "running"
-        and t.asyncio_task and not t.asyncio_task.done()
-    ]
+async def get_user_tasks(user_id: int, task_type: Optional[str] = None) -> list:
+    """A user's queued, running and recently finished tasks across every process, oldest first."""
+    try:
+        tasks = await _user_tasks(user_id)
+    except RedisError as e:
+        logger.warning(f"Task registry unavailable, listing this process's tasks only: {e}")
+        tasks = [l.info for l in _local.values() if l.info.user_id == user_id]
+    return [t.as_dict() for t in sorted(tasks, key=lambda t: t.created_at) if not task_type or t.task_type == task_type]
+
+
+async def get_running_tasks(user_id: int) -> list:
+    """A user's queued and running tasks across every process, with progress."""
+    return [t for t in await get_user_tasks(user_id) if t["status"] in ("queued", "running")]
@@ -0,0 +1,159 @@
+"""
+Compiled email template engine for cold mail.
+
+Templates are parsed once (on save) into a flat token list of literal text and
+{{tag}} references. Tag names are validated against the known tag set up front,
+so a broken template is rejected when it is saved instead of when it is sent.
+Rendering is a straight join over the tokens and can be done for many value maps
+in one call.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+# Every tag a template may reference. Kept in sync with build_value_map().
+TEMPLATE_TAGS = frozenset({
+    # Contact-specific
+    "contact_name", "contact_role", "job_title", "company",
+    # Resume-derived
+    "experience_years", "skills", "education", "recent_role", "top_projects", "certifications",
+    # User profile
+    "linkedin", "github", "portfolio", "user_name", "user_email", "user_phone", "user_location",
+})
+
+_TAG_RE = re.compile(r'{{(.*?)}}')
+_TAG_NAME_RE = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+# Token kinds (stored as JSON on EmailTemplate.compiled_tokens)
+TEXT = "t"
+TAG = "v"
+
+
+class TemplateSyntaxError(ValueError):
+    """Raised when a template references unknown tags or has malformed tag syntax."""
+
+
+def _tokenize(text: str, field: str) -> Tuple[List[list], List[str]]:
+    """Split text into [kind, value] tokens. Returns (tokens, errors)."""
+    tokens: List[list] = []
+    errors: List[str] = []
+    pos = 0
+    for match in _TAG_RE.finditer(text):
+        if match.start() > pos:
+            tokens.append([TEXT, text[pos:match.start()]])
+        name = match.group(1).strip()
+        if not _TAG_NAME_RE.match(name):
+            errors.append(f"{field}: malformed tag {match.group(0)!r}")
+        elif name not in TEMPLATE_TAGS:
+            errors.append(f"{field}: unknown tag {{{{{name}}}}}")
+        tokens.append([TAG, name])
+        pos = match.end()
+    if pos < len(text):
+        tokens.append([TEXT, text[pos:]])
+
+    # A dangling '{{' that never closed is almost always a typo in the template
+    for kind, value in tokens:
+        if kind == TEXT and "{{" in value:
+            errors.append(f"{field}: unclosed '{{{{' in template text")
+            break
+    return tokens, errors
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    subject_tokens: Tuple[Tuple[str, str], ...]
+    body_tokens: Tuple[Tuple[str, str], ...]
+
+    @property
+    def tags(self) -> frozenset:
+        """All tag names referenced by subject or body."""
+        return frozenset(v for k, v in self.subject_tokens + self.body_tokens if k == TAG)
+
+    def to_json(self) -> dict:
+        return {
+            "subject": [list(t) for t in self.subject_tokens],
+            "body": [list(t) for t in self.body_tokens],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "CompiledTemplate":
+        return cls(
+            subject_tokens=tuple((k, v) for k, v in data.get("subject", [])),
+            body_tokens=tuple((k, v) for k, v in data.get("body", [])),
+        )
+
+    @staticmethod
+    def _join(tokens, values: Dict[str, str]) -> str:
+        return "".join(v if k == TEXT else str(values.get(v, "")) for k, v in tokens)
+
+    def render(self, values: Dict[str, str]) -> Tuple[str, str]:
+        """Render (subject, body) for a single value map."""
+        return self._join(self.subject_tokens, values), self._join(self.body_tokens, values)
+
+    def render_batch(self, value_maps: Iterable[Dict[str, str]]) -> List[Tuple[str, str]]:
+        """Render (subject, body) pairs for many value maps in one pass."""
+        subject_tokens, body_tokens, join = self.subject_tokens, self.body_tokens, self._join
+        return [(join(subject_tokens, values), join(body_tokens, values)) for values in value_maps]
+
+
+@lru_cache(maxsize=512)
+def compile_template(subject: str, body_text: str) -> CompiledTemplate:
+    """
+    Parse and validate a template. Raises TemplateSyntaxError listing every problem found.
+    Results are cached by content, so recompiling an unchanged template is free.
+    """
+    subject_tokens, subject_errors = _tokenize(subject or "", "subject")
+    body_tokens, body_errors = _tokenize(body_text or "", "body")
+    errors = subject_errors + body_errors
+    if errors:
+        raise TemplateSyntaxError("; ".join(errors))
+    return CompiledTemplate(
+        subject_tokens=tuple((k, v) for k, v in subject_tokens),
+        body_tokens=tuple((k, v) for k, v in body_tokens),
+    )
+
+
+def get_compiled(template) -> CompiledTemplate:
+    """
+    Return the compiled form of an EmailTemplate row. Uses the token list stored at save
+    time when present, otherwise compiles (and validates) from the raw text.
+    """
+    if template.compiled_tokens:
+        return CompiledTemplate.from_json(template.compiled_tokens)
+    return compile_template(template.subject, template.body_text)
+
+
+def build_value_map(contact, resume, user, settings) -> Dict[str, str]:
+    """Build the tag value map for one (contact, resume, user) combination."""
+    resume_data = resume.parsed_json or {}
+
+    # Normalize experience_years: extract first integer, fallback to profile
+    raw_exp = resume_data.get("experience_years") or getattr(user, 'experience_years', "") or ""
+    exp_match = re.search(r'(\d+)', str(raw_exp))
+    exp_years = exp_match.group(1) if exp_match else ""
+
+    target_role = (resume_data.get("target_role") or getattr(settings, 'target_roles', "") or "").strip()
+
+    return {
+        # Contact-specific
+        "contact_name": (contact.name or "").strip(),
+        "contact_role": (contact.role or "").strip(),
+        "job_title": target_role,
+        "company": (contact.company or "").strip(),
+        # Resume-derived
+        "experience_years": exp_years,
+        "skills": (resume_data.get("skills") or getattr(user, 'skills', "") or "").strip(),
+        "education": (resume_data.get("education") or getattr(user, 'education', "") or "").strip(),
+        "recent_role": (resume_data.get("recent_role") or "").strip(),
+        "top_projects": (resume_data.get("top_projects") or "").strip(),
+        "certifications": (resume_data.get("certifications") or "").strip(),
+        # User profile
+        "linkedin": (user.linkedin_url or "").strip(),
+        "github": (user.github_url or "").strip(),
+        "portfolio": (getattr(user, 'portfolio_url', "") or "").strip(),
+        "user_name": (user.full_name or "").strip(),
+        "user_email": (user.email or "").strip(),
+        "user_phone": (user.phone or "").strip(),
+        "user_location": (user.location or "").strip(),
+    }
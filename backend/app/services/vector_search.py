@@ -0,0 +1,65 @@
+"""
+Nearest-job search over the half-precision embedding column.
+
+`job_postings.embedding_half` is a halfvec(384) copy of the float32 `embedding`,
+generated by Postgres, and it is the only embedding column with an HNSW index. The index
+and its buffer-cache footprint are half the size of a float32 HNSW index. Half precision
+loses a little ranking accuracy near the cut-off, so every search over-fetches
+RERANK_FACTOR x the wanted rows from the halfvec index and re-orders them by the exact
+float32 distance before applying the limit. recall@k stays close to a float32 index;
+scripts/benchmark_vector_search.py measures both layouts on real data.
+"""
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.job_posting import JobPosting
+
+EMBEDDING_DIM = 384
+
+# ANN candidates fetched per wanted row before the exact float32 rerank
+RERANK_FACTOR = 4
+
+# pgvector caps hnsw.ef_search at 1000, so one HNSW scan yields at most this many rows
+MAX_ANN_CANDIDATES = 1000
+
+
+def ann_candidates(limit: int) -> int:
+    return min(max(limit * RERANK_FACTOR, 40), MAX_ANN_CANDIDATES)
+
+
+async def set_ef_search(db: AsyncSession, candidates: int) -> None:
+    """
+    HNSW returns at most ef_search rows per scan; size it for the over-fetch (transaction-local).
+    Filtered scans (date, source, embedding_model) also resume the graph walk until enough rows
+    pass the filter (pgvector >= 0.8 iterative scans); relaxed order is fine since callers rerank.
+    """
+    await db.execute(
+        text("SELECT set_config('hnsw.ef_search', :v, true), set_config('hnsw.iterative_scan', 'relaxed_order', true)"),
+        {"v": str(min(max(candidates, 40), MAX_ANN_CANDIDATES))},
+    )
+
+
+def nearest_jobs_stmt(
+    embedding: List[float],
+    limit: int,
+    conditions: Sequence[Any] = (),
+    max_distance: Optional[float] = None,
+):
+    """
+    SELECT (id, distance) of the `limit` jobs nearest to `embedding`, best first.
+    Candidates come from the halfvec HNSW index; `distance` is the exact float32 cosine distance.
+    """
+    candidates = (
+        select(JobPosting.id, JobPosting.embedding)
+        .where(JobPosting.embedding_half.is_not(None), *conditions)
+        .order_by(JobPosting.embedding_half.cosine_distance(embedding))
+        .limit(ann_candidates(limit))
+        .subquery("ann")
+    )
+    distance = candidates.c.embedding.cosine_distance(embedding)
+    stmt = select(candidates.c.id, distance.label("distance"))
+    if max_distance is not None:
+        stmt = stmt.where(distance < max_distance)
+    return stmt.order_by(distance).limit(limit)
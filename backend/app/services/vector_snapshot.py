@@ -0,0 +1,289 @@
+"""
+Memory-mapped snapshot of job embeddings for worker-side batch scoring.
+
+export_snapshot() writes every job embedding, L2-normalised, into one contiguous .npy
+matrix. Alongside it go the matching id and created_at arrays and a meta.json. Each export
+goes to a fresh versioned directory, and the CURRENT pointer file is swapped atomically,
+so readers never see a half-written snapshot.
+
+Worker processes open the snapshot with np.load(mmap_mode="r"). The pages come from the
+OS page cache, so every worker process (forked or not) shares one copy in memory, and
+nothing is fetched from the database per query. Rows added after the export are fetched
+as a small in-process delta (refresh_delta) and searched together with the snapshot.
+
+Search is exact brute force: a blocked matrix product of the snapshot against a batch of
+query vectors, followed by a top-k selection. That runs at memory bandwidth and needs no
+index maintenance at the table sizes this app sees.
+
+Only jobs embedded with the current EMBEDDING_VERSION are exported; a snapshot written
+under another version is ignored. Snapshots are append-only views. A job deleted after the
+export can still be returned, so callers that load rows by id should tolerate missing ids.
+"""
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.job_posting import JobPosting
+from app.services.embeddings import EMBEDDING_VERSION
+
+EMBEDDING_DIM = 384
+
+# Rows per streamed DB partition on export, and per matrix block during search
+EXPORT_BATCH_ROWS = 5000
+SEARCH_BLOCK_ROWS = 65536
+
+# Query vectors scored per matrix product (bounds the m x block similarity matrix)
+QUERY_BLOCK_ROWS = 256
+
+# Snapshot versions kept on disk (older ones may still be mapped by running workers)
+KEEP_VERSIONS = 2
+
+# How often a process checks CURRENT for a newer export
+RELOAD_CHECK_SECONDS = 30
+
+_POINTER = "CURRENT"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _epoch(dt: Optional[datetime]) -> int:
+    return int(dt.timestamp()) if dt else 0
+
+
+# ── export ──
+
+async def export_snapshot(db: AsyncSession, root: Optional[Path] = None) -> Path:
+    """Write a new snapshot version and point CURRENT at it. Returns its directory."""
+    root = Path(root or settings.VECTOR_SNAPSHOT_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    dtype = np.dtype(settings.VECTOR_SNAPSHOT_DTYPE)
+
+    # One consistent view, so the row count matches what the stream returns
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    where = (JobPosting.embedding.is_not(None), JobPosting.embedding_model == EMBEDDING_VERSION)
+    count = (await db.execute(select(func.count()).select_from(JobPosting).where(*where))).scalar() or 0
+
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    target = root / f"snap-{version}"
+    staging = root / f".tmp-{version}"
+    staging.mkdir()
+    started = time.monotonic()
+    try:
+        vectors = np.lib.format.open_memmap(staging / "embeddings.npy", mode="w+", dtype=dtype, shape=(count, EMBEDDING_DIM))
+        ids = np.lib.format.open_memmap(staging / "ids.npy", mode="w+", dtype=np.int64, shape=(count,))
+        created = np.lib.format.open_memmap(staging / "created.npy", mode="w+", dtype=np.int64, shape=(count,))
+
+        offset = 0
+        stmt = (
+            select(JobPosting.id, JobPosting.embedding, JobPosting.created_at)
+            .where(*where)
+            .order_by(JobPosting.id)
+            .execution_options(yield_per=EXPORT_BATCH_ROWS)
+        )
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            n = len(rows)
+            block = np.asarray([row[1] for row in rows], dtype=np.float32)
+            vectors[offset:offset + n] = _normalize(block).astype(dtype, copy=False)
+            ids[offset:offset + n] = [row[0] for row in rows]
+            created[offset:offset + n] = [_epoch(row[2]) for row in rows]
+            offset += n
+        for arr in (vectors, ids, created):
+            arr.flush()
+        del vectors, ids, created
+
+        max_id = int(np.load(staging / "ids.npy", mmap_mode="r")[-1]) if count else 0
+        (staging / "meta.json").write_text(json.dumps({
+            "version": version,
+            "count": count,
+            "max_id": max_id,
+            "dtype": dtype.name,
+            "dim": EMBEDDING_DIM,
+            "embedding_model": EMBEDDING_VERSION,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+        }))
+        os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    finally:
+        await db.rollback()
+
+    pointer_tmp = root / f".{_POINTER}.tmp"
+    pointer_tmp.write_text(target.name)
+    os.replace(pointer_tmp, root / _POINTER)
+    _prune_versions(root, keep=target.name)
+    logger.info(f"Exported vector snapshot {target.name}: {count} jobs in {time.monotonic() - started:.1f}s")
+    return target
+
+
+def _prune_versions(root: Path, keep: str) -> None:
+    versions = sorted(p for p in root.glob("snap-*") if p.is_dir())
+    # Removing a mapped file is safe on POSIX: existing mappings stay valid until unmapped
+    for old in versions[:-KEEP_VERSIONS]:
+        if old.name != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+# ── search ──
+
+@dataclass
+class _Delta:
+    ids: np.ndarray
+    created: np.ndarray
+    vectors: np.ndarray  # float32, normalised
+
+
+class VectorSnapshot:
+    """A read-only mapped snapshot plus the in-process delta of rows added since."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.vectors = np.load(path / "embeddings.npy", mmap_mode="r")
+        self.ids = np.load(path / "ids.npy", mmap_mode="r")
+        self.created = np.load(path / "created.npy", mmap_mode="r")
+        self.delta = _Delta(
+            ids=np.empty(0, dtype=np.int64),
+            created=np.empty(0, dtype=np.int64),
+            vectors=np.empty((0, EMBEDDING_DIM), dtype=np.float32),
+        )
+
+    @property
+    def max_id(self) -> int:
+        return int(self.delta.ids[-1]) if len(self.delta.ids) else int(self.meta["max_id"])
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self.delta.ids)
+
+    async def refresh_delta(self, db: AsyncSession) -> int:
+        """Fetch jobs added since the snapshot (or the last refresh). Returns rows added."""
+        res = await db.execute(
+            select(JobPosting.id, JobPosting.embedding, JobPosting.created_at)
+            .where(
+                JobPosting.id > self.max_id,
+                JobPosting.embedding.is_not(None),
+                JobPosting.embedding_model == EMBEDDING_VERSION,
+            )
+            .order_by(JobPosting.id)
+        )
+        rows = res.all()
+        if not rows:
+            return 0
+        self.delta = _Delta(
+            ids=np.concatenate([self.delta.ids, np.asarray([r[0] for r in rows], dtype=np.int64)]),
+            created=np.concatenate([self.delta.created, np.asarray([_epoch(r[2]) for r in rows], dtype=np.int64)]),
+            vectors=np.concatenate([self.delta.vectors, _normalize(np.asarray([r[1] for r in rows], dtype=np.float32))]),
+        )
+        return len(rows)
+
+    def _blocks(self):
+        for start in range(0, len(self.ids), SEARCH_BLOCK_ROWS):
+            stop = start + SEARCH_BLOCK_ROWS
+            yield self.ids[start:stop], self.created[start:stop], self.vectors[start:stop]
+        if len(self.delta.ids):
+            yield self.delta.ids, self.delta.created, self.delta.vectors
+
+    def top_k(self, queries: np.ndarray, k: int, created_after: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact cosine top-k for each row of `queries` (m x dim). Returns (ids, similarities),
+        both m x k' with k' = min(k, rows searched), best first. `created_after` restricts the
+        search to jobs posted after that time; excluded slots come back with similarity -inf.
+        """
+        queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        if queries.shape[0] > QUERY_BLOCK_ROWS:
+            parts = [
+                self.top_k(queries[i:i + QUERY_BLOCK_ROWS], k, created_after)
+                for i in range(0, queries.shape[0], QUERY_BLOCK_ROWS)
+            ]
+            return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+        m = queries.shape[0]
+        min_created = _epoch(created_after) if created_after else None
+        best_ids = np.empty((m, 0), dtype=np.int64)
+        best_sims = np.empty((m, 0), dtype=np.float32)
+
+        for block_ids, block_created, block_vectors in self._blocks():
+            sims = queries @ np.asarray(block_vectors, dtype=np.float32).T  # m x block
+            if min_created is not None:
+                sims[:, np.asarray(block_created) < min_created] = -np.inf
+            # Best k of this block first, so the merge below only touches m x 2k values
+            if sims.shape[1] > k:
+                idx = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+                sims = np.take_along_axis(sims, idx, axis=1)
+            else:
+                idx = np.broadcast_to(np.arange(sims.shape[1]), sims.shape)
+            cand_ids = np.concatenate([best_ids, np.asarray(block_ids)[idx]], axis=1)
+            cand_sims = np.concatenate([best_sims, sims], axis=1)
+            if cand_sims.shape[1] > k:
+                keep = np.argpartition(-cand_sims, k - 1, axis=1)[:, :k]
+                cand_ids = np.take_along_axis(cand_ids, keep, axis=1)
+                cand_sims = np.take_along_axis(cand_sims, keep, axis=1)
+            best_ids, best_sims = cand_ids, cand_sims
+
+        order = np.argsort(-best_sims, axis=1)
+        return np.take_along_axis(best_ids, order, axis=1), np.take_along_axis(best_sims, order, axis=1)
+
+
+# ── per-process access ──
+
+_snapshot: Optional[VectorSnapshot] = None
+_last_check = 0.0
+
+
+def _current_path(root: Path) -> Optional[Path]:
+    try:
+        name = (root / _POINTER).read_text().strip()
+    except FileNotFoundError:
+        return None
+    path = root / name
+    if not (path / "meta.json").exists():
+        return None
+    # A snapshot exported under another embedding model is not comparable with current vectors
+    meta = json.loads((path / "meta.json").read_text())
+    return path if meta.get("embedding_model") == EMBEDDING_VERSION else None
+
+
+def get_snapshot() -> Optional[VectorSnapshot]:
+    """This process's mapped snapshot, reopened when a newer export appears; None if none exists."""
+    global _snapshot, _last_check
+    now = time.monotonic()
+    if _snapshot is not None and now - _last_check < RELOAD_CHECK_SECONDS:
+        return _snapshot
+    _last_check = now
+    path = _current_path(Path(settings.VECTOR_SNAPSHOT_DIR))
+    if path is None:
+        _snapshot = None
+        return None
+    if _snapshot is None or _snapshot.path != path:
+        _snapshot = VectorSnapshot(path)
+        logger.info(f"Mapped vector snapshot {path.name} ({len(_snapshot.ids)} jobs)")
+    return _snapshot
+
+
+def similarity_to_score(similarities: np.ndarray) -> np.ndarray:
+    """Cosine similarity -> the 0-100 match score used by job_resume_matches."""
+    return (1.0 + similarities) / 2.0 * 100.0
+
+
+def score_resumes(
+    snapshot: VectorSnapshot, resume_vectors: List[List[float]], k: int, created_after: Optional[datetime] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k job ids and 0-100 scores for a batch of resume embeddings."""
+    ids, sims = snapshot.top_k(np.asarray(resume_vectors, dtype=np.float32), k, created_after=created_after)
+    return ids, similarity_to_score(sims)
@@ -7,32 +7,77 @@ celery_app = Celery(
     backend=f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0"
 )
 
+from kombu import Queue
+
+# Work is split by what it waits on, so slow LLM calls or headless renders never hold the
+# CPU-bound slots and each queue runs at its own concurrency (app.worker.queue_worker)
+SCRAPE_IO = "scrape-io"  # page fetches, headless rendering, feed reads
+EMBED_CPU = "embed-cpu"  # resume parsing, sentence embeddings, match rebuilds
+LLM_IO = "llm-io"  # LLM-driven work (auto-apply)
+MAIL_IO = "mail-io"  # SMTP / Gmail sends, inbox sync
+QUEUES = (SCRAPE_IO, EMBED_CPU, LLM_IO, MAIL_IO)
+
+QUEUE_CONCURRENCY = {
+    SCRAPE_IO: settings.CELERY_SCRAPE_IO_CONCURRENCY,
+    EMBED_CPU: settings.CELERY_EMBED_CPU_CONCURRENCY,
+    LLM_IO: settings.CELERY_LLM_IO_CONCURRENCY,
+    MAIL_IO: settings.CELERY_MAIL_IO_CONCURRENCY,
+}
+
+# Within a queue, user-triggered work goes ahead of scheduled batches. With the Redis
+# broker a lower number is served first.
+PRIORITY_STEPS = [0, 3, 6, 9]
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 6
+_PRIORITY_SEP = ":"
+
+celery_app.conf.task_queues = [Queue(name) for name in QUEUES]
+celery_app.conf.task_default_queue = EMBED_CPU
 celery_app.conf.task_routes = {
-    "*": "main-queue"
+    "run_scraping_agent_task": {"queue": SCRAPE_IO},
+    "dispatch_due_crawls_task": {"queue": SCRAPE_IO},
+    "run_user_configured_scraping_task": {"queue": SCRAPE_IO},
+    "run_automated_discovery_task": {"queue": SCRAPE_IO},
+    "prune_page_archive_task": {"queue": SCRAPE_IO},
+    "process_resume_task": {"queue": EMBED_CPU},
+    "rebuild_job_matches_task": {"queue": EMBED_CPU},
+    "run_auto_apply_task": {"queue": LLM_IO},
+    "run_inbox_sync_task": {"queue": MAIL_IO},
+    "run_periodic_inbox_sync_task": {"queue": MAIL_IO},
+    "run_cold_mail_task": {"queue": MAIL_IO},
+    "run_scheduled_cold_mail_task": {"queue": MAIL_IO},
+    "run_daily_match_alerts_task": {"queue": MAIL_IO},
+}
+celery_app.conf.broker_transport_options = {
+    "priority_steps": PRIORITY_STEPS,
+    "sep": _PRIORITY_SEP,
+    "queue_order_strategy": "priority",
 }
+celery_app.conf.task_default_priority = PRIORITY_BATCH
 
-# Allow parallel processing of multiple resume uploads / scraper jobs
+# Fallback for a plain `celery worker` consuming every queue; queue_worker sets its own
 celery_app.conf.worker_concurrency = 4
 celery_app.conf.task_acks_late = True
 celery_app.conf.worker_prefetch_multiplier = 1
 
+
+def broker_queue_keys(queues=QUEUES) -> list:
+    """Redis list names holding the waiting messages of `queues`, one per priority step."""
+    return [name if step == 0 else f"{name}{_PRIORITY_SEP}{step}" for name in queues for step in PRIORITY_STEPS]
+
 celery_app.autodiscover_tasks(['app.worker'])
 
 # Celery Beat Schedule for Fully Autonomous Discovery and Match Tracking
 from celery.schedules import crontab
 
 celery_app.conf.beat_schedule = {
-    'run-daily-job-discovery': {
-        'task': 'run_automated_discovery_task',
-        'schedule': crontab(hour=8, minute=0), # Run every day at 8:00 AM
-    },
     'run-daily-match-alerts': {
         'task': 'run_daily_match_alerts_task',
         'schedule': crontab(hour=9, minute=0), # Run every day at 9:00 AM
     },
-    'run-user-configured-scraping': {
-        'task': 'run_user_configured_scraping_task',
-        'schedule': crontab(minute=0, hour='*/4'), # Every 4 hours
+    'dispatch-due-crawls': {
+        'task': 'dispatch_due_crawls_task',
+        'schedule': crontab(minute='*/10'), # Every 10 minutes; only due URLs are scraped
     },
     'run-scheduled-cold-mail': {
         'task': 'run_scheduled_cold_mail_task',
@@ -42,4 +87,12 @@ celery_app.conf.beat_schedule = {
         'task': 'run_periodic_inbox_sync_task',
         'schedule': crontab(minute=0, hour='*/2'), # Every 2 hours
     },
+    'prune-page-archive': {
+        'task': 'prune_page_archive_task',
+        'schedule': crontab(hour=3, minute=30), # Every day at 3:30 AM
+    },
+    'rebuild-job-matches': {
+        'task': 'rebuild_job_matches_task',
+        'schedule': crontab(hour=8, minute=0), # Every day at 8:00 AM, ahead of the match alerts
+    },
 }
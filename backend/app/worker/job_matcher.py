@@ -0,0 +1,255 @@
+"""
+Job matcher: consumes the job ingestion stream (see app/services/job_events.py).
+
+For each batch of newly ingested jobs it
+  1. scores them against every completed resume (job_resume_matches),
+  2. shortlists, for users with auto_apply_enabled, every job whose best resume scores at
+     or above the user's match_threshold (one Application per user and job),
+  3. claims those new applications ('processing') and dispatches run_auto_apply_task,
+and only then acknowledges the stream entries. Only applications created by this pipeline
+are dispatched, never ones a user shortlisted by hand.
+
+Applications the matcher creates carry auto_dispatch = 'pending' until their task has
+been sent, then 'sent'. Every batch dispatches all still-pending applications on its jobs,
+so if the matcher dies after committing a claim but before dispatching, the redelivered
+entry sends them. A crash right after sending, before the mark is committed, can dispatch
+an application twice (at-least-once). When an entry is dead-lettered, its undispatched
+applications go back to the user as plain 'shortlisted' ones.
+
+Run one or more instances next to the Celery worker:
+
+    python -m app.worker.job_matcher
+"""
+import asyncio
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import text
+
+from app.db.session import AsyncSessionLocal
+from app.services import job_events, match_store
+
+# Entries read per XREADGROUP; their job IDs are scored as one batch
+READ_COUNT = 50
+READ_BLOCK_MS = 5000
+
+CLAIM_INTERVAL_SECONDS = 30
+METRICS_INTERVAL_SECONDS = 60
+
+_DEFAULT_MATCH_THRESHOLD = 70.0
+
+
+async def shortlist_jobs(db, job_ids: List[int]) -> List[Tuple[int, int]]:
+    """
+    Create 'shortlisted' applications for auto-apply users whose best resume scores at or
+    above their threshold. Idempotent: users who already have an application for the job
+    are skipped. Returns (application_id, user_id) of the applications this call created.
+    """
+    res = await db.execute(
+        text("""
+            INSERT INTO applications (user_id, job_id, resume_id, company_name, job_title, location, source_url,
+                                      application_type, status, notes, auto_dispatch, created_at)
+            SELECT DISTINCT ON (m.user_id, m.job_id)
+                   m.user_id, m.job_id, m.resume_id, j.company, j.title, j.location, j.source_url,
+                   'Standard', 'shortlisted',
+                   'Auto-shortlisted: match score ' || round(m.score::numeric, 1), 'pending', now()
+            FROM job_resume_matches m
+            JOIN user_settings s ON s.user_id = m.user_id AND s.auto_apply_enabled
+            JOIN job_postings j ON j.id = m.job_id
+            WHERE m.job_id = ANY(:job_ids)
+              AND m.score >= coalesce(s.match_threshold, :default_threshold)
+              AND NOT EXISTS (
+                  SELECT 1 FROM applications a WHERE a.user_id = m.user_id AND a.job_id = m.job_id
+              )
+            ORDER BY m.user_id, m.job_id, m.score DESC
+            RETURNING id, user_id
+        """),
+        {"job_ids": job_ids, "default_threshold": _DEFAULT_MATCH_THRESHOLD},
+    )
+    return [(row[0], row[1]) for row in res]
+
+
+async def claim_for_dispatch(db, app_ids: List[int]) -> List[Tuple[int, int]]:
+    """Move still-'shortlisted' applications to 'processing'. Returns the (application_id, user_id) claimed."""
+    if not app_ids:
+        return []
+    res = await db.execute(
+        text("""
+            UPDATE applications SET status = 'processing', updated_at = now()
+            WHERE id = ANY(:ids) AND status = 'shortlisted'
+            RETURNING id, user_id
+        """),
+        {"ids": app_ids},
+    )
+    return [(row[0], row[1]) for row in res]
+
+
+async def undispatched(db, job_ids: List[int]) -> List[Tuple[int, int]]:
+    """(application_id, user_id) of matcher-claimed applications on these jobs whose task was never sent."""
+    res = await db.execute(
+        text("""
+            SELECT id, user_id FROM applications
+            WHERE job_id = ANY(:job_ids) AND auto_dispatch = 'pending' AND status = 'processing'
+            ORDER BY id
+        """),
+        {"job_ids": job_ids},
+    )
+    return [(row[0], row[1]) for row in res]
+
+
+async def release_undispatched(job_ids: List[int]) -> int:
+    """Hand undispatched applications on these jobs back to their users as 'shortlisted'."""
+    async with AsyncSessionLocal() as db:
+        res = await db.execute(
+            text("""
+                UPDATE applications SET status = 'shortlisted', auto_dispatch = NULL, updated_at = now()
+                WHERE job_id = ANY(:job_ids) AND auto_dispatch = 'pending' AND status = 'processing'
+            """),
+            {"job_ids": job_ids},
+        )
+        await db.commit()
+        return res.rowcount
+
+
+async def process_jobs(job_ids: List[int], dispatch: Optional[Callable[[int, int], None]] = None) -> dict:
+    """
+    Score, shortlist and dispatch one batch. Safe to repeat for the same jobs. `dispatch`
+    sends one auto-apply (user_id, application_id); it defaults to run_auto_apply_task.delay.
+    Raises if a dispatch fails, so the batch is not acknowledged and is retried.
+    """
+    if dispatch is None:
+        from app.worker.tasks import run_auto_apply_task
+        dispatch = run_auto_apply_task.delay
+
+    async with AsyncSessionLocal() as db:
+        matches_written = await match_store.score_jobs(db, job_ids)
+        await db.commit()
+
+        # Create and claim in one transaction, so a redelivered batch either redoes both or
+        # finds the applications already there. Claiming before dispatch means a fast
+        # auto-apply's 'prepared'/'error' status is never overwritten afterwards.
+        created = await shortlist_jobs(db, job_ids)
+        await claim_for_dispatch(db, [app_id for app_id, _ in created])
+        await db.commit()
+
+        # This batch's claims plus any an earlier delivery committed but never sent
+        to_dispatch = await undispatched(db, job_ids)
+        sent: List[int] = []
+        try:
+            for app_id, user_id in to_dispatch:
+                dispatch(user_id, app_id)
+                sent.append(app_id)
+        finally:
+            if sent:
+                await db.execute(
+                    text("UPDATE applications SET auto_dispatch = 'sent' WHERE id = ANY(:ids)"),
+                    {"ids": sent},
+                )
+                await db.commit()
+
+    return {"jobs": len(job_ids), "matches_written": matches_written, "auto_applied": len(sent)}
+
+
+class JobMatcher:
+    def __init__(self, consumer_name: str):
+        self.consumer = consumer_name
+        self._stopping = False
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    async def _handle(self, client, entries: List[Tuple[str, Dict[str, str]]]) -> None:
+        if not entries:
+            return
+        job_ids = sorted({job_id for _, fields in entries for job_id in job_events.decode_job_ids(fields.get("job_ids"))})
+        started = time.monotonic()
+        if job_ids:
+            result = await process_jobs(job_ids)
+            logger.info(
+                f"Matched {result['jobs']} new jobs in {time.monotonic() - started:.2f}s: "
+                f"{result['matches_written']} matches stored, {result['auto_applied']} auto-applies dispatched"
+            )
+        await client.xack(job_events.JOB_STREAM, job_events.MATCHER_GROUP, *(entry_id for entry_id, _ in entries))
+
+    async def _reclaim(self, client) -> None:
+        """Take over entries a dead consumer left pending; dead-letter the ones that keep failing."""
+        pending = await client.xpending_range(
+            job_events.JOB_STREAM, job_events.MATCHER_GROUP,
+            min="-", max="+", count=100, idle=job_events.CLAIM_IDLE_MS,
+        )
+        for entry in pending:
+            if entry["times_delivered"] < job_events.MAX_DELIVERIES:
+                continue
+            claimed = await client.xclaim(
+                job_events.JOB_STREAM, job_events.MATCHER_GROUP, self.consumer,
+                job_events.CLAIM_IDLE_MS, [entry["message_id"]],
+            )
+            for entry_id, fields in claimed:
+                await client.xadd(job_events.DEAD_LETTER_STREAM, {**(fields or {}), "original_id": entry_id})
+                await client.xack(job_events.JOB_STREAM, job_events.MATCHER_GROUP, entry_id)
+                logger.error(f"Dead-lettered job event {entry_id} after {entry['times_delivered']} deliveries")
+                released = await release_undispatched(job_events.decode_job_ids((fields or {}).get("job_ids")))
+                if released:
+                    logger.warning(f"Returned {released} undispatched auto-apply applications to 'shortlisted'")
+
+        # Redis 7 adds a third element (deleted IDs) to the reply
+        claimed = (await client.xautoclaim(
+            job_events.JOB_STREAM, job_events.MATCHER_GROUP, self.consumer,
+            job_events.CLAIM_IDLE_MS, start_id="0-0", count=READ_COUNT,
+        ))[1]
+        if claimed:
+            logger.warning(f"Reclaimed {len(claimed)} stale job events")
+            await self._handle(client, [(entry_id, fields or {}) for entry_id, fields in claimed])
+
+    async def run(self) -> None:
+        client = job_events.redis_client()
+        await job_events.ensure_group(client)
+        logger.info(f"Job matcher {self.consumer} consuming {job_events.JOB_STREAM}")
+        last_claim = last_metrics = 0.0
+        try:
+            while not self._stopping:
+                try:
+                    now = time.monotonic()
+                    if now - last_claim >= CLAIM_INTERVAL_SECONDS:
+                        last_claim = now
+                        await self._reclaim(client)
+                    if now - last_metrics >= METRICS_INTERVAL_SECONDS:
+                        last_metrics = now
+                        metrics = await job_events.stream_metrics(client)
+                        logger.info(
+                            f"Job stream lag={metrics['lag']} pending={metrics['pending']} "
+                            f"oldest_pending_ms={metrics['oldest_pending_ms']} dead={metrics['dead_letters']}"
+                        )
+
+                    response = await client.xreadgroup(
+                        job_events.MATCHER_GROUP, self.consumer, {job_events.JOB_STREAM: ">"},
+                        count=READ_COUNT, block=READ_BLOCK_MS,
+                    )
+                    for _, entries in response or []:
+                        await self._handle(client, entries)
+                except Exception as e:
+                    # Unacknowledged entries stay pending and are retried through _reclaim
+                    logger.exception(f"Job matcher batch failed: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            await client.aclose()
+
+
+def main() -> None:
+    matcher = JobMatcher(consumer_name=f"{socket.gethostname()}-{os.getpid()}")
+
+    async def _run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, matcher.stop)
+        await matcher.run()
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
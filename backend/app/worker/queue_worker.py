@@ -0,0 +1,34 @@
+"""
+Celery worker for one or more queues (celery_app.QUEUES), at the configured concurrency.
+
+    python -m app.worker.queue_worker scrape-io
+    python -m app.worker.queue_worker llm-io mail-io --concurrency 6
+
+Without --concurrency the worker runs the largest CELERY_<QUEUE>_CONCURRENCY of its queues.
+Run one worker per queue to keep CPU-bound embedding apart from IO-bound fetches and LLM
+calls. A plain `celery -A app.worker.celery_app worker` still consumes every queue.
+"""
+import argparse
+
+from app.worker.celery_app import QUEUES, QUEUE_CONCURRENCY, celery_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a Celery worker for specific queues.")
+    parser.add_argument("queues", nargs="+", choices=QUEUES)
+    parser.add_argument("--concurrency", type=int, help="worker processes (default: from settings)")
+    parser.add_argument("--loglevel", default="info")
+    args = parser.parse_args()
+
+    concurrency = args.concurrency or max(QUEUE_CONCURRENCY[q] for q in args.queues)
+    celery_app.worker_main([
+        "worker",
+        f"--loglevel={args.loglevel}",
+        f"--queues={','.join(args.queues)}",
+        f"--concurrency={max(concurrency, 1)}",
+        f"--hostname={'+'.join(args.queues)}@%h",
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Re-embedding backfill: re-encodes every resume and job whose stored vector came from
+another EMBEDDING_VERSION (services/embeddings.py), e.g. after EMBEDDING_MODEL changed.
+
+    python -m app.worker.reembed                       # resumes, then jobs
+    python -m app.worker.reembed --table jobs --batch-size 128
+
+Resumes go first: there are few of them, and once they are on the new version every newly
+ingested job matches again. Rows are read in id order and encoded in batches through one
+batched forward pass. Each batch is written and rescored (job_resume_matches) in its own
+transaction, and its last id is then checkpointed in Redis under reembed:<table>:<version>.
+A restarted run continues from the checkpoint. Rows already on the current version are
+skipped anyway, so a lost checkpoint only costs a rescan.
+
+The backfill yields to live work:
+- torch runs with REEMBED_THREADS threads,
+- after each batch it sleeps, so encoding takes at most REEMBED_DUTY_CYCLE of wall time,
+- while more than REEMBED_MAX_QUEUE_DEPTH tasks wait on the embed-cpu queue, it pauses.
+
+After a jobs pass rebuild_job_matches_task is queued; it exports a fresh vector snapshot and
+rescores every resume against the new vectors.
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from loguru import logger
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.db.models.job_posting import JobPosting
+from app.db.models.resume import Resume
+from app.db.session import AsyncSessionLocal
+from app.services import embeddings, job_events, match_store
+from app.worker.celery_app import EMBED_CPU, broker_queue_keys, celery_app
+
+DEFAULT_BATCH_SIZE = 256
+
+# Celery broker lists watched for backlog: the CPU-bound queue, at every priority level
+CELERY_QUEUE_KEYS = broker_queue_keys([EMBED_CPU])
+QUEUE_CHECK_SECONDS = 5
+
+
+async def _score_jobs(db, ids: List[int]) -> None:
+    await match_store.score_jobs(db, ids)
+
+
+async def _rescore_resumes(db, ids: List[int]) -> None:
+    for resume_id in ids:
+        await match_store.rescore_resume(db, resume_id)
+
+
+@dataclass(frozen=True)
+class _Table:
+    model: Any
+    columns: tuple
+    text: Callable[[Any], str]
+    rescore: Callable
+    where: tuple = ()
+
+
+TABLES = {
+    "resumes": _Table(
+        model=Resume,
+        columns=(Resume.id, Resume.raw_text),
+        text=lambda row: embeddings.resume_text(row.raw_text),
+        rescore=_rescore_resumes,
+        where=(Resume.raw_text.is_not(None),),
+    ),
+    "jobs": _Table(
+        model=JobPosting,
+        columns=(JobPosting.id, JobPosting.title, JobPosting.company, JobPosting.description),
+        text=lambda row: embeddings.job_text(row.title, row.company, row.description),
+        rescore=_score_jobs,
+    ),
+}
+
+
+def _stale(table: _Table):
+    return (table.model.embedding_model.is_distinct_from(embeddings.EMBEDDING_VERSION), *table.where)
+
+
+def _checkpoint_key(name: str) -> str:
+    return f"reembed:{name}:{embeddings.EMBEDDING_VERSION}"
+
+
+class Throttle:
+    """Keeps the backfill to its duty cycle and out of the way of a backed-up Celery queue."""
+
+    def __init__(self, client, duty_cycle: float, max_queue_depth: int):
+        self.client = client
+        self.duty_cycle = min(max(duty_cycle, 0.05), 1.0)
+        self.max_queue_depth = max_queue_depth
+
+    async def _queue_depth(self) -> int:
+        if self.client is None:
+            return 0
+        try:
+            return sum([await self.client.llen(key) for key in CELERY_QUEUE_KEYS])
+        except Exception:
+            return 0
+
+    async def after_batch(self, busy_seconds: float) -> None:
+        await asyncio.sleep(busy_seconds * (1 - self.duty_cycle) / self.duty_cycle)
+        waited = False
+        while (depth := await self._queue_depth()) > self.max_queue_depth:
+            if not waited:
+                logger.info(f"Re-embedding paused: {depth} Celery tasks waiting")
+                waited = True
+            await asyncio.sleep(QUEUE_CHECK_SECONDS)
+
+
+async def _get_checkpoint(client, name: str) -> int:
+    if client is None:
+        return 0
+    try:
+        return int(await client.get(_checkpoint_key(name)) or 0)
+    except Exception as e:
+        logger.warning(f"Could not read re-embed checkpoint ({e}); starting from the first row")
+        return 0
+
+
+async def _set_checkpoint(client, name: str, last_id: Optional[int]) -> None:
+    if client is None:
+        return
+    try:
+        if last_id is None:
+            await client.delete(_checkpoint_key(name))
+        else:
+            await client.set(_checkpoint_key(name), last_id)
+    except Exception as e:
+        logger.warning(f"Could not write re-embed checkpoint: {e}")
+
+
+async def reembed_table(name: str, batch_size: int, throttle: Throttle, client=None) -> int:
+    """Re-embed one table's stale rows. Returns the number of rows re-embedded."""
+    table = TABLES[name]
+    async with AsyncSessionLocal() as db:
+        remaining = (await db.execute(
+            select(func.count()).select_from(table.model).where(*_stale(table))
+        )).scalar() or 0
+    after_id = await _get_checkpoint(client, name)
+    logger.info(f"Re-embedding {remaining} {name} to {embeddings.EMBEDDING_VERSION} (from id > {after_id})")
+
+    done = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(*table.columns)
+                .where(table.model.id > after_id, *_stale(table))
+                .order_by(table.model.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+            started = time.monotonic()
+            vectors = await asyncio.to_thread(embeddings.embed_batch, [table.text(row) for row in rows])
+            await db.execute(update(table.model), [
+                {"id": row.id, "embedding": vector, "embedding_model": embeddings.EMBEDDING_VERSION}
+                for row, vector in zip(rows, vectors)
+            ])
+            await table.rescore(db, [row.id for row in rows])
+            await db.commit()
+            busy = time.monotonic() - started
+
+        after_id = rows[-1].id
+        done += len(rows)
+        await _set_checkpoint(client, name, after_id)
+        logger.info(f"Re-embedded {done}/{remaining} {name} ({len(rows) / max(busy, 1e-6):.0f} rows/s while busy)")
+        await throttle.after_batch(busy)
+
+    await _set_checkpoint(client, name, None)
+    logger.info(f"Re-embedding {name} complete: {done} rows")
+    return done
+
+
+async def reembed(tables: List[str], batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    try:
+        client = job_events.redis_client()
+        await client.ping()
+    except Exception as e:
+        logger.warning(f"Redis unavailable ({e}); running without checkpoints or queue throttling")
+        client = None
+    throttle = Throttle(client, settings.REEMBED_DUTY_CYCLE, settings.REEMBED_MAX_QUEUE_DEPTH)
+    counts = {}
+    try:
+        for name in tables:
+            counts[name] = await reembed_table(name, batch_size, throttle, client)
+        if counts.get("jobs"):
+            celery_app.send_task("rebuild_job_matches_task")
+    finally:
+        if client is not None:
+            await client.aclose()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-embed jobs and resumes with the current embedding model.")
+    parser.add_argument("--table", choices=[*TABLES, "all"], default="all")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    import torch
+    torch.set_num_threads(max(settings.REEMBED_THREADS, 1))
+
+    tables = list(TABLES) if args.table == "all" else [args.table]
+    asyncio.run(reembed(tables, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Replay the job parsers over archived page snapshots (services/page_archive.py), with no
+network access.
+
+    python -m app.worker.reparse --since 2026-03-01 --url-contains remoteok.com --output out.jsonl
+    python -m app.worker.reparse --parser headless --workers 8 --ingest
+
+Each distinct (url, body) pair is parsed once, in a pool of worker processes. With
+--parser auto, the parser is chosen the way the scraper chooses it:
+- the site parser, if the URL has one (page_parsers.site_parser),
+- otherwise, for pages rendered headless, JSON-LD plus the spaCy DOM fallback
+  (spiders.extract_jobs_from_html),
+- otherwise, for static pages, JSON-LD only.
+
+The LLM extraction step is never replayed. Results go to --output as JSON lines. With
+--ingest, jobs not already stored for their source URL are inserted and announced like
+freshly scraped ones.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from app.services import page_archive
+
+PARSERS = ("auto", "site", "json_ld", "headless")
+
+
+def _parse_snapshot(args) -> dict:
+    """Runs in a pool process: parse one archived page. Never raises."""
+    snapshot, choice = args
+    result = {**snapshot, "parser": None, "jobs": [], "error": None}
+    try:
+        from bs4 import BeautifulSoup
+        from app.services.page_parsers import parse_json_ld_jobs, site_parser
+        from app.services.spiders import extract_jobs_from_html
+
+        html = page_archive.read_body(snapshot["sha256"]).decode("utf-8", errors="replace")
+        site = site_parser(snapshot["url"])
+        if choice == "site" or (choice == "auto" and site):
+            if not site:
+                result["error"] = "no site parser for this URL"
+                return result
+            result["parser"], jobs = site[0], site[1](BeautifulSoup(html, "lxml"))
+        elif choice == "headless" or (choice == "auto" and snapshot["tier"] == "headless"):
+            result["parser"], jobs = "headless", extract_jobs_from_html(html)
+        else:
+            result["parser"], jobs = "json_ld", parse_json_ld_jobs(BeautifulSoup(html, "lxml"))
+        result["jobs"] = jobs
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _distinct_snapshots(since: Optional[date], until: Optional[date], url_contains: Optional[str]) -> List[dict]:
+    """Latest snapshot header of each distinct (url, body)."""
+    latest: Dict[tuple, dict] = {}
+    for snapshot in page_archive.iter_snapshots(since, until, url_contains):
+        if 200 <= snapshot.status < 300:
+            latest[(snapshot.url, snapshot.sha256)] = snapshot.as_dict()
+    return list(latest.values())
+
+
+async def _ingest(results: List[dict]) -> int:
+    """Insert reparsed jobs that are not stored yet (same title dedup per source URL as the scraper)."""
+    from sqlalchemy import func, select
+
+    from app.db.models.job_posting import JobPosting
+    from app.db.session import AsyncSessionLocal
+    from app.services import embeddings, job_events
+
+    added = 0
+    async with AsyncSessionLocal() as db:
+        for result in results:
+            if not result["jobs"]:
+                continue
+            url = result["url"]
+            existing = set((await db.execute(
+                select(func.lower(func.trim(JobPosting.title))).where(JobPosting.source_url == url)
+            )).scalars().all())
+            new_jobs = []
+            for job in result["jobs"]:
+                key = job["title"].lower().strip()
+                if key not in existing:
+                    existing.add(key)
+                    new_jobs.append(job)
+            if not new_jobs:
+                continue
+            vectors = await asyncio.to_thread(embeddings.embed_batch, [
+                embeddings.job_text(j["title"], j.get("company", "Unknown"), j.get("description", ""))
+                for j in new_jobs
+            ])
+            rows = [
+                JobPosting(
+                    source="reparse",
+                    title=j["title"],
+                    company=j.get("company", "Unknown"),
+                    location=j.get("location"),
+                    description=j.get("description", ""),
+                    embedding=vector,
+                    embedding_model=embeddings.EMBEDDING_VERSION,
+                    source_url=url,
+                )
+                for j, vector in zip(new_jobs, vectors)
+            ]
+            db.add_all(rows)
+            await db.commit()
+            await job_events.announce_jobs(db, [row.id for row in rows], "reparse")
+            added += len(rows)
+    return added
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay job parsers over archived page snapshots.")
+    parser.add_argument("--since", type=date.fromisoformat, help="first fetch day (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="last fetch day (YYYY-MM-DD)")
+    parser.add_argument("--url-contains", help="only snapshots whose URL contains this")
+    parser.add_argument("--parser", choices=PARSERS, default="auto")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--output", help="write one JSON line per parsed snapshot here ('-' for stdout)")
+    parser.add_argument("--ingest", action="store_true", help="store jobs not yet in job_postings")
+    args = parser.parse_args()
+
+    if not page_archive.enabled():
+        sys.exit("Page archive is disabled or zstandard is not installed.")
+
+    snapshots = _distinct_snapshots(args.since, args.until, args.url_contains)
+    logger.info(f"Reparsing {len(snapshots)} archived pages with {args.workers} workers (parser={args.parser})")
+    started = time.monotonic()
+
+    out = None
+    if args.output:
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    results, jobs_by_parser, errors = [], Counter(), 0
+    try:
+        with ProcessPoolExecutor(max_workers=max(args.workers, 1)) as pool:
+            for result in pool.map(_parse_snapshot, [(s, args.parser) for s in snapshots], chunksize=8):
+                results.append(result)
+                if result["error"]:
+                    errors += 1
+                jobs_by_parser[result["parser"] or "none"] += len(result["jobs"])
+                if out:
+                    out.write(json.dumps(result) + "\n")
+    finally:
+        if out and out is not sys.stdout:
+            out.close()
+
+    summary = ", ".join(f"{name}={count}" for name, count in sorted(jobs_by_parser.items()))
+    logger.info(
+        f"Reparsed {len(results)} pages in {time.monotonic() - started:.1f}s: "
+        f"{sum(jobs_by_parser.values())} jobs ({summary}), {errors} errors"
+    )
+    if args.ingest:
+        added = asyncio.run(_ingest(results))
+        logger.info(f"Ingested {added} new jobs from archived pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Long-lived asyncio runtime for Celery worker processes.
+
+Task bodies are coroutines. Running each one with asyncio.run() built and tore down an
+event loop per task. That stranded the asyncpg pool's connections on dead loops, and no
+loop-bound client (Redis, Playwright) could outlive a task.
+
+Instead, each prefork child starts one event loop at worker_process_init, and run()
+executes every task body on it. What hangs off that loop is set up once per process and
+reused by every task:
+- the SQLAlchemy engine's connection pool (app.db.session.engine),
+- the shared headless browser (services/browser_pool.py),
+- the resume parser helper process (services/resume_executor.py),
+- the shared Redis client (job events, task registry),
+- and, independent of the loop, the process-wide HTTP session (services/http_client.py).
+At worker_process_shutdown they are closed on the same loop, and leftover tasks are
+cancelled.
+
+Outside a prefork child (solo pool, scripts, tests) no loop is installed and run() falls
+back to asyncio.run().
+"""
+import asyncio
+from typing import Any, Coroutine, Optional
+
+from celery.signals import worker_process_init, worker_process_shutdown
+from loguru import logger
+
+from app.db.session import engine
+from app.services import browser_pool, http_client, job_events, resume_executor
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a task body to completion on this worker process's event loop."""
+    if _loop is None or _loop.is_closed():
+        return asyncio.run(coro)
+    return _loop.run_until_complete(coro)
+
+
+@worker_process_init.connect
+def start_worker_loop(**_) -> None:
+    global _loop
+    # Connections inherited from the parent must not be shared with it; drop them unclosed
+    engine.sync_engine.dispose(close=False)
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    browser_pool.keep_alive()
+    logger.info("Worker event loop started")
+
+
+async def _close_resources() -> None:
+    for name, close in (
+        ("browser", browser_pool.close),
+        ("resume parser", resume_executor.close),
+        ("Redis client", job_events.close_shared_client),
+    ):
+        try:
+            await close()
+        except Exception as e:
+            logger.warning(f"Error closing {name}: {e}")
+    await engine.dispose()
+
+
+@worker_process_shutdown.connect
+def stop_worker_loop(**_) -> None:
+    global _loop
+    loop, _loop = _loop, None
+    if loop is None or loop.is_closed():
+        return
+    try:
+        loop.run_until_complete(_close_resources())
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    except Exception as e:
+        logger.warning(f"Worker event loop did not shut down cleanly: {e}")
+    finally:
+        http_client.close()
+        asyncio.set_event_loop(None)
+        loop.close()
+        logger.info("Worker event loop stopped")
@@ -1,11 +1,12 @@
 import asyncio
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import select, func
 import os
 from email.mime.base import MIMEBase
 from email import encoders
 from pathlib import Path
-from app.worker.celery_app import celery_app
+from app.worker.celery_app import celery_app, broker_queue_keys, PRIORITY_INTERACTIVE
+from app.worker import runtime
 from app.db.session import AsyncSessionLocal
 from app.db.models.resume import Resume
 from app.db.models.setting import UserSetting
@@ -15,12 +16,21 @@ from app.db.models.user import User
 from app.db.models.application import Application
 from app.db.models.email_template import EmailTemplate
 from app.db.models.action_log import ActionLog
-from app.services.resume_parser import parse_and_embed_resume
+from app.db.models.match import JobResumeMatch
+from app.services.resume_executor import get_resume_executor
+from app.services.resume_files import read_resume_bytes, resume_file_source
+from app.services.keyword_scanner import scanner_for_terms
+from app.services.page_parsers import site_parser, parse_json_ld_jobs
+from app.services import match_store, job_events, vector_snapshot, embeddings, page_archive, feed_adapters, ats_adapters, crawl_scheduler, scrape_flight, task_registry, http_client
+from app.services.template_engine import build_value_map, get_compiled, TemplateSyntaxError
+from app.services.outreach import (
+    reserve_daily_quota, release_daily_quota, enqueue_next_contacts,
+    requeue_stale_claims, claim_queued, record_outreach_result,
+)
 import requests
 from bs4 import BeautifulSoup
 from app.services.llm import call_llm
 from app.services.inbox_scanner import run_inbox_scanner_async
-from app.core.config import settings as app_settings
 from app.core.encryption import decrypt
 import json
 import smtplib
@@ -28,7 +38,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 
-async def process_resume_async(resume_id: int, file_bytes: bytes, filename: str):
+async def process_resume_async(resume_id: int, filename: str):
     async with AsyncSessionLocal() as db:
         try:
             # 1. Parse and Embed
@@ -47,12 +57,20 @@ async def process_resume_async(resume_id: int, file_bytes: bytes, filename: str)
             db.add(log_start)
             await db.commit()
 
-            # Run synchronous parsing + embedding in a thread pool to avoid blocking event loop
-            result = await asyncio.to_thread(parse_and_embed_resume, file_bytes, filename)
+            # The worker gets a file reference, not the upload bytes; disk-backed blobs are parsed in place
+            source = await resume_file_source(db, resume)
+            if source is None:
+                raise ValueError("Resume file is missing from storage. Re-upload the resume.")
+            await db.commit()
+            await task_registry.checkpoint("parsing")
+
+            # Parse + embed in this worker's warm, isolated parser helper (timeout and crash-safe)
+            result = await get_resume_executor().extract(source, filename)
             
             # 2. Update DB Entity
             resume.raw_text = result["raw_text"]
             resume.embedding = result["embedding"]
+            resume.embedding_model = result["embedding_model"]
             resume.structural_score = result["structural_score"]
             resume.semantic_score = result["semantic_score"]
             
@@ -60,6 +78,7 @@ async def process_resume_async(resume_id: int, file_bytes: bytes, filename: str)
             stmt_set = select(UserSetting).where(UserSetting.user_id == resume.user_id)
             settings = (await db.execute(stmt_set)).scalars().first()
             
+            await task_registry.checkpoint("tagging")
             if settings and settings.gemini_api_keys:
                 extract_prompt = f"""You are a professional resume parser. Extract the following key details from this resume text to be used directly as replacement variables in cold emails and templates. 
 Return STRICTLY valid JSON with these exact keys. 
@@ -92,6 +111,7 @@ Resume Text:
                     logger.warning(f"LLM rich tag extraction failed for resume {resume.id}: {llm_e}")
                     resume.parsed_json = {}
 
+            await task_registry.checkpoint("scoring")
             ats_score = (resume.structural_score * 0.4 + resume.semantic_score * 0.6) * 100
             stmt_set = select(UserSetting).where(UserSetting.user_id == resume.user_id)
             settings = (await db.execute(stmt_set)).scalars().first()
@@ -114,6 +134,14 @@ Resume Text:
             
             await db.commit()
             logger.info(f"Successfully processed resume_id={resume_id}")
+
+            try:
+                matched = await match_store.rescore_resume(db, resume_id)
+                await db.commit()
+                logger.info(f"Resume {resume_id}: stored {matched} job matches")
+            except Exception as match_e:
+                await db.rollback()
+                logger.warning(f"Match scoring failed for resume {resume_id}: {match_e}")
             
         except Exception as e:
             logger.exception(f"Failed to process resume {resume_id}: {e}")
@@ -131,11 +159,36 @@ Resume Text:
                 await db.commit()
 
 @celery_app.task(name="process_resume_task")
-def process_resume_task(resume_id: int, file_bytes: bytes, filename: str):
+def process_resume_task(resume_id: int, filename: str, user_id: int = None, registry_task_id: str = None):
     """
     Synchronous wrapper for Celery to run the async DB update.
     """
-    asyncio.run(process_resume_async(resume_id, file_bytes, filename))
+    runtime.run(task_registry.run_tracked(
+        user_id, "resume_extraction", process_resume_async(resume_id, filename), registry_task_id
+    ))
+
+async def enqueue_interactive(task, user_id: int, task_type: str, *args, label: str = "", **kwargs) -> str:
+    """
+    Queue a user-triggered Celery task ahead of scheduled batch work on its queue.
+    Returns the task registry ID the API hands back for status and stop.
+    """
+    task_id = await task_registry.enqueue_task(user_id, task_type, label)
+    try:
+        task.apply_async(args=args, kwargs={**kwargs, "registry_task_id": task_id}, priority=PRIORITY_INTERACTIVE)
+    except Exception:
+        await task_registry.cancel_task(task_id)
+        raise
+    return task_id
+
+async def queued_count(queue: str) -> int:
+    """Messages waiting on a Celery queue, across its priority levels. 0 when Redis is unreachable."""
+    client = job_events.redis_client()
+    try:
+        return sum([await client.llen(key) for key in broker_queue_keys([queue])])
+    except Exception:
+        return 0
+    finally:
+        await client.aclose()
 
 import random
 import time
@@ -159,8 +212,10 @@ def _fetch_page(url: str, retries: int = 3, timeout: int = 20):
                 'Accept-Encoding': 'gzip, deflate',
                 'Connection': 'keep-alive',
             }
-            response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+            response = http_client.session().get(url, headers=headers, timeout=timeout, allow_redirects=True)
             response.raise_for_status()
+            page_archive.archive_page(url, response.content, status=response.status_code, tier="static",
+                                      content_type=response.headers.get("Content-Type"))
             return response
         except requests.exceptions.RequestException as e:
             logger.warning(f"Scrape attempt {attempt + 1}/{retries} failed for {url}: {e}")
@@ -168,111 +223,9 @@ def _fetch_page(url: str, retries: int = 3, timeout: int = 20):
                 time.sleep(2 ** attempt)  # Exponential backoff
     raise Exception(f"Failed to fetch {url} after {retries} attempts")
 
-def _parse_remoteok_jobs(soup):
-    """Site-specific parser for RemoteOK."""
-    jobs = []
-    for row in soup.find_all('tr', class_='job'):
-        title_el = row.find('h2')
-        company_el = row.find('h3')
-        tags = [tag.get_text(strip=True) for tag in row.find_all('div', class_='tag')]
-        if title_el:
-            jobs.append({
-                "title": title_el.get_text(strip=True),
-                "company": company_el.get_text(strip=True) if company_el else "Unknown",
-                "location": "Remote",
-                "description": f"Tags: {', '.join(tags[:5])}" if tags else "Remote position",
-            })
-    return jobs
-
-def _parse_hackernews_jobs(soup):
-    """Site-specific parser for Hacker News jobs."""
-    jobs = []
-    for item in soup.find_all('tr', class_='athing'):
-        title_link = item.find('a', class_='titleline') or item.find('span', class_='titleline')
-        if title_link:
-            text = title_link.get_text(strip=True)
-            if len(text) > 10 and len(text) < 200:
-                # Try to extract company from " at Company" or "Company - " patterns
-                company = "YC Company"
-                if " at " in text:
-                    parts = text.split(" at ", 1)
-                    company = parts[1].split("(")[0].strip() if len(parts) > 1 else company
-                elif " - " in text:
-                    company = text.split(" - ")[0].strip()
-                jobs.append({
-                    "title": text,
-                    "company": company,
-                    "location": "Remote / On-site",
-                    "description": text,
-                })
-    return jobs
-
-def _parse_weworkremotely_jobs(soup):
-    """Site-specific parser for WeWorkRemotely."""
-    jobs = []
-    for listing in soup.find_all('li', class_='feature'):
-        link = listing.find('a')
-        if not link:
-            continue
-        spans = link.find_all('span')
-        title = ""
-        company = ""
-        for span in spans:
-            cls = span.get('class', [])
-            if 'title' in cls:
-                title = span.get_text(strip=True)
-            elif 'company' in cls:
-                company = span.get_text(strip=True)
-        if title:
-            jobs.append({
-                "title": title,
-                "company": company or "Unknown",
-                "location": "Remote",
-                "description": f"{title} at {company}" if company else title,
-            })
-    return jobs
-
 import re as _re
 from urllib.parse import urljoin, urlparse
 
-def _parse_json_ld_jobs(soup):
-    """Extract job postings from JSON-LD structured data."""
-    jobs = []
-    for script in soup.find_all('script', type='application/ld+json'):
-        try:
-            data = json.loads(script.string)
-            items = data if isinstance(data, list) else [data]
-            for item in list(items):
-                if isinstance(item, dict) and item.get('@graph'):
-                    items.extend(item['@graph'])
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-                item_type = str(item.get('@type', ''))
-                if 'JobPosting' not in item_type:
-                    continue
-                title = item.get('title') or item.get('name', '')
-                company = ''
-                org = item.get('hiringOrganization', {})
-                if isinstance(org, dict):
-                    company = org.get('name', '')
-                location = ''
-                loc = item.get('jobLocation', {})
-                if isinstance(loc, dict):
-                    addr = loc.get('address', {})
-                    if isinstance(addr, dict):
-                        location = addr.get('addressLocality', '')
-                description = item.get('description', '')
-                if '<' in description:
-                    description = BeautifulSoup(description, 'html.parser').get_text(separator=' ', strip=True)
-                if title:
-                    jobs.append({"title": title.strip(), "company": company.strip() or "Unknown",
-                                 "location": location.strip() or "Not specified",
-                                 "description": (description[:500] if description else title)})
-        except (json.JSONDecodeError, AttributeError, TypeError):
-            continue
-    return jobs
-
 async def _extract_jobs_with_ai(page_text: str, url: str, settings) -> list:
     """Use AI to extract real job postings from page text."""
     if not settings or not page_text.strip():
@@ -372,7 +325,7 @@ async def _parse_generic_jobs(soup, url: str, settings=None):
     all_jobs = []
     
     # Strategy 1: JSON-LD structured data (free, highest quality)
-    all_jobs.extend(_parse_json_ld_jobs(soup))
+    all_jobs.extend(parse_json_ld_jobs(soup))
     
     # Strategy 2: AI extraction (if JSON-LD didn't find enough)
     if len(all_jobs) < 5 and settings:
@@ -390,9 +343,11 @@ async def _parse_generic_jobs(soup, url: str, settings=None):
 def _filter_jobs_by_keywords(jobs: list, keywords: str) -> list:
     """Filter jobs by keyword matching on title, company, or description."""
     if not keywords: return jobs
-    kw_list = [k.strip().lower() for k in keywords.split(",") if k.strip()]
-    if not kw_list: return jobs
-    return [j for j in jobs if any(kw in f"{j.get('title','')} {j.get('company','')} {j.get('description','')}".lower() for kw in kw_list)]
+    kw_set = frozenset(k.strip().lower() for k in keywords.split(",") if k.strip())
+    if not kw_set: return jobs
+    # One compiled scan per job instead of rebuilding the haystack for every keyword
+    scanner = scanner_for_terms(kw_set)
+    return [j for j in jobs if scanner.contains_any(f"{j.get('title','')} {j.get('company','')} {j.get('description','')}".lower())]
 
 def _parse_generic_contacts(soup, url: str):
     """Generic contact parser with deduplication."""
@@ -425,8 +380,83 @@ def _parse_generic_contacts(soup, url: str):
     
     return contacts
 
+async def _scrape_via_feed(db, user_id: int, target_url: str, feed, keywords: str = None) -> bool:
+    """Ingest target_url's jobs through a feed/ATS adapter. False if the feed failed and the page should be scraped."""
+    try:
+        result = await feed_adapters.ingest_feed(
+            db, feed, job_filter=(lambda jobs: _filter_jobs_by_keywords(jobs, keywords)) if keywords else None,
+        )
+    except Exception as e:
+        await db.rollback()
+        logger.warning(f"Feed {feed.feed_url} failed, scraping {target_url} instead: {e}")
+        return False
+    log_msg = f"Read {feed.source} feed for {target_url}: {result.fetched} new items, {len(result.job_ids)} added"
+    if keywords: log_msg += f" (filter: {keywords})"
+    db.add(ActionLog(user_id=user_id, action_type="scraper", status="success", message=log_msg))
+    await crawl_scheduler.record_crawl(db, target_url, new_jobs=len(result.job_ids))
+    await db.commit()
+    logger.info(log_msg)
+    await job_events.announce_jobs(db, result.job_ids, "scraper")
+    return True
+
+def _extraction_tier(target_url: str, target_type: str) -> str:
+    """How a page is turned into items; part of the single-flight key."""
+    if target_type != "jobs":
+        return "contacts"
+    parser = site_parser(target_url)
+    return f"site:{parser[0]}" if parser else "page"
+
+async def _render_job_items(target_url: str, soup, parser, user_settings) -> list:
+    """Jobs from the site parser, or the headless scraper plus up to 3 linked job pages."""
+    from app.services.spiders import scrape_jobs_headless
+
+    if parser:
+        dataList = parser[1](soup)
+    else:
+        dataList = await scrape_jobs_headless(target_url, user_settings)
+
+    # If few results, crawl linked job pages
+    if len(dataList) < 5:
+        sub_urls = _crawl_for_job_links(soup, target_url)
+        existing_t = {j['title'].lower().strip() for j in dataList}
+        for sub_url in sub_urls[:3]: # Cap at 3 for headless speed
+            try:
+                sub_data = await scrape_jobs_headless(sub_url, user_settings)
+                for j in sub_data:
+                    if j['title'].lower().strip() not in existing_t:
+                        j['source_url'] = sub_url
+                        dataList.append(j)
+                        existing_t.add(j['title'].lower().strip())
+            except Exception as e:
+                logger.error(f"Failed to scrape suburl {sub_url}: {e}")
+                continue
+
+    for item in dataList:
+        if 'source_url' not in item:
+            item['source_url'] = target_url
+    return dataList
+
+async def _extract_page_items(target_url: str, target_type: str, user_settings) -> dict:
+    """
+    Fetch and parse target_url, before any per-user filtering or dedup. Returns JSON-safe
+    {"items": [...], "board": [kind, token] | None}; a board means the jobs should be read
+    from that ATS instead.
+    """
+    response = _fetch_page(target_url)
+    soup = BeautifulSoup(response.content, 'lxml')
+    if target_type != "jobs":
+        return {"items": _parse_generic_contacts(soup, target_url), "board": None}
+
+    parser = site_parser(target_url)
+    # Careers pages that embed or link an ATS board are read from the board's JSON API
+    board = None if parser else ats_adapters.detect_ats(target_url, response.text)
+    if board is not None:
+        return {"items": [], "board": [board.kind, board.token]}
+    return {"items": await _render_job_items(target_url, soup, parser, user_settings), "board": None}
+
 async def run_scraping_agent_async(user_id: int, target_url: str, target_type: str, keywords: str = None):
     async with AsyncSessionLocal() as db:
+        added_jobs = []
         try:
             logger.info(f"User {user_id} crawling {target_url} for {target_type}")
             filter_msg = f" (filter: {keywords})" if keywords else ""
@@ -436,47 +466,34 @@ async def run_scraping_agent_async(user_id: int, target_url: str, target_type: s
             await db.commit()
             stmt_set = select(UserSetting).where(UserSetting.user_id == user_id)
             user_settings = (await db.execute(stmt_set)).scalars().first()
-            
-            response = _fetch_page(target_url)
-            soup = BeautifulSoup(response.content, 'lxml')
-            dataList = []
-            
+
+            # A structured feed or ATS board, when the URL has one, replaces fetching and parsing the page
+            feed = feed_adapters.feed_adapter_for(target_url) if target_type == "jobs" else None
+            if feed is not None and await _scrape_via_feed(db, user_id, target_url, feed, keywords):
+                return
+
+            await task_registry.checkpoint("crawling")
+            # Fetch and extraction are shared with concurrent or recent crawls of the same URL;
+            # keyword filtering and dedup below stay per user
+            page, shared = await scrape_flight.single_flight(
+                target_url, target_type, _extraction_tier(target_url, target_type),
+                lambda: _extract_page_items(target_url, target_type, user_settings),
+            )
+            if shared:
+                logger.info(f"Reusing the shared crawl of {target_url} for user {user_id}")
+            dataList = page["items"]
+
             if target_type == "jobs":
-                url_lower = target_url.lower()
-                from app.services.spiders import scrape_jobs_headless
-                
-                if 'remoteok.com' in url_lower:
-                    dataList = _parse_remoteok_jobs(soup)
-                elif 'news.ycombinator.com' in url_lower or 'ycombinator.com/jobs' in url_lower:
-                    dataList = _parse_hackernews_jobs(soup)
-                elif 'weworkremotely.com' in url_lower:
-                    dataList = _parse_weworkremotely_jobs(soup)
-                else:
-                    dataList = await scrape_jobs_headless(target_url, user_settings)
-                
-                # If few results, crawl linked job pages
-                if len(dataList) < 5:
-                    sub_urls = _crawl_for_job_links(soup, target_url)
-                    existing_t = {j['title'].lower().strip() for j in dataList}
-                    for sub_url in sub_urls[:3]: # Cap at 3 for headless speed
-                        try:
-                            sub_data = await scrape_jobs_headless(sub_url, user_settings)
-                            for j in sub_data:
-                                if j['title'].lower().strip() not in existing_t:
-                                    j['source_url'] = sub_url
-                                    dataList.append(j)
-                                    existing_t.add(j['title'].lower().strip())
-                        except Exception as e:
-                            logger.error(f"Failed to scrape suburl {sub_url}: {e}")
-                            continue
-                
+                if page["board"] is not None:
+                    board = ats_adapters.AtsBoard(*page["board"])
+                    if await _scrape_via_feed(db, user_id, target_url, board.adapter(), keywords):
+                        return
+                    soup = BeautifulSoup(_fetch_page(target_url).content, 'lxml')
+                    dataList = await _render_job_items(target_url, soup, None, user_settings)
+
                 if keywords:
                     dataList = _filter_jobs_by_keywords(dataList, keywords)
                 
-                for item in dataList:
-                    if 'source_url' not in item:
-                        item['source_url'] = target_url
-                
                 existing_titles = set()
                 existing_res = await db.execute(
                     select(JobPosting.title).where(JobPosting.source_url == target_url))
@@ -484,24 +501,25 @@ async def run_scraping_agent_async(user_id: int, target_url: str, target_type: s
                     existing_titles.add(row[0].lower().strip())
                 new_jobs = [j for j in dataList if j['title'].lower().strip() not in existing_titles]
                 
-                for item in new_jobs:
+                for done, item in enumerate(new_jobs):
+                    await task_registry.checkpoint("embedding", done=done, total=len(new_jobs))
                     title = item.get("title", "Unknown")
                     company = item.get("company", "Unknown")
                     description = item.get("description", "")
-                    combined_text = f"Title: {title}\nCompany: {company}\nDescription: {description}"
-                    from app.services.job_ingestion import model as sentence_model
-                    embedding = sentence_model.encode(combined_text).tolist()
-
-                    db.add(JobPosting(source="scraper", title=title,
-                                     company=company, location=item.get("location"),
-                                     description=description,
-                                     embedding=embedding,
-                                     source_url=item.get("source_url", target_url)))
+                    embedding = embeddings.embed_job(title, company, description)
+
+                    job_row = JobPosting(source="scraper", title=title,
+                                         company=company, location=item.get("location"),
+                                         description=description,
+                                         embedding=embedding,
+                                         embedding_model=embeddings.EMBEDDING_VERSION,
+                                         source_url=item.get("source_url", target_url))
+                    db.add(job_row)
+                    added_jobs.append(job_row)
                 
                 log_msg = f"Crawled {target_url}: {len(dataList)} jobs found, {len(new_jobs)} new"
                 if keywords: log_msg += f" (filter: {keywords})"
             else:
-                dataList = _parse_generic_contacts(soup, target_url)
                 existing_emails = set()
                 existing_res = await db.execute(select(ScrapedContact.email))
                 for row in existing_res:
@@ -515,19 +533,29 @@ async def run_scraping_agent_async(user_id: int, target_url: str, target_type: s
             
             log_success = ActionLog(user_id=user_id, action_type="scraper", status="success", message=log_msg)
             db.add(log_success)
+            if target_type == "jobs":
+                await crawl_scheduler.record_crawl(db, target_url, new_jobs=len(added_jobs))
             await db.commit()
             logger.info(log_msg)
 
+            await job_events.announce_jobs(db, [j.id for j in added_jobs], "scraper")
+
         except Exception as e:
             logger.exception(f"Scraping failed for {target_url}: {e}")
+            await db.rollback()
             log_error = ActionLog(user_id=user_id, action_type="scraper", status="failed",
                                  message=f"Scraping failed: {str(e)}")
             db.add(log_error)
+            if target_type == "jobs":
+                await crawl_scheduler.record_crawl(db, target_url, error=str(e))
             await db.commit()
 
 @celery_app.task(name="run_scraping_agent_task")
-def run_scraping_agent_task(user_id: int, target_url: str, target_type: str, keywords: str = None):
-    asyncio.run(run_scraping_agent_async(user_id, target_url, target_type, keywords))
+def run_scraping_agent_task(user_id: int, target_url: str, target_type: str, keywords: str = None,
+                            registry_task_id: str = None):
+    runtime.run(task_registry.run_tracked(
+        user_id, "scraper", run_scraping_agent_async(user_id, target_url, target_type, keywords), registry_task_id
+    ))
 
 async def run_auto_apply_async(user_id: int, app_id: int):
     async with AsyncSessionLocal() as db:
@@ -658,10 +686,10 @@ async def run_auto_apply_async(user_id: int, app_id: int):
                 await db.commit()
 
 @celery_app.task(name="run_auto_apply_task")
-def run_auto_apply_task(user_id: int, app_id: int):
-    asyncio.run(run_auto_apply_async(user_id, app_id))
+def run_auto_apply_task(user_id: int, app_id: int, registry_task_id: str = None):
+    runtime.run(task_registry.run_tracked(user_id, "auto_apply", run_auto_apply_async(user_id, app_id), registry_task_id))
 
-async def run_cold_mail_async(user_id: int, contact_id: int, template_id: int, resume_id: int, attach_resume: bool = True):
+async def run_cold_mail_async(user_id: int, contact_id: int, template_id: int, resume_id: int, attach_resume: bool = True, outreach_id: int = None):
     """
     Cold mail dispatch engine with strict validation and attachment guarantees.
     Zero LLM cost — templates are pre-crafted with AI, dispatch is pure tag swap.
@@ -669,14 +697,12 @@ async def run_cold_mail_async(user_id: int, contact_id: int, template_id: int, r
     Pipeline:
     1. Fetch all context (user, settings, contact, template, resume)
     2. Build tag value map from resume parsed_json + user profile
-    3. Replace all {{tags}} in template subject/body
-    4. STRICT VALIDATION: Block if critical fields empty or unreplaced tags remain
+    3. Render the compiled template (tags validated when the template was saved)
+    4. STRICT VALIDATION: Block if critical fields empty or the template fails to compile
     5. ATTACHMENT GUARANTEE: Hard-fail if attach_resume=True but file unavailable
     6. Send via Gmail API or SMTP
-    7. Log result and create Application tracker record
+    7. Log result, create Application tracker record and update the outreach ledger
     """
-    import re
-
     async with AsyncSessionLocal() as db:
         try:
             logger.info(f"User {user_id} starting cold-mail dispatch for contact {contact_id}")
@@ -708,54 +734,17 @@ async def run_cold_mail_async(user_id: int, contact_id: int, template_id: int, r
                     raise ValueError(f"Missing SMTP configuration: {', '.join(missing_smtp)}. Configure in Settings.")
 
             # ── 2. Build Tag Value Map ──
-            resume_data = resume.parsed_json or {}
-            
-            # Normalize experience_years: extract first integer, fallback to profile
-            raw_exp = resume_data.get("experience_years") or getattr(user, 'experience_years', "") or ""
-            exp_match = re.search(r'(\d+)', str(raw_exp))
-            exp_years = exp_match.group(1) if exp_match else ""
-
-            target_role = (resume_data.get("target_role") or getattr(settings, 'target_roles', "")).strip()
-
-            val_map = {
-                # Contact-specific
-                "contact_name": (contact.name or "").strip(),
-                "contact_role": (contact.role or "").strip(),
-                "job_title": target_role,
-                "company": (contact.company or "").strip(),
-                # Resume-derived
-                "experience_years": exp_years,
-                "skills": (resume_data.get("skills") or getattr(user, 'skills', "") or "").strip(),
-                "education": (resume_data.get("education") or getattr(user, 'education', "") or "").strip(),
-                "recent_role": (resume_data.get("recent_role") or "").strip(),
-                "top_projects": (resume_data.get("top_projects") or "").strip(),
-                "certifications": (resume_data.get("certifications") or "").strip(),
-                # User profile
-                "linkedin": (user.linkedin_url or "").strip(),
-                "github": (user.github_url or "").strip(),
-                "portfolio": (getattr(user, 'portfolio_url', "") or "").strip(),
-                "user_name": (user.full_name or "").strip(),
-                "user_email": (user.email or "").strip(),
-                "user_phone": (user.phone or "").strip(),
-            }
-
-            # ── 3. Replace Tags ──
-            subject = template.subject
-            body = template.body_text
-            
-            def replace_tag(match):
-                tag_name = match.group(1).strip()
-                return str(val_map.get(tag_name, match.group(0)))
+            val_map = build_value_map(contact, resume, user, settings)
 
-            subject = re.sub(r'{{(.*?)}}', replace_tag, subject)
-            body = re.sub(r'{{(.*?)}}', replace_tag, body)
+            # ── 3. Render Compiled Template ──
+            try:
+                compiled = get_compiled(template)
+            except TemplateSyntaxError as e:
+                raise ValueError(f"Aborting: invalid template tags: {e}")
+            subject, body = compiled.render(val_map)
 
             # ── 4. STRICT VALIDATION ──
-            # 4a. Block if any {{tags}} remain unreplaced
-            remaining_tags = re.findall(r'{{(.*?)}}', subject + "\n" + body)
-            if remaining_tags:
-                raise ValueError(f"Aborting: unreplaced template tags: {remaining_tags}")
-            
+            # 4a. Unknown or malformed {{tags}} are rejected by the compiler above
             # 4b. Block if critical fields resolved to empty (would produce broken/generic emails)
             critical_fields = {"contact_name": "Contact Name", "company": "Company", "user_name": "Your Name"}
             empty_critical = [label for key, label in critical_fields.items() if not val_map.get(key)]
@@ -768,23 +757,11 @@ async def run_cold_mail_async(user_id: int, contact_id: int, template_id: int, r
             attachment_data = None
             attachment_filename = None
             if attach_resume:
-                # Priority 1: Database binary storage
-                if getattr(resume, "file_data", None) and len(resume.file_data) > 0:
-                    attachment_data = resume.file_data
+                # Streamed back from the blob store by reference (legacy rows are migrated on first read)
+                attachment_data = await read_resume_bytes(db, resume)
+                if attachment_data:
                     attachment_filename = resume.filename
-                    logger.info(f"Resume {resume.id} loaded from DB ({len(attachment_data)} bytes)")
-                else:
-                    # Priority 2: Disk fallback
-                    UPLOAD_DIR = app_settings.UPLOAD_DIR
-                    file_path = UPLOAD_DIR / f"{resume.id}_{resume.filename}"
-                    if file_path.exists():
-                        with open(file_path, "rb") as f:
-                            attachment_data = f.read()
-                        if len(attachment_data) > 0:
-                            attachment_filename = resume.filename
-                            logger.info(f"Resume {resume.id} loaded from disk ({len(attachment_data)} bytes)")
-                        else:
-                            attachment_data = None
+                    logger.info(f"Resume {resume.id} loaded from blob store ({len(attachment_data)} bytes)")
                 
                 # HARD FAIL: User explicitly asked for attachment but it's not available
                 if not attachment_data:
@@ -846,6 +823,8 @@ async def run_cold_mail_async(user_id: int, contact_id: int, template_id: int, r
                     notes=f"Cold Mail sent to {contact.name} ({contact.email}). Subject: {subject[:100]}",
                     applied_at=func.now()
                 ))
+                await record_outreach_result(db, user_id=user_id, contact_id=contact_id, template_id=template_id,
+                                             resume_id=resume_id, outreach_id=outreach_id)
 
                 await db.commit()
                 logger.info(success_msg)
@@ -854,17 +833,28 @@ async def run_cold_mail_async(user_id: int, contact_id: int, template_id: int, r
                 logger.error(f"Email send failed: {send_err}")
                 log_err = ActionLog(user_id=user_id, action_type="cold_mail", status="failed", message=f"Send Failed: {str(send_err)}")
                 db.add(log_err)
+                await record_outreach_result(db, user_id=user_id, contact_id=contact_id, template_id=template_id,
+                                             resume_id=resume_id, outreach_id=outreach_id, error=str(send_err))
                 await db.commit()
 
         except Exception as e:
             logger.exception(f"Cold mail engine failed: {e}")
             log_sys_err = ActionLog(user_id=user_id, action_type="cold_mail", status="failed", message=f"System Error: {str(e)}")
             db.add(log_sys_err)
+            if outreach_id is not None:
+                # Only scheduled sends have a ledger row to update; the entities may not exist here
+                await record_outreach_result(db, user_id=user_id, contact_id=contact_id, template_id=template_id,
+                                             outreach_id=outreach_id, error=str(e))
             await db.commit()
 
 @celery_app.task(name="run_cold_mail_task")
-def run_cold_mail_task(user_id: int, contact_id: int, template_id: int, resume_id: int):
-    asyncio.run(run_cold_mail_async(user_id, contact_id, template_id, resume_id))
+def run_cold_mail_task(user_id: int, contact_id: int, template_id: int, resume_id: int, outreach_id: int = None,
+                       attach_resume: bool = True, registry_task_id: str = None):
+    runtime.run(task_registry.run_tracked(
+        user_id, "cold_mail",
+        run_cold_mail_async(user_id, contact_id, template_id, resume_id, attach_resume, outreach_id=outreach_id),
+        registry_task_id,
+    ))
 
 async def run_automated_discovery_async():
     """
@@ -880,10 +870,7 @@ async def run_automated_discovery_async():
             stmt = select(UserSetting)
             settings = (await db.execute(stmt)).scalars().first()
 
-            TARGET_URLS = [
-                "https://remoteok.com/remote-software-engineer-jobs",
-                "https://news.ycombinator.com/jobs"
-            ]
+            TARGET_URLS = crawl_scheduler.DISCOVERY_URLS
 
             headers = {'User-Agent': 'Mozilla/5.0'}
             total_added = 0
@@ -891,8 +878,22 @@ async def run_automated_discovery_async():
             import re
             
             for url in TARGET_URLS:
+                feed = feed_adapters.feed_adapter_for(url)
+                if feed is not None:
+                    try:
+                        result = await feed_adapters.ingest_feed(db, feed)
+                        await db.commit()
+                        total_added += len(result.job_ids)
+                        await job_events.announce_jobs(db, result.job_ids, "auto_discovery")
+                        logger.info(f"Automated discovery read {len(result.job_ids)} new jobs from the {feed.source} feed")
+                        continue
+                    except Exception as e:
+                        await db.rollback()
+                        logger.warning(f"Feed for {url} failed, falling back to page scraping: {e}")
                 try:
-                    response = requests.get(url, headers=headers, timeout=15)
+                    response = http_client.session().get(url, headers=headers, timeout=15)
+                    page_archive.archive_page(url, response.content, status=response.status_code, tier="static",
+                                              content_type=response.headers.get("Content-Type"))
                     soup = BeautifulSoup(response.content, 'lxml')
                     
                     dataList = []
@@ -912,13 +913,12 @@ async def run_automated_discovery_async():
                             })
                             
                     
+                    added_jobs = []
                     for item in dataList:
                         title = item.get("title", "Unknown")
                         company = item.get("company", "Unknown")
                         description = item.get("description", "")
-                        combined_text = f"Title: {title}\nCompany: {company}\nDescription: {description}"
-                        from app.services.job_ingestion import model as sentence_model
-                        embedding = sentence_model.encode(combined_text).tolist()
+                        embedding = embeddings.embed_job(title, company, description)
 
                         job = JobPosting(
                             source="auto_discovery",
@@ -927,12 +927,15 @@ async def run_automated_discovery_async():
                             location=item.get("location"),
                             description=description,
                             embedding=embedding,
+                            embedding_model=embeddings.EMBEDDING_VERSION,
                             source_url=item.get("source_url", url)
                         )
                         db.add(job)
+                        added_jobs.append(job)
                     
                     await db.commit()
                     total_added += len(dataList)
+                    await job_events.announce_jobs(db, [j.id for j in added_jobs], "auto_discovery")
                     logger.info(f"Automated discovery scraped {len(dataList)} jobs from {url}")
                 except Exception as loop_e:
                     logger.warning(f"Failed to scrape {url} during automated discovery: {loop_e}")
@@ -944,7 +947,7 @@ async def run_automated_discovery_async():
 
 @celery_app.task(name="run_automated_discovery_task")
 def run_automated_discovery_task():
-    asyncio.run(run_automated_discovery_async())
+    runtime.run(run_automated_discovery_async())
 
 async def run_daily_match_alerts_async():
     """
@@ -976,29 +979,18 @@ async def run_daily_match_alerts_async():
                     resumes = (await db.execute(select(Resume).where(Resume.user_id == user.id))).scalars().all()
                     if not resumes: continue
                     
-                    import numpy as np
-                    
-                    # Stage 1: Vector-Based Fast Retrieval (Top 20)
-                    user_embedding = None
-                    if resumes and resumes[0].embedding:
-                        user_embedding = np.array(resumes[0].embedding)
-                    
-                    shortlisted_jobs = new_jobs
-                    
-                    if user_embedding is not None and len(new_jobs) > 0:
-                        job_scores = []
-                        for j in new_jobs:
-                            if j.embedding:
-                                j_emb = np.array(j.embedding)
-                                # Cosine similarity
-                                similarity = np.dot(user_embedding, j_emb) / (np.linalg.norm(user_embedding) * np.linalg.norm(j_emb))
-                                job_scores.append((similarity, j))
-                            else:
-                                job_scores.append((0.0, j))
-                        
-                        job_scores.sort(key=lambda x: x[0], reverse=True)
-                        shortlisted_jobs = [item[1] for item in job_scores[:20]]
-                    else:
+                    # Stage 1: Vector-Based Fast Retrieval (Top 20) from the scores stored at ingest time
+                    best_score = func.max(JobResumeMatch.score)
+                    match_rows = await db.execute(
+                        select(JobResumeMatch.job_id, best_score)
+                        .where(JobResumeMatch.user_id == user.id, JobResumeMatch.job_id.in_([j.id for j in new_jobs]))
+                        .group_by(JobResumeMatch.job_id)
+                        .order_by(best_score.desc())
+                        .limit(20)
+                    )
+                    jobs_by_id = {j.id: j for j in new_jobs}
+                    shortlisted_jobs = [jobs_by_id[job_id] for job_id, _ in match_rows]
+                    if not shortlisted_jobs:
                         shortlisted_jobs = new_jobs[:20]
 
                     # Consolidate their resume text
@@ -1076,81 +1068,166 @@ async def run_daily_match_alerts_async():
         except Exception as e:
             logger.exception(f"Daily match alerts failed: {e}")
 
+# Resumes scored per matrix product against the embedding snapshot
+REBUILD_BATCH_RESUMES = 256
+
+async def rebuild_job_matches_async():
+    """
+    Recompute job_resume_matches for every completed resume (nightly, before the match
+    alerts, and after a re-embed). Exports a fresh embedding snapshot and scores batches of
+    resumes against it; if the export fails, falls back to one HNSW query per resume.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            snapshot = vector_snapshot.VectorSnapshot(await vector_snapshot.export_snapshot(db))
+        except Exception as e:
+            logger.warning(f"Vector snapshot export failed ({e}); rebuilding matches through the HNSW index")
+            snapshot = None
+        if snapshot is None:
+            resume_ids = (await db.execute(
+                select(Resume.id).where(Resume.status == "completed", Resume.embedding.is_not(None))
+            )).scalars().all()
+            for resume_id in resume_ids:
+                try:
+                    await match_store.rescore_resume(db, resume_id)
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    logger.warning(f"Match rebuild failed for resume {resume_id}: {e}")
+            logger.info(f"Rebuilt job matches for {len(resume_ids)} resumes (no vector snapshot)")
+            return
+
+        added = await snapshot.refresh_delta(db)
+        rows = (await db.execute(
+            select(Resume.id, Resume.user_id, Resume.embedding)
+            .where(
+                Resume.status == "completed",
+                Resume.embedding.is_not(None),
+                Resume.embedding_model == embeddings.EMBEDDING_VERSION,
+            )
+            .order_by(Resume.id)
+        )).all()
+        since = datetime.utcnow() - timedelta(days=match_store.RESCORE_WINDOW_DAYS)
+        started = time.monotonic()
+        for start in range(0, len(rows), REBUILD_BATCH_RESUMES):
+            batch = rows[start:start + REBUILD_BATCH_RESUMES]
+            job_ids, scores = vector_snapshot.score_resumes(
+                snapshot, [row.embedding for row in batch], match_store.MATCHES_PER_RESUME, created_after=since,
+            )
+            for i, row in enumerate(batch):
+                try:
+                    await match_store.replace_resume_matches(db, row.id, row.user_id, job_ids[i], scores[i])
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    logger.warning(f"Match rebuild failed for resume {row.id}: {e}")
+        logger.info(
+            f"Rebuilt job matches for {len(rows)} resumes against {len(snapshot)} jobs "
+            f"({added} since snapshot) in {time.monotonic() - started:.1f}s"
+        )
+
+@celery_app.task(name="rebuild_job_matches_task")
+def rebuild_job_matches_task():
+    runtime.run(rebuild_job_matches_async())
+
+@celery_app.task(name="prune_page_archive_task")
+def prune_page_archive_task():
+    return page_archive.prune()
+
 @celery_app.task(name="run_daily_match_alerts_task")
 def run_daily_match_alerts_task():
-    asyncio.run(run_daily_match_alerts_async())
+    runtime.run(run_daily_match_alerts_async())
 
-async def run_user_configured_scraping_async():
+async def dispatch_due_crawls_async():
     """
-    Periodic task to scrape user-configured URLs.
-    Checks UserSetting for 'scrape_urls' and kicks off individual scraping tasks.
+    Enqueue one scrape per crawl target that is due (services/crawl_scheduler.py).
+    Targets are first synced from every user's scrape_urls and the discovery boards, so a URL
+    shared by several users is scraped once, on its own adaptive schedule.
     """
     async with AsyncSessionLocal() as db:
         try:
-            logger.info("Starting periodic user-configured scraping check.")
-            
-            stmt = select(UserSetting).where(UserSetting.scrape_urls.is_not(None))
-            settings_list = (await db.execute(stmt)).scalars().all()
-            
-            total_tasks_queued = 0
-            for setting in settings_list:
-                if not setting.scrape_urls:
-                    continue
-                
-                # Check frequency based on setting.scrape_frequency_hours.
-                # For a full implementation, we'd need a last_scraped_at timestamp in UserSetting.
-                # For now, we queue jobs for all valid URLs.
-                urls = setting.scrape_urls if isinstance(setting.scrape_urls, list) else []
-                for url in urls:
-                    run_scraping_agent_task.delay(setting.user_id, url, "jobs")
-                    total_tasks_queued += 1
-                    
-            logger.info(f"Queued {total_tasks_queued} user scraping tasks.")
+            active = await crawl_scheduler.sync_targets(db)
+            due = await crawl_scheduler.claim_due(db)
+            await db.commit()
         except Exception as e:
-            logger.exception(f"Failed to queue user configured scraping tasks: {e}")
+            logger.exception(f"Failed to dispatch due crawls: {e}")
+            return
+    for target in due:
+        run_scraping_agent_task.delay(target.owner_user_id, target.url, target.target_type)
+    logger.info(f"Dispatched {len(due)} due crawls ({active} targets scheduled)")
+
+@celery_app.task(name="dispatch_due_crawls_task")
+def dispatch_due_crawls_task():
+    runtime.run(dispatch_due_crawls_async())
 
 @celery_app.task(name="run_user_configured_scraping_task")
 def run_user_configured_scraping_task():
-    asyncio.run(run_user_configured_scraping_async())
+    # Kept for messages already queued under the old name; scheduling is now per URL
+    runtime.run(dispatch_due_crawls_async())
 
 async def run_scheduled_cold_mail_async():
     """
     Periodic task to automatically send cold emails to new contacts for users who opted in.
+
+    1. Reserve each user's remaining daily quota with an atomic counter
+    2. Enqueue the next contacts that user has not mailed into the outreach ledger
+    3. Drain the ledger queue with FOR UPDATE SKIP LOCKED and dispatch one send task per row
     """
     async with AsyncSessionLocal() as db:
         try:
             logger.info("Starting scheduled cold mail cycle.")
+            await requeue_stale_claims(db)
             
             stmt = select(UserSetting).where(UserSetting.cold_mail_automation_enabled == True)
             active_settings = (await db.execute(stmt)).scalars().all()
             
+            total_queued = 0
             for setting in active_settings:
-                # Basic throttle tracking can be added here
-                limit = getattr(setting, 'daily_cold_mail_limit', 5)
-                
-                # Find unsent contacts
-                # In robust approach, we'd check action_logs or a "emailed_at" field.
-                # Assuming basic fallback if model lacks it
-                limit_stmt = select(ScrapedContact).limit(limit)
-                contacts = (await db.execute(limit_stmt)).scalars().all()
-                if not contacts:
-                    continue
+                limit = setting.daily_cold_mail_limit if setting.daily_cold_mail_limit is not None else 5
                 
                 # Pick best template & resume randomly or via fast logic (LLM selection inside the task takes too long for the loop, queue individual selections instead)
                 default_template = (await db.execute(select(EmailTemplate).limit(1))).scalars().first()
-                default_resume = (await db.execute(select(Resume).where(Resume.user_id == setting.user_id).limit(1))).scalars().first()
-                
-                if default_template and default_resume:
-                    for contact in contacts:
-                        run_cold_mail_task.delay(setting.user_id, contact.id, default_template.id, default_resume.id)
+                default_resume = (await db.execute(select(Resume.id).where(Resume.user_id == setting.user_id).limit(1))).scalars().first()
+                if not default_template or not default_resume:
+                    continue
+
+                # Validate once per cycle instead of letting every queued send fail on a broken template
+                try:
+                    get_compiled(default_template)
+                except TemplateSyntaxError as e:
+                    logger.warning(f"Skipping scheduled cold mail for user {setting.user_id}: template {default_template.id} is invalid ({e})")
+                    continue
+
+                try:
+                    granted = await reserve_daily_quota(db, setting.user_id, limit)
+                    if not granted:
+                        await db.commit()
+                        continue
+                    queued = await enqueue_next_contacts(db, setting.user_id, default_template.id, default_resume, granted)
+                    await release_daily_quota(db, setting.user_id, granted - queued)
+                    await db.commit()
+                    total_queued += queued
+                except Exception as user_e:
+                    await db.rollback()
+                    logger.warning(f"Failed to enqueue cold mail for user {setting.user_id}: {user_e}")
+
+            # Drain the queue. Other workers running this cycle concurrently skip rows we hold.
+            dispatched = 0
+            while True:
+                batch = await claim_queued(db, batch_size=100)
+                if not batch:
+                    break
+                for row in batch:
+                    run_cold_mail_task.delay(row.user_id, row.contact_id, row.template_id, row.resume_id, row.id)
+                dispatched += len(batch)
                         
-            logger.info("Finished scheduling cold mail cycle.")
+            logger.info(f"Finished scheduling cold mail cycle. Queued {total_queued}, dispatched {dispatched}.")
         except Exception as e:
             logger.exception(f"Scheduled cold mail failed: {e}")
 
 @celery_app.task(name="run_scheduled_cold_mail_task")
 def run_scheduled_cold_mail_task():
-    asyncio.run(run_scheduled_cold_mail_async())
+    runtime.run(run_scheduled_cold_mail_async())
 
 async def run_periodic_inbox_sync_async():
     """
@@ -1171,6 +1248,10 @@ async def run_periodic_inbox_sync_async():
         except Exception as e:
             logger.exception(f"Global periodic inbox sync failed: {e}")
 
+@celery_app.task(name="run_inbox_sync_task")
+def run_inbox_sync_task(user_id: int, registry_task_id: str = None):
+    runtime.run(task_registry.run_tracked(user_id, "inbox_sync", run_inbox_scanner_async(user_id), registry_task_id))
+
 @celery_app.task(name="run_periodic_inbox_sync_task")
 def run_periodic_inbox_sync_task():
-    asyncio.run(run_periodic_inbox_sync_async())
+    runtime.run(run_periodic_inbox_sync_async())
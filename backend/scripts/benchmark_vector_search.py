@@ -0,0 +1,139 @@
+"""
+Benchmark nearest-job search: float32 HNSW vs halfvec HNSW (with and without exact rerank).
+
+Ground truth is an exact float32 scan. For a sample of query vectors (resume embeddings,
+or job embeddings when there are too few resumes) it reports recall@k and p50/p95
+latency for each layout, plus the on-disk size of each index and of each column.
+
+The float32 HNSW index no longer exists in the schema, so it is built inside the
+benchmark transaction and discarded on rollback. Building it takes a write lock on
+job_postings for the duration; run this against a replica or during a quiet window.
+
+    cd backend && python scripts/benchmark_vector_search.py --queries 200 --k 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Make `app` importable when run as a script from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db.session import AsyncSessionLocal  # noqa: E402
+from app.services.vector_search import EMBEDDING_DIM, RERANK_FACTOR, MAX_ANN_CANDIDATES  # noqa: E402
+
+_FLOAT32_INDEX = "bench_job_postings_embedding_f32_hnsw"
+
+_QUERIES = {
+    "exact": """
+        SELECT id FROM job_postings WHERE embedding IS NOT NULL
+        ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k
+    """,
+    "float32_hnsw": """
+        SELECT id FROM job_postings WHERE embedding IS NOT NULL
+        ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k
+    """,
+    "halfvec_hnsw": f"""
+        SELECT id FROM job_postings WHERE embedding_half IS NOT NULL
+        ORDER BY embedding_half <=> CAST(:q AS halfvec({EMBEDDING_DIM})) LIMIT :k
+    """,
+    "halfvec_hnsw_rerank": f"""
+        SELECT id FROM (
+            SELECT id, embedding FROM job_postings WHERE embedding_half IS NOT NULL
+            ORDER BY embedding_half <=> CAST(:q AS halfvec({EMBEDDING_DIM})) LIMIT :candidates
+        ) ann
+        ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k
+    """,
+}
+
+
+async def _set(db, name: str, value: str) -> None:
+    await db.execute(text("SELECT set_config(:name, :value, true)"), {"name": name, "value": value})
+
+
+async def _sample_queries(db, n: int) -> List[str]:
+    rows = (await db.execute(
+        text("SELECT embedding::text FROM resumes WHERE embedding IS NOT NULL ORDER BY random() LIMIT :n"),
+        {"n": n},
+    )).scalars().all()
+    if len(rows) < n:
+        rows += (await db.execute(
+            text("SELECT embedding::text FROM job_postings WHERE embedding IS NOT NULL ORDER BY random() LIMIT :n"),
+            {"n": n - len(rows)},
+        )).scalars().all()
+    return list(rows)
+
+
+async def _run_layout(db, layout: str, queries: List[str], k: int) -> Dict[str, list]:
+    # The exact baseline must not use either index; the ANN layouts must
+    await _set(db, "enable_indexscan", "off" if layout == "exact" else "on")
+    results, latencies = [], []
+    params = {"k": k, "candidates": min(k * RERANK_FACTOR, MAX_ANN_CANDIDATES)}
+    for q in queries:
+        started = time.perf_counter()
+        ids = (await db.execute(text(_QUERIES[layout]), {**params, "q": q})).scalars().all()
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(set(ids))
+    return {"results": results, "latencies": latencies}
+
+
+async def _relation_size(db, name: str) -> str:
+    return (await db.execute(
+        text("SELECT pg_size_pretty(pg_relation_size(to_regclass(:name)))"), {"name": name}
+    )).scalar() or "n/a"
+
+
+async def main(n_queries: int, k: int) -> None:
+    async with AsyncSessionLocal() as db:
+        try:
+            total = (await db.execute(text("SELECT count(*) FROM job_postings WHERE embedding IS NOT NULL"))).scalar()
+            print(f"job_postings with embeddings: {total}")
+            queries = await _sample_queries(db, n_queries)
+            if not queries:
+                print("No embeddings to benchmark.")
+                return
+
+            print("Building temporary float32 HNSW index (rolled back at the end)...")
+            await db.execute(text(
+                f"CREATE INDEX {_FLOAT32_INDEX} ON job_postings USING hnsw (embedding vector_cosine_ops)"
+            ))
+            await _set(db, "hnsw.ef_search", str(min(max(k * RERANK_FACTOR, 40), MAX_ANN_CANDIDATES)))
+
+            runs = {layout: await _run_layout(db, layout, queries, k) for layout in _QUERIES}
+            truth = runs["exact"]["results"]
+
+            print(f"\n{len(queries)} queries, k={k}, rerank factor={RERANK_FACTOR}")
+            print(f"{'layout':<22}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}")
+            for layout, run in runs.items():
+                recall = statistics.mean(
+                    len(found & expected) / max(len(expected), 1)
+                    for found, expected in zip(run["results"], truth)
+                )
+                lat = sorted(run["latencies"])
+                p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+                print(f"{layout:<22}{recall:>10.3f}{statistics.median(lat):>10.2f}{p95:>10.2f}")
+
+            sizes = (await db.execute(text(
+                "SELECT pg_size_pretty(sum(pg_column_size(embedding))), "
+                "pg_size_pretty(sum(pg_column_size(embedding_half))) FROM job_postings"
+            ))).first()
+            print("\nstorage")
+            print(f"  float32 column          {sizes[0]}")
+            print(f"  halfvec column          {sizes[1]}")
+            print(f"  float32 HNSW index      {await _relation_size(db, _FLOAT32_INDEX)}")
+            print(f"  halfvec HNSW index      {await _relation_size(db, 'ix_job_postings_embedding_half_hnsw')}")
+        finally:
+            await db.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=100, help="number of sampled query vectors")
+    parser.add_argument("--k", type=int, default=20, help="neighbours per query")
+    args = parser.parse_args()
+    asyncio.run(main(args.queries, args.k))
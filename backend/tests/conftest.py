@@ -0,0 +1,30 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+# Database-backed tests run against TEST_DATABASE_URL (a throwaway Postgres with pgvector)
+# and are skipped without it. Settings are read on first import, so point the app at it here.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+requires_database = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def fixture_path():
+    """Path of a recorded fixture file, e.g. fixture_path("feeds/remoteok.json")."""
+    return lambda name: FIXTURES_DIR / name
+
+
+@pytest.fixture
+def load_json(fixture_path):
+    """Parsed contents of a recorded JSON fixture."""
+    def load(name):
+        with open(fixture_path(name), encoding="utf-8") as f:
+            return json.load(f)
+    return load
@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services.ats_adapters import (
+    AshbyAdapter,
+    AtsBoard,
+    GreenhouseAdapter,
+    LeverAdapter,
+    WorkableAdapter,
+    detect_ats,
+)
+
+
+# ── detect_ats ──
+
+def test_detect_ats_from_board_urls():
+    assert detect_ats("https://boards.greenhouse.io/acme") == AtsBoard("greenhouse", "acme")
+    assert detect_ats("https://job-boards.greenhouse.io/acme/jobs/4012345") == AtsBoard("greenhouse", "acme")
+    assert detect_ats("https://boards.greenhouse.io/embed/job_board?for=acme") == AtsBoard("greenhouse", "acme")
+    assert detect_ats("https://jobs.lever.co/Globex-Corp/5a1b2c3d") == AtsBoard("lever", "globex-corp")
+    assert detect_ats("https://jobs.ashbyhq.com/initech") == AtsBoard("ashby", "initech")
+    assert detect_ats("https://apply.workable.com/umbrella-health/") == AtsBoard("workable", "umbrella-health")
+    assert detect_ats("https://umbrella-health.workable.com") == AtsBoard("workable", "umbrella-health")
+
+
+def test_detect_ats_from_careers_page(fixture_path):
+    page_html = fixture_path("ats/careers_page.html").read_text(encoding="utf-8")
+    assert detect_ats("https://acme.test/careers") is None
+    assert detect_ats("https://acme.test/careers", page_html) == AtsBoard("greenhouse", "acme")
+
+
+def test_detect_ats_ignores_boards_a_page_only_mentions(fixture_path):
+    # A news post linking postings on several companies' boards is not any one of those boards
+    page_html = fixture_path("ats/news_page.html").read_text(encoding="utf-8")
+    assert detect_ats("https://news.example.test/whos-hiring", page_html) is None
+
+
+def test_detect_ats_from_linked_boards():
+    postings = [f'<a href="https://jobs.lever.co/globex-corp/{i}">Role {i}</a>' for i in range(3)]
+    other = '<a href="https://jobs.ashbyhq.com/initech/1">Designer</a>'
+    # A single link to the board whose token matches the page's host
+    assert detect_ats("https://www.globexcorp.test/careers", postings[0]) == AtsBoard("lever", "globex-corp")
+    # Most of the page's board links point at one board
+    assert detect_ats("https://careers.example.test/", "".join(postings) + other) == AtsBoard("lever", "globex-corp")
+    # Too few postings to call it that board's listing
+    assert detect_ats("https://careers.example.test/", "".join(postings[:2]) + other) is None
+
+
+def test_detect_ats_ignores_non_board_paths():
+    # Asset hosts and path segments such as /embed/ are not board tokens
+    assert detect_ats("https://acme.test/careers", '<link href="https://www.workable.com/assets/badge.css">') is None
+    assert detect_ats("https://acme.test/careers", '<script src="https://boards.greenhouse.io/embed/job_board/js"></script>') is None
+    assert detect_ats("https://example.com/jobs") is None
+
+
+def test_board_adapter_for_each_kind():
+    assert isinstance(AtsBoard("greenhouse", "acme").adapter(), GreenhouseAdapter)
+    assert isinstance(AtsBoard("lever", "globex-corp").adapter(), LeverAdapter)
+    assert isinstance(AtsBoard("ashby", "initech").adapter(), AshbyAdapter)
+    workable = AtsBoard("workable", "umbrella-health").adapter()
+    assert isinstance(workable, WorkableAdapter)
+    assert workable.token == "umbrella-health"
+
+
+# ── jobs_from_payload ──
+
+def test_greenhouse_jobs_from_payload(load_json):
+    adapter = GreenhouseAdapter("acme")
+    jobs = list(adapter.jobs_from_payload(load_json("ats/greenhouse_jobs.json"), "Acme Inc"))
+
+    # The untitled posting is skipped
+    assert [j["external_id"] for j in jobs] == ["acme:4012345", "acme:4012346"]
+    platform, recruiter = jobs
+    assert platform["title"] == "Platform Engineer"
+    assert platform["company"] == "Acme Inc"
+    assert platform["location"] == "Berlin, Germany"
+    # Entity-escaped HTML is unescaped before being reduced to text
+    assert platform["description"] == "Run our Kubernetes platform."
+    assert platform["source_url"] == "https://boards.greenhouse.io/acme/jobs/4012345"
+    assert platform["posted_at"] == datetime(2023, 11, 10, 9, 0, tzinfo=timezone(timedelta(hours=-5)))
+    assert platform["metadata"] == {"departments": ["Engineering"]}
+
+    assert recruiter["location"] == "Not specified"
+    assert recruiter["description"] == "Recruiter"
+    assert recruiter["source_url"] == "https://boards.greenhouse.io/acme/jobs/4012346"
+    assert recruiter["posted_at"] == datetime(2023, 11, 13, 10, 0, tzinfo=timezone(timedelta(hours=-5)))
+
+
+def test_lever_jobs_from_payload(load_json):
+    adapter = LeverAdapter("globex-corp")
+    jobs = list(adapter.jobs_from_payload(load_json("ats/lever_postings.json")))
+
+    assert len(jobs) == 2
+    data, office = jobs
+    assert data["external_id"] == "globex-corp:5a1b2c3d-0000-4e5f-8a9b-123456789abc"
+    assert data["title"] == "Data Engineer"
+    assert data["company"] == "Globex Corp"
+    assert data["location"] == "Toronto, Canada"
+    assert data["description"] == "Design our data pipelines. Requirements: Python Airflow We offer remote-friendly hours."
+    assert data["source_url"] == "https://jobs.lever.co/globex-corp/5a1b2c3d-0000-4e5f-8a9b-123456789abc"
+    assert data["posted_at"] == datetime(2023, 11, 14, 8, 20, tzinfo=timezone.utc)
+    assert data["metadata"] == {"team": "Data", "department": "Engineering", "commitment": "Full-time"}
+
+    # No location category: the workplace type stands in
+    assert office["location"] == "onsite"
+    assert office["description"] == "Office Manager"
+    assert office["posted_at"] is None
+    assert office["source_url"] == "https://jobs.lever.co/globex-corp/5a1b2c3d-0000-4e5f-8a9b-123456789abd"
+
+
+def test_ashby_jobs_from_payload(load_json):
+    adapter = AshbyAdapter("initech")
+    jobs = list(adapter.jobs_from_payload(load_json("ats/ashby_board.json")))
+
+    # Unlisted postings are skipped
+    assert len(jobs) == 2
+    designer, support = jobs
+    assert designer["external_id"] == "initech:b7a0c1d2-1111-4222-8333-944455566677"
+    assert designer["company"] == "Initech"
+    assert designer["location"] == "New York, NY"
+    assert designer["description"] == "Design the onboarding experience."
+    assert designer["posted_at"] == datetime(2023, 11, 12, 15, 30, tzinfo=timezone.utc)
+    assert designer["metadata"] == {"department": "Design", "team": "Growth", "employmentType": "FullTime"}
+
+    assert support["location"] == "Remote"
+    assert support["description"] == "Answer technical tickets."
+    assert support["source_url"] == "https://jobs.ashbyhq.com/initech/b7a0c1d2-1111-4222-8333-944455566678"
+
+
+def test_workable_jobs_from_payload(load_json):
+    adapter = WorkableAdapter("umbrella-health")
+    jobs = list(adapter.jobs_from_payload(load_json("ats/workable_widget.json")))
+
+    # Postings without a shortcode or code are skipped
+    assert len(jobs) == 2
+    backend, nurse = jobs
+    assert backend["external_id"] == "umbrella-health:A1B2C3D4E5"
+    assert backend["company"] == "Umbrella Health"
+    assert backend["location"] == "Remote (Berlin, Germany)"
+    assert backend["description"] == "Build our patient portal."
+    assert backend["source_url"] == "https://apply.workable.com/j/A1B2C3D4E5"
+    assert backend["posted_at"] == datetime(2023, 11, 9)
+    assert backend["metadata"] == {"department": "Engineering", "employment_type": "Full-time"}
+
+    assert nurse["location"] == "Not specified"
+    assert nurse["description"] == "Field Nurse"
+    assert nurse["source_url"] == "https://apply.workable.com/umbrella-health/j/F6G7H8I9J0/"
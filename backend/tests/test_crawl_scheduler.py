@@ -0,0 +1,160 @@
+import asyncio
+import random
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import select, text, update
+
+from conftest import requires_database
+from app.services.crawl_scheduler import (
+    CHANGE_SLOWDOWN,
+    DEFAULT_FREQUENCY_HOURS,
+    JITTER,
+    _jittered,
+    backoff_interval,
+    next_interval,
+    normalize_url,
+)
+
+HOUR = 3600
+
+
+# ── next_interval ──
+
+def test_next_interval_speeds_up_on_change_and_slows_down_otherwise():
+    assert next_interval(4 * HOUR, True, HOUR, 24 * HOUR) == 2 * HOUR
+    assert next_interval(4 * HOUR, False, HOUR, 24 * HOUR) == 4 * HOUR * CHANGE_SLOWDOWN
+
+
+def test_next_interval_is_clamped_to_min_and_max():
+    assert next_interval(1.5 * HOUR, True, HOUR, 24 * HOUR) == HOUR
+    assert next_interval(20 * HOUR, False, HOUR, 24 * HOUR) == 24 * HOUR
+    # An interval already outside the bounds is moved back into them
+    assert next_interval(30 * HOUR, True, HOUR, 6 * HOUR) == 6 * HOUR
+    assert next_interval(60, False, HOUR, 6 * HOUR) == HOUR
+
+
+# ── backoff_interval ──
+
+def test_backoff_interval_doubles_from_min():
+    assert [backoff_interval(streak, 60, 24 * HOUR) for streak in range(4)] == [60, 120, 240, 480]
+
+
+def test_backoff_interval_is_capped_at_max():
+    assert backoff_interval(7, 60, HOUR) == HOUR
+    # Long failure streaks neither overflow nor exceed the cap
+    assert backoff_interval(10 ** 6, 60, HOUR) == HOUR
+
+
+# ── jitter and URL keys ──
+
+def test_jittered_stays_within_jitter_and_max():
+    rng_state = random.getstate()
+    try:
+        random.seed(7)
+        for _ in range(200):
+            delay = _jittered(HOUR, 24 * HOUR)
+            assert timedelta(seconds=HOUR * (1 - JITTER)) <= delay <= timedelta(seconds=HOUR * (1 + JITTER))
+            assert _jittered(24 * HOUR, 24 * HOUR) <= timedelta(seconds=24 * HOUR)
+    finally:
+        random.setstate(rng_state)
+
+
+def test_normalize_url_drops_fragment_and_whitespace():
+    assert normalize_url("  https://acme.test/careers#open-roles ") == "https://acme.test/careers"
+    assert normalize_url(None) == ""
+
+
+# ── sync_targets ──
+
+async def _create_schema(engine):
+    import app.db.base  # noqa: F401 (registers every model on Base.metadata)
+    from app.db.base_class import Base
+
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def _add_user(db, scrape_urls, frequency_hours):
+    from app.db.models.setting import UserSetting
+    from app.db.models.user import User
+
+    user = User(email=f"crawl-{uuid.uuid4().hex}@example.test", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    db.add(UserSetting(user_id=user.id, scrape_urls=scrape_urls, scrape_frequency_hours=frequency_hours))
+    await db.flush()
+    return user.id
+
+
+@requires_database
+def test_sync_targets_merges_subscribers_and_clamps_intervals():
+    from app.core.config import settings
+    from app.db.models.crawl import CrawlTarget
+    from app.db.models.setting import UserSetting
+    from app.db.models.user import User
+    from app.db.session import AsyncSessionLocal, engine
+    from app.services.crawl_scheduler import sync_targets
+
+    prefix = f"https://crawl-{uuid.uuid4().hex}.test"
+    shared, solo = f"{prefix}/careers", f"{prefix}/jobs"
+    min_seconds = settings.CRAWL_MIN_INTERVAL_MINUTES * 60
+
+    async def targets(db):
+        rows = (await db.execute(select(CrawlTarget).where(CrawlTarget.url.in_([shared, solo])))).scalars().all()
+        return {row.url: row for row in rows}
+
+    async def scenario():
+        await _create_schema(engine)
+        user_ids = []
+        try:
+            async with AsyncSessionLocal() as db:
+                # The shared URL is listed twice (once with a fragment); no frequency means the default
+                first = await _add_user(db, [shared + "#roles", solo], 6)
+                second = await _add_user(db, [shared], None)
+                user_ids = [first, second]
+                await sync_targets(db)
+                await db.commit()
+
+                found = await targets(db)
+                assert found[shared].subscribers == 2
+                assert found[shared].owner_user_id == first
+                # The shortest frequency among subscribers wins
+                assert found[shared].max_interval_seconds == 6 * HOUR
+                assert found[shared].min_interval_seconds == min_seconds
+                assert found[shared].interval_seconds == max(min_seconds, 6 * HOUR // 4)
+                assert found[solo].subscribers == 1
+
+                # Learned intervals outside the bounds are clamped back on the next sync
+                await db.execute(update(CrawlTarget).where(CrawlTarget.url == shared).values(interval_seconds=10 ** 7))
+                await db.execute(update(CrawlTarget).where(CrawlTarget.url == solo).values(interval_seconds=1))
+                await db.commit()
+                await sync_targets(db)
+                await db.commit()
+                db.expire_all()
+                found = await targets(db)
+                assert found[shared].interval_seconds == 6 * HOUR
+                assert found[solo].interval_seconds == min_seconds
+
+                # The first user unsubscribes: the shared URL follows the remaining subscriber's
+                # default frequency, and the URL nobody lists any more is deactivated
+                await db.execute(update(UserSetting).where(UserSetting.user_id == first).values(scrape_urls=[]))
+                await db.commit()
+                await sync_targets(db)
+                await db.commit()
+                db.expire_all()
+                found = await targets(db)
+                assert found[shared].active and not found[solo].active
+                assert found[shared].subscribers == 1
+                assert found[shared].owner_user_id == second
+                assert found[shared].max_interval_seconds == DEFAULT_FREQUENCY_HOURS * HOUR
+        finally:
+            async with AsyncSessionLocal() as db:
+                await db.execute(CrawlTarget.__table__.delete().where(CrawlTarget.url.in_([shared, solo])))
+                await db.execute(User.__table__.delete().where(User.id.in_(user_ids)))
+                await db.commit()
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,260 @@
+from datetime import datetime, timezone
+
+from app.services.ats_adapters import GreenhouseAdapter, LeverAdapter
+from app.services.feed_adapters import (
+    STOP_AFTER_KNOWN,
+    HackerNewsJobsAdapter,
+    RemoteOKAdapter,
+    RssFeedAdapter,
+    WeWorkRemotelyAdapter,
+    feed_adapter_for,
+    parse_rss,
+)
+
+
+def _rss_jobs(adapter, fixture_path, name):
+    with open(fixture_path(name), "rb") as stream:
+        return list(adapter.jobs_from_stream(stream))
+
+
+# ── parse_rss ──
+
+def test_parse_rss_reads_rss_items(fixture_path):
+    with open(fixture_path("feeds/example_jobs.rss"), "rb") as stream:
+        entries = list(parse_rss(stream))
+
+    assert len(entries) == 3
+    first = entries[0]
+    assert first["title"] == "Backend Engineer (Python)"
+    assert first["guid"] == "example-1042"
+    assert first["link"] == "https://jobs.example.com/postings/1042"
+    # Namespaced children are keyed by local name, lowercased
+    assert first["creator"] == "Example Labs"
+    assert first["pubdate"] == "Tue, 14 Nov 2023 09:30:00 +0000"
+    assert "<strong>backend engineer</strong>" in first["encoded"]
+    assert "title" not in entries[2]
+
+
+def test_parse_rss_reads_atom_entries(fixture_path):
+    with open(fixture_path("feeds/acme_careers.atom"), "rb") as stream:
+        entries = list(parse_rss(stream))
+
+    assert [e["id"] for e in entries] == ["urn:acme:job:77", "urn:acme:job:76"]
+    # rel="self" links are skipped; a link without rel is the alternate one
+    assert entries[0]["link"] == "https://careers.acme.test/jobs/77"
+    assert entries[1]["link"] == "https://careers.acme.test/jobs/76"
+    assert entries[0]["published"] == "2023-11-13T08:15:00Z"
+
+
+# ── RssFeedAdapter.job_from_entry ──
+
+def test_rss_job_from_entry(fixture_path):
+    adapter = RssFeedAdapter("https://jobs.example.com/feed")
+    jobs = _rss_jobs(adapter, fixture_path, "feeds/example_jobs.rss")
+
+    # The untitled item is dropped
+    assert len(jobs) == 2
+    first, second = jobs
+    assert first["external_id"] == "example-1042"
+    assert first["title"] == "Backend Engineer (Python)"
+    assert first["company"] == "Example Labs"
+    assert first["location"] == "Not specified"
+    assert first["source_url"] == "https://jobs.example.com/postings/1042"
+    assert first["posted_at"] == datetime(2023, 11, 14, 9, 30, tzinfo=timezone.utc)
+    # content:encoded wins over the teaser, and is reduced to text
+    assert "backend engineer" in first["description"]
+    assert "Python" in first["description"]
+    assert "<" not in first["description"]
+    assert "teaser" not in first["description"]
+
+    # No guid: the link is the stable id
+    assert second["external_id"] == "https://jobs.example.com/postings/1041"
+    assert second["company"] == "Unknown"
+    assert second["description"] == "SQL and dashboards."
+    assert second["posted_at"] == datetime(2023, 11, 13, 17, 0, tzinfo=timezone.utc)
+
+
+def test_atom_job_from_entry(fixture_path):
+    adapter = RssFeedAdapter("https://careers.acme.test/jobs.atom")
+    sre, frontend = _rss_jobs(adapter, fixture_path, "feeds/acme_careers.atom")
+
+    assert sre["external_id"] == "urn:acme:job:77"
+    assert sre["source_url"] == "https://careers.acme.test/jobs/77"
+    assert sre["description"] == "Keep production healthy."
+    # published is preferred over updated
+    assert sre["posted_at"] == datetime(2023, 11, 13, 8, 15, tzinfo=timezone.utc)
+
+    assert frontend["description"] == "React and TypeScript."
+    assert frontend["posted_at"] == datetime(2023, 11, 12, 10, 0, tzinfo=timezone.utc)
+
+
+def test_job_from_entry_without_id_or_title():
+    adapter = RssFeedAdapter("https://jobs.example.com/feed")
+    assert adapter.job_from_entry({"title": "No id or link"}) is None
+    assert adapter.job_from_entry({"guid": "x-1"}) is None
+
+
+# ── WeWorkRemotely ──
+
+def test_weworkremotely_splits_company_and_role(fixture_path):
+    adapter = WeWorkRemotelyAdapter(WeWorkRemotelyAdapter.DEFAULT_FEED)
+    globex, initech, support = _rss_jobs(adapter, fixture_path, "feeds/weworkremotely.rss")
+
+    assert (globex["company"], globex["title"]) == ("Globex", "Senior Python Developer")
+    assert globex["location"] == "Anywhere in the World"
+    assert globex["metadata"] == {"type": "Full-Time", "category": "Back-End Programming"}
+    assert globex["external_id"] == "https://weworkremotely.com/remote-jobs/globex-senior-python-developer"
+
+    # Only the first ": " separates the company; an empty region means remote
+    assert (initech["company"], initech["title"]) == ("Initech", "QA Lead: Mobile")
+    assert initech["location"] == "Remote"
+
+    # A title without a company prefix is kept whole
+    assert (support["company"], support["title"]) == ("Unknown", "Remote Support Specialist")
+    assert support["location"] == "USA Only"
+
+
+# ── RemoteOK ──
+
+def test_remoteok_skips_legal_notice(load_json):
+    adapter = RemoteOKAdapter()
+    jobs = list(adapter.jobs_from_payload(load_json("feeds/remoteok.json")))
+
+    assert [j["external_id"] for j in jobs] == ["1129990", "1129985"]
+    hooli, devops = jobs
+    assert hooli["title"] == "Staff Backend Engineer"
+    assert hooli["company"] == "Hooli"
+    assert hooli["location"] == "Worldwide"
+    assert hooli["description"] == "Build the payments platform."
+    assert hooli["source_url"] == "https://remoteok.com/remote-jobs/remote-staff-backend-engineer-hooli-1129990"
+    assert hooli["posted_at"] == datetime(2023, 11, 14, 8, 20, tzinfo=timezone.utc)
+    assert hooli["metadata"] == {"tags": ["python", "golang", "backend"], "salary_min": 150000, "salary_max": 190000}
+
+    # Blank fields fall back to defaults
+    assert devops["company"] == "Unknown"
+    assert devops["location"] == "Remote"
+    assert devops["description"] == "DevOps Engineer"
+    assert devops["source_url"] == "https://remoteok.com/remote-jobs/1129985"
+
+
+# ── Hacker News ──
+
+def test_hackernews_job_from_item(load_json):
+    adapter = HackerNewsJobsAdapter()
+    job = adapter.job_from_item(load_json("feeds/hn_item.json"))
+
+    assert job["external_id"] == "38270000"
+    assert job["title"] == "Acme (YC W21) is hiring a founding engineer"
+    assert job["company"] == "Acme"
+    assert job["source_url"] == "https://acme.test/careers/founding-engineer"
+    assert job["description"] == job["title"]
+    assert job["posted_at"] == datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)
+
+
+def test_hackernews_job_from_item_variants(load_json):
+    adapter = HackerNewsJobsAdapter()
+    item = load_json("feeds/hn_item.json")
+
+    text_post = {**item, "title": "Initech is hiring backend engineers", "text": "<p>Apply by email.</p>"}
+    del text_post["url"]
+    job = adapter.job_from_item(text_post)
+    assert job["company"] == "Initech"
+    assert job["description"] == "Apply by email."
+    assert job["source_url"] == "https://news.ycombinator.com/item?id=38270000"
+
+    assert adapter.job_from_item({**item, "title": "Globex – Senior Engineer"})["company"] == "Globex"
+    assert adapter.job_from_item({**item, "title": "Senior engineer wanted"})["company"] == "YC Company"
+
+    assert adapter.job_from_item({**item, "dead": True}) is None
+    assert adapter.job_from_item({**item, "deleted": True}) is None
+    assert adapter.job_from_item({}) is None
+
+
+# ── feed_adapter_for ──
+
+def test_feed_adapter_for_known_boards():
+    adapter = feed_adapter_for("https://remoteok.com/remote-software-engineer-jobs")
+    assert isinstance(adapter, RemoteOKAdapter)
+    assert adapter.feed_url == RemoteOKAdapter.API_URL
+    assert isinstance(feed_adapter_for("https://www.remoteok.com/"), RemoteOKAdapter)
+
+    assert isinstance(feed_adapter_for("https://news.ycombinator.com/jobs"), HackerNewsJobsAdapter)
+    assert feed_adapter_for("https://news.ycombinator.com/news") is None
+
+
+def test_feed_adapter_for_weworkremotely():
+    category = feed_adapter_for("https://weworkremotely.com/categories/remote-back-end-programming-jobs")
+    assert isinstance(category, WeWorkRemotelyAdapter)
+    assert category.feed_url == "https://weworkremotely.com/categories/remote-back-end-programming-jobs.rss"
+
+    rss_url = "https://weworkremotely.com/categories/remote-devops-sysadmin-jobs.rss"
+    assert feed_adapter_for(rss_url).feed_url == rss_url
+
+    assert feed_adapter_for("https://weworkremotely.com/").feed_url == WeWorkRemotelyAdapter.DEFAULT_FEED
+
+
+def test_feed_adapter_for_generic_feeds_and_ats():
+    for url in ("https://blog.example.com/jobs/feed", "https://example.com/careers.atom", "https://example.com/jobs.rss"):
+        adapter = feed_adapter_for(url)
+        assert type(adapter) is RssFeedAdapter
+        assert adapter.feed_url == url
+
+    greenhouse = feed_adapter_for("https://boards.greenhouse.io/acme")
+    assert isinstance(greenhouse, GreenhouseAdapter)
+    assert greenhouse.token == "acme"
+    assert isinstance(feed_adapter_for("https://jobs.lever.co/globex-corp"), LeverAdapter)
+
+    assert feed_adapter_for("https://example.com/careers") is None
+
+
+# ── incremental stop ──
+
+def _ids(*numbers):
+    return [str(n) for n in numbers]
+
+
+def test_take_new_stops_after_a_run_of_known_ids():
+    adapter = RssFeedAdapter("https://jobs.example.com/feed")
+    known = set(_ids(*range(10, 10 + STOP_AFTER_KNOWN)))
+    # Two new items, then STOP_AFTER_KNOWN stored ones, then an older unseen item
+    items = _ids(1, 2, *range(10, 10 + STOP_AFTER_KNOWN), 99)
+
+    assert adapter._take_new(items, lambda i: i, known, limit=100) == _ids(1, 2)
+
+
+def test_take_new_reads_past_a_short_run_of_known_ids():
+    adapter = RssFeedAdapter("https://jobs.example.com/feed")
+    # A pinned or featured post that is already stored does not end the read
+    known = set(_ids(*range(10, 10 + STOP_AFTER_KNOWN - 1)))
+    items = _ids(1, *range(10, 10 + STOP_AFTER_KNOWN - 1), 2, 3)
+
+    assert adapter._take_new(items, lambda i: i, known, limit=100) == _ids(1, 2, 3)
+
+
+def test_take_new_honours_limit():
+    adapter = RssFeedAdapter("https://jobs.example.com/feed")
+    assert adapter._take_new(_ids(*range(10)), lambda i: i, set(), limit=3) == _ids(0, 1, 2)
+
+
+def test_take_new_without_ordering_never_stops_early():
+    # ATS boards are not sorted by date, so every unseen posting is read
+    adapter = GreenhouseAdapter("acme")
+    known = set(_ids(*range(10, 10 + STOP_AFTER_KNOWN)))
+    items = _ids(*range(10, 10 + STOP_AFTER_KNOWN), 99)
+
+    assert adapter._take_new(items, lambda i: i, known, limit=100) == _ids(99)
+
+
+def test_fetch_jobs_applies_incremental_stop(fixture_path):
+    class RecordedFeed(RssFeedAdapter):
+        def iter_jobs(self):
+            with open(fixture_path("feeds/example_jobs.rss"), "rb") as stream:
+                yield from self.jobs_from_stream(stream)
+
+    adapter = RecordedFeed("https://jobs.example.com/feed")
+    assert [j["external_id"] for j in adapter.fetch_jobs()] == [
+        "example-1042", "https://jobs.example.com/postings/1041",
+    ]
+    assert [j["external_id"] for j in adapter.fetch_jobs(known_ids={"example-1042"})] == [
+        "https://jobs.example.com/postings/1041",
+    ]
@@ -0,0 +1,124 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from conftest import requires_database
+
+pytestmark = requires_database
+
+EMBEDDING_MODEL = "test-model/v1"
+VECTOR = "[" + ",".join(["1"] + ["0"] * 383) + "]"
+
+
+class BrokerDown(Exception):
+    pass
+
+
+async def _create_schema(engine):
+    import app.db.base  # noqa: F401 (registers every model on Base.metadata)
+    from app.db.base_class import Base
+
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def _insert(db, sql, **params):
+    return (await db.execute(text(sql), params)).scalar_one()
+
+
+async def _seed(db):
+    """An auto-apply user with one completed resume, and two jobs that match it exactly."""
+    user_id = await _insert(
+        db, "INSERT INTO users (email, hashed_password) VALUES (:email, 'x') RETURNING id",
+        email=f"matcher-{uuid.uuid4().hex}@example.test",
+    )
+    await db.execute(
+        text("INSERT INTO user_settings (user_id, auto_apply_enabled, match_threshold) VALUES (:user_id, true, 50)"),
+        {"user_id": user_id},
+    )
+    resume_id = await _insert(
+        db,
+        "INSERT INTO resumes (user_id, filename, format, status, embedding, embedding_model) "
+        "VALUES (:user_id, 'cv.pdf', 'pdf', 'completed', CAST(:vector AS vector), :model) RETURNING id",
+        user_id=user_id, vector=VECTOR, model=EMBEDDING_MODEL,
+    )
+    job_ids = []
+    for title in ("Backend Engineer", "Data Engineer"):
+        job_ids.append(await _insert(
+            db,
+            "INSERT INTO job_postings (source, title, company, description, embedding, embedding_model) "
+            "VALUES ('test', :title, 'Acme', 'Build things', CAST(:vector AS vector), :model) RETURNING id",
+            title=title, vector=VECTOR, model=EMBEDDING_MODEL,
+        ))
+    # The user bookmarked the second job by hand; auto-apply must leave it alone
+    manual_id = await _insert(
+        db,
+        "INSERT INTO applications (user_id, job_id, resume_id, status) "
+        "VALUES (:user_id, :job_id, :resume_id, 'shortlisted') RETURNING id",
+        user_id=user_id, job_id=job_ids[1], resume_id=resume_id,
+    )
+    await db.commit()
+    return user_id, job_ids, manual_id
+
+
+async def _applications(db, user_id):
+    rows = await db.execute(
+        text("SELECT id, job_id, status, auto_dispatch FROM applications WHERE user_id = :user_id ORDER BY id"),
+        {"user_id": user_id},
+    )
+    return [tuple(row) for row in rows]
+
+
+async def _cleanup(db, user_id, job_ids):
+    await db.execute(text("DELETE FROM users WHERE id = :user_id"), {"user_id": user_id})
+    await db.execute(text("DELETE FROM job_postings WHERE id = ANY(:job_ids)"), {"job_ids": job_ids})
+    await db.commit()
+
+
+def test_redelivered_batch_dispatches_applications_a_crash_left_behind():
+    from app.db.session import AsyncSessionLocal, engine
+    from app.worker.job_matcher import process_jobs
+
+    async def scenario():
+        await _create_schema(engine)
+        async with AsyncSessionLocal() as db:
+            user_id, job_ids, manual_id = await _seed(db)
+        try:
+            # First delivery: the claim commits, then dispatching dies before anything is sent
+            def crash(user_id, app_id):
+                raise BrokerDown()
+
+            with pytest.raises(BrokerDown):
+                await process_jobs(job_ids, dispatch=crash)
+
+            async with AsyncSessionLocal() as db:
+                apps = await _applications(db, user_id)
+            auto = [a for a in apps if a[0] != manual_id]
+            assert [(job_id, status, marker) for _, job_id, status, marker in auto] == [(job_ids[0], "processing", "pending")]
+            auto_id = auto[0][0]
+
+            # Redelivery: the application already exists, but is still dispatched exactly once
+            sent = []
+            result = await process_jobs(job_ids, dispatch=lambda user, app: sent.append((user, app)))
+            assert sent == [(user_id, auto_id)]
+            assert result["auto_applied"] == 1
+
+            # A further delivery finds nothing left to send
+            sent.clear()
+            await process_jobs(job_ids, dispatch=lambda user, app: sent.append((user, app)))
+            assert sent == []
+
+            async with AsyncSessionLocal() as db:
+                apps = {a[0]: a[2:] for a in await _applications(db, user_id)}
+            assert apps[auto_id] == ("processing", "sent")
+            assert apps[manual_id] == ("shortlisted", None)
+        finally:
+            async with AsyncSessionLocal() as db:
+                await _cleanup(db, user_id, job_ids)
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,48 @@
+import pytest
+
+from app.services.job_search import RRF_K, reciprocal_rank_fusion
+
+
+# ── reciprocal_rank_fusion ──
+
+def test_single_ranking_keeps_its_order():
+    fused = reciprocal_rank_fusion([30, 10, 20])
+    assert [item_id for item_id, _, _ in fused] == [30, 10, 20]
+    assert [score for _, score, _ in fused] == pytest.approx([1 / (RRF_K + r) for r in (1, 2, 3)])
+    assert [ranks for _, _, ranks in fused] == [[1], [2], [3]]
+
+
+def test_item_found_by_both_rankers_outranks_single_list_leaders():
+    fused = reciprocal_rank_fusion([1, 3], [2, 3])
+    assert fused[0] == (3, pytest.approx(2 / (RRF_K + 2)), [2, 2])
+    # The two list leaders score the same; the tie breaks on the higher id
+    assert [item_id for item_id, _, _ in fused[1:]] == [2, 1]
+    assert fused[1][2] == [None, 1]
+    assert fused[2][2] == [1, None]
+
+
+def test_ties_break_on_the_higher_id():
+    fused = reciprocal_rank_fusion([5, 9], [9, 5])
+    assert [item_id for item_id, _, _ in fused] == [9, 5]
+    assert fused[0][1] == fused[1][1]
+
+
+def test_scores_are_sums_over_rankings():
+    lexical, semantic = [4, 7, 1], [1, 4]
+    fused = {item_id: (score, ranks) for item_id, score, ranks in reciprocal_rank_fusion(lexical, semantic)}
+    assert fused[4] == (pytest.approx(1 / (RRF_K + 1) + 1 / (RRF_K + 2)), [1, 2])
+    assert fused[1] == (pytest.approx(1 / (RRF_K + 3) + 1 / (RRF_K + 1)), [3, 1])
+    assert fused[7] == (pytest.approx(1 / (RRF_K + 2)), [2, None])
+    assert [item_id for item_id, _, _ in reciprocal_rank_fusion(lexical, semantic)] == [4, 1, 7]
+
+
+def test_k_controls_how_much_top_ranks_dominate():
+    # Rank 1 in one list against rank 3 in both: a small k favours the single top hit
+    rankings = ([1, 8, 2], [9, 10, 2])
+    assert reciprocal_rank_fusion(*rankings, k=0)[0][0] == 9
+    assert reciprocal_rank_fusion(*rankings, k=RRF_K)[0][0] == 2
+
+
+def test_empty_rankings():
+    assert reciprocal_rank_fusion() == []
+    assert reciprocal_rank_fusion([], []) == []
@@ -0,0 +1,88 @@
+import random
+import re
+
+from app.services.keyword_scanner import KeywordScanner, scanner_for_terms
+
+
+def _naive_keywords(keyword_classes, text):
+    return {cls: {w for w in words if w and w in text} for cls, words in keyword_classes.items()}
+
+
+# ── keywords ──
+
+def test_scan_matches_substring_containment():
+    classes = {"lang": ["java", "javascript", "script", "go"], "cloud": ["aws", "gcp"]}
+    result = KeywordScanner(classes).scan("senior javascript developer, aws and gcp")
+
+    # Keywords inside a longer keyword still count ("java" and "script" in "javascript")
+    assert result.keywords == {"lang": {"java", "javascript", "script"}, "cloud": {"aws", "gcp"}}
+    assert result.count("lang") == 3
+    assert result.count("missing") == 0
+
+
+def test_scan_finds_overlapping_keywords_at_different_positions():
+    result = KeywordScanner({"k": ["ana", "nan", "banana"]}).scan("bananas")
+    assert result.keywords["k"] == {"ana", "nan", "banana"}
+
+
+def test_keyword_in_several_classes_counts_for_each():
+    result = KeywordScanner({"a": ["python", "sql"], "b": ["python"]}).scan("python only")
+    assert result.keywords == {"a": {"python"}, "b": {"python"}}
+
+
+def test_scan_agrees_with_naive_containment_on_random_text():
+    rng = random.Random(31)
+    alphabet = "abc "
+    classes = {
+        "x": ["ab", "abc", "bca", "c a", "cab"],
+        "y": ["a", "bb", "abc", "cc"],
+        "z": ["aaa", "ba", ""],
+    }
+    scanner = KeywordScanner(classes)
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert scanner.scan(text).keywords == _naive_keywords(classes, text), text
+
+
+def test_keywords_are_matched_literally():
+    result = KeywordScanner({"k": ["c++", "c#", ".net"]}).scan("c++ and .net, no csharp")
+    assert result.keywords["k"] == {"c++", ".net"}
+
+
+# ── patterns ──
+
+def test_pattern_classes_count_like_findall():
+    patterns = {"money": [r"\$\d+k?", r"\d+%"], "years": [r"\d+\+? years"]}
+    text = "salary $120k-$150k, 10% bonus, 5+ years, 3 years of go"
+    result = KeywordScanner({"lang": ["go"]}, patterns).scan(text)
+
+    for cls, class_patterns in patterns.items():
+        assert result.patterns[cls] == sum(len(re.findall(p, text)) for p in class_patterns)
+    assert result.count("money") == 3
+    assert result.keywords["lang"] == {"go"}
+
+
+def test_overlapping_matches_of_one_pattern_count_once():
+    result = KeywordScanner({}, {"digits": [r"\d\d"]}).scan("12345")
+    assert result.patterns["digits"] == len(re.findall(r"\d\d", "12345")) == 2
+
+
+# ── edge cases ──
+
+def test_empty_scanner_reports_empty_classes():
+    result = KeywordScanner({"k": []}).scan("anything")
+    assert result.keywords == {"k": set()}
+    assert result.patterns == {}
+    assert not KeywordScanner({"k": []}).contains_any("anything")
+
+
+def test_contains_any():
+    scanner = KeywordScanner({"k": ["remote", "hybrid"]})
+    assert scanner.contains_any("fully remote role")
+    assert not scanner.contains_any("on-site only")
+
+
+def test_scanner_for_terms_is_cached_per_term_set():
+    terms = frozenset({"python", "django"})
+    assert scanner_for_terms(terms) is scanner_for_terms(frozenset({"django", "python"}))
+    assert scanner_for_terms(terms).scan("django dev").keywords == {"terms": {"django"}}
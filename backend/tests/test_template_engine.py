@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.template_engine import (
+    TAG,
+    TEMPLATE_TAGS,
+    TEXT,
+    CompiledTemplate,
+    TemplateSyntaxError,
+    build_value_map,
+    compile_template,
+    get_compiled,
+)
+
+
+# ── compile_template ──
+
+def test_compile_splits_text_and_tags():
+    compiled = compile_template("Hi {{contact_name}}", "I saw {{ company }} is hiring.\n{{user_name}}")
+
+    assert compiled.subject_tokens == ((TEXT, "Hi "), (TAG, "contact_name"))
+    # Whitespace inside the braces is ignored
+    assert compiled.body_tokens == (
+        (TEXT, "I saw "), (TAG, "company"), (TEXT, " is hiring.\n"), (TAG, "user_name"),
+    )
+    assert compiled.tags == {"contact_name", "company", "user_name"}
+
+
+def test_compile_accepts_plain_text_and_empty_fields():
+    compiled = compile_template("Hello", None)
+    assert compiled.subject_tokens == ((TEXT, "Hello"),)
+    assert compiled.body_tokens == ()
+    assert compiled.tags == frozenset()
+
+
+def test_compile_is_cached_by_content():
+    assert compile_template("Hi {{contact_name}}", "Body") is compile_template("Hi {{contact_name}}", "Body")
+
+
+# ── tag validation ──
+
+def test_unknown_tag_is_rejected():
+    with pytest.raises(TemplateSyntaxError, match=r"body: unknown tag \{\{salary\}\}"):
+        compile_template("Hi", "Pay: {{salary}}")
+
+
+def test_malformed_tag_is_rejected():
+    with pytest.raises(TemplateSyntaxError, match="subject: malformed tag '{{Contact Name}}'"):
+        compile_template("Hi {{Contact Name}}", "Body")
+
+
+def test_unclosed_tag_is_rejected():
+    with pytest.raises(TemplateSyntaxError, match="body: unclosed"):
+        compile_template("Hi", "Thanks, {{user_name")
+
+
+def test_every_problem_is_reported_at_once():
+    with pytest.raises(TemplateSyntaxError) as excinfo:
+        compile_template("{{nope}}", "{{bad-tag}} and {{also_nope}}")
+    message = str(excinfo.value)
+    assert "subject: unknown tag {{nope}}" in message
+    assert "body: malformed tag '{{bad-tag}}'" in message
+    assert "body: unknown tag {{also_nope}}" in message
+
+
+# ── rendering ──
+
+def test_render_fills_tags_and_blanks_missing_values():
+    compiled = compile_template("{{company}} x {{user_name}}", "Dear {{contact_name}}, {{skills}}.")
+    assert compiled.render({"company": "Acme", "user_name": "Sam", "contact_name": "Jo"}) == (
+        "Acme x Sam", "Dear Jo, .",
+    )
+
+
+def test_render_batch_matches_render():
+    compiled = compile_template("Hi {{contact_name}}", "{{company}}")
+    value_maps = [{"contact_name": "Ann", "company": "A"}, {"contact_name": "Bo"}]
+    assert compiled.render_batch(value_maps) == [compiled.render(values) for values in value_maps]
+
+
+def test_json_round_trip_and_get_compiled_prefers_stored_tokens():
+    compiled = compile_template("Hi {{contact_name}}", "At {{company}}")
+    assert CompiledTemplate.from_json(compiled.to_json()) == compiled
+
+    stored = SimpleNamespace(compiled_tokens=compiled.to_json(), subject="ignored", body_text="ignored")
+    assert get_compiled(stored) == compiled
+    raw = SimpleNamespace(compiled_tokens=None, subject="Hi {{contact_name}}", body_text="At {{company}}")
+    assert get_compiled(raw) == compiled
+
+
+def test_build_value_map_provides_every_known_tag():
+    contact = SimpleNamespace(name=" Jo ", role="CTO", company="Acme")
+    resume = SimpleNamespace(parsed_json={"experience_years": "about 7 years", "skills": "Python"})
+    user = SimpleNamespace(
+        linkedin_url=None, github_url="gh", full_name="Sam", email="sam@example.test", phone=None, location="Berlin",
+    )
+    values = build_value_map(contact, resume, user, SimpleNamespace(target_roles="Backend Engineer"))
+
+    assert set(values) == TEMPLATE_TAGS
+    assert values["contact_name"] == "Jo"
+    assert values["experience_years"] == "7"
+    assert values["job_title"] == "Backend Engineer"
+    assert values["linkedin"] == ""
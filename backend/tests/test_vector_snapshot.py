@@ -0,0 +1,117 @@
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.services import vector_snapshot
+from app.services.embeddings import EMBEDDING_VERSION
+from app.services.vector_snapshot import EMBEDDING_DIM, VectorSnapshot
+
+ROWS = 500
+BASE_EPOCH = 1_700_000_000
+
+
+def _unit(rng, n):
+    matrix = rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def _brute_force(ids, vectors, queries, k, keep=None):
+    """Reference answer: every similarity computed in float64, fully sorted."""
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    sims = queries.astype(np.float64) @ vectors.astype(np.float64).T
+    if keep is not None:
+        sims[:, ~keep] = -np.inf
+    order = np.argsort(-sims, axis=1, kind="stable")[:, :k]
+    return ids[order], np.take_along_axis(sims, order, axis=1)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(41)
+
+
+@pytest.fixture
+def snapshot(tmp_path, rng, monkeypatch):
+    """A snapshot of ROWS jobs written the way export_snapshot lays it out, searched in small blocks."""
+    ids = np.arange(1, ROWS + 1, dtype=np.int64) * 3
+    created = BASE_EPOCH + np.arange(ROWS, dtype=np.int64) * 60
+    np.save(tmp_path / "embeddings.npy", _unit(rng, ROWS))
+    np.save(tmp_path / "ids.npy", ids)
+    np.save(tmp_path / "created.npy", created)
+    (tmp_path / "meta.json").write_text(json.dumps({"max_id": int(ids[-1]), "embedding_model": EMBEDDING_VERSION}))
+
+    # Small blocks, so results are merged across snapshot blocks and query chunks
+    monkeypatch.setattr(vector_snapshot, "SEARCH_BLOCK_ROWS", 64)
+    monkeypatch.setattr(vector_snapshot, "QUERY_BLOCK_ROWS", 4)
+    return VectorSnapshot(tmp_path)
+
+
+def _all_rows(snapshot):
+    ids = np.concatenate([snapshot.ids, snapshot.delta.ids])
+    created = np.concatenate([snapshot.created, snapshot.delta.created])
+    vectors = np.concatenate([snapshot.vectors, snapshot.delta.vectors])
+    return ids, created, vectors
+
+
+def _add_delta(snapshot, rng, n=20):
+    first = snapshot.max_id + 1
+    snapshot.delta = vector_snapshot._Delta(
+        ids=np.arange(first, first + n, dtype=np.int64),
+        created=BASE_EPOCH + (ROWS + np.arange(n, dtype=np.int64)) * 60,
+        vectors=_unit(rng, n),
+    )
+
+
+# ── top_k ──
+
+def test_top_k_matches_brute_force(snapshot, rng):
+    queries = rng.standard_normal((10, EMBEDDING_DIM)).astype(np.float32) * 3  # not normalised
+    ids, sims = snapshot.top_k(queries, 25)
+
+    all_ids, _, vectors = _all_rows(snapshot)
+    expected_ids, expected_sims = _brute_force(all_ids, vectors, queries, 25)
+    assert ids.shape == sims.shape == (10, 25)
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_allclose(sims, expected_sims, rtol=1e-5, atol=1e-6)
+
+
+def test_top_k_searches_the_delta(snapshot, rng):
+    _add_delta(snapshot, rng)
+    # A query equal to a delta row finds that row first, with similarity 1
+    queries = np.vstack([snapshot.delta.vectors[7], rng.standard_normal((5, EMBEDDING_DIM)).astype(np.float32)])
+    ids, sims = snapshot.top_k(queries, 30)
+
+    assert ids[0, 0] == snapshot.delta.ids[7]
+    assert sims[0, 0] == pytest.approx(1.0, abs=1e-5)
+    all_ids, _, vectors = _all_rows(snapshot)
+    expected_ids, expected_sims = _brute_force(all_ids, vectors, queries, 30)
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_allclose(sims, expected_sims, rtol=1e-5, atol=1e-6)
+
+
+def test_top_k_created_after_filters_older_jobs(snapshot, rng):
+    _add_delta(snapshot, rng)
+    all_ids, created, vectors = _all_rows(snapshot)
+    cutoff = int(created[300])
+    queries = rng.standard_normal((6, EMBEDDING_DIM)).astype(np.float32)
+    ids, sims = snapshot.top_k(queries, 40, created_after=datetime.fromtimestamp(cutoff, tz=timezone.utc))
+
+    expected_ids, expected_sims = _brute_force(all_ids, vectors, queries, 40, keep=created >= cutoff)
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_allclose(sims, expected_sims, rtol=1e-5, atol=1e-6)
+    assert set(ids.ravel()) <= set(all_ids[created >= cutoff])
+
+
+def test_top_k_larger_than_the_snapshot_returns_every_row(snapshot, rng):
+    _add_delta(snapshot, rng)
+    query = rng.standard_normal(EMBEDDING_DIM).astype(np.float32)  # a single 1-d query
+    ids, sims = snapshot.top_k(query, len(snapshot) + 10)
+
+    assert ids.shape == (1, len(snapshot))
+    all_ids, _, vectors = _all_rows(snapshot)
+    assert sorted(ids[0]) == sorted(all_ids)
+    assert np.all(np.diff(sims[0]) <= 0)
+    expected_ids, _ = _brute_force(all_ids, vectors, query[None, :], len(snapshot))
+    np.testing.assert_array_equal(ids, expected_ids)
@@ -146,7 +146,7 @@ export default function ColdMailPage() {
             const token = localStorage.getItem("token");
             const headers = { Authorization: `Bearer ${token}` };
 
-            const searchParam = searchQuery ? `&search=${encodeURIComponent(searchQuery)}` : "";
+            const searchParam = searchQuery ? `&search=${encodeURIComponent(searchQuery)}&sort=relevance` : "";
             const scopeParam = `&scope=${contactScope}`;
 
             const [contactsRes, templatesRes, resumesRes, profileRes] = await Promise.all([
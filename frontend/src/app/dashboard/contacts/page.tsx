@@ -47,7 +47,7 @@ export default function ContactsPage() {
             const token = localStorage.getItem("token");
             let url = `${API_BASE_URL}/api/v1/contacts/?skip=${(page - 1) * pageSize}&limit=${pageSize}&scope=${scope}`;
             if (searchQuery.trim() !== "") {
-                url += `&search=${encodeURIComponent(searchQuery.trim())}`;
+                url += `&search=${encodeURIComponent(searchQuery.trim())}&sort=relevance`;
             }
             const res = await fetch(url, {
                 headers: { Authorization: `Bearer ${token}` }